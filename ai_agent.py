@@ -1,16 +1,32 @@
 
-import os, json, hashlib, random, re, math, uuid
-from typing import Literal, List, Optional, Dict
-from pydantic import BaseModel, Field
-from openai import OpenAI
-
-import os
-from dotenv import load_dotenv
-load_dotenv()
+import os, json, hashlib, heapq, bisect, difflib, random, re, math, uuid, threading, time, queue, atexit
+from contextlib import contextmanager
+from typing import List, Optional, Dict
+import scene_json
+import planner_backends
+
+
+def _load_dotenv() -> None:
+    # same search as dotenv.load_dotenv() from this file (walk up to the
+    # root), but python-dotenv is only imported when a .env file exists
+    d = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(d, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(d)
+        if parent == d:
+            return
+        d = parent
+
+_load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_AGENT_MODEL = os.getenv("OPENAI_AGENT_MODEL", "gpt-4.1")
-client = OpenAI(api_key=OPENAI_API_KEY)
+# ATLAS_PLANNER_BACKEND picks openai (default), record, replay or fake
+client = planner_backends.make_client(api_key=OPENAI_API_KEY)
 ALLOWED_TOOLS = [
     "create_scene", "add_object", "move", "align", "distribute", "scale",
     "set_height", "render_svg", "export_state", "report_error", "set_anchor",
@@ -395,7 +411,6 @@ General Guidance
 
 # ---- New Cell ----
 
-import re
 RESET_WORDS = re.compile(r"\b(reset|recreate|clear|new scene)\b", re.I)
 
 
@@ -403,96 +418,36 @@ RESET_WORDS = re.compile(r"\b(reset|recreate|clear|new scene)\b", re.I)
 
 
 
-# ---------------- Schemas ----------------
-class CommandArgs(BaseModel):
-    # creation / scene
-    labels: Optional[List[str]] = None
-    primitive: Optional[Literal["cube","square","rect"]] = None
-    count: Optional[int] = None
-    placement: Optional[Literal["random_nonoverlap","grid","row","cluster"]] = None
-    size: Optional[float] = None
-    grid_w: Optional[int] = None
-    grid_h: Optional[int] = None
-    scale_sizes: Optional[bool] = None  # for resize_canvas
-    margin: Optional[float] = None
-    seed: Optional[int] = None
-    # movement / options
-    symmetric: Optional[bool] = None
-    pivot: Optional[Literal["grid_center","selection_center"]] = None
-
-    # place_above
-    new_label: Optional[str] = None
-    gap: Optional[float] = None
-
-    # merge / rename
-    keep: Optional[str] = None
-    remove: Optional[str] = None
-
-    # single / multi targets
-    label: Optional[str] = None         # NEW: used by add_object / ensure_object
-    target: Optional[str] = None
-    targets: Optional[List[str]] = None
-    a: Optional[str] = None
-    b: Optional[str] = None
-
-    # geometry / movement
-    x: Optional[float] = None           # NEW
-    y: Optional[float] = None           # NEW
-    w: Optional[float] = None           # NEW
-    h: Optional[float] = None           # NEW
-    dx: Optional[float] = None
-    dy: Optional[float] = None
-    axis: Optional[Literal["x","y","both"]] = None   # include "both" for scale
-    mode: Optional[Literal["centers","tops","bottoms","lefts","rights","equal_gaps","fixed_spacing","between","side"]] = None
-    spacing: Optional[float] = None
-    factor: Optional[float] = None      # NEW for scale
-
-    # render
-    view: Optional[Literal["topdown"]] = None
-    grid: Optional[bool] = None
-
-    # messages
-    code: Optional[str] = None
-    message: Optional[str] = None
-
-    # constraints / anchors
-    kind: Optional[str] = None          # e.g., "align_left","between_x", etc.
-    index: Optional[int] = None
-    gap: Optional[float] = None
-    x_pct: Optional[float] = None
-    y_pct: Optional[float] = None
-
-    # new alignment/relative tools
-    side: Optional[Literal["left","right","top","bottom","center_x","center_y","front","back"]] = None
-    ref: Optional[str] = None
-    edge: Optional[Literal[
-        "left_to_left","right_to_right","left_to_right","right_to_left",
-        "top_to_top","bottom_to_bottom","top_to_bottom","bottom_to_top",
-        "center_x","center_y"
-    ]] = None
-    direction: Optional[Literal["north","south","east","west","left","right","front","back"]] = None
-
-    distance: Optional[float] = None
-
-    # 3D (ignored by 2D)
-    height: Optional[float] = None
-    # ---- RAMP tool args (works for both modes) ----
-    # JSON accepts "from" / "to" — map to Python-safe names via aliases
-    from_: Optional[str] = Field(default=None, alias="from")   # ADD
-    to_:   Optional[str] = Field(default=None, alias="to")     # ADD
-    of: Optional[str] = None                                   # ADD  (for mode="side")
-    length: Optional[float] = None                             # ADD  (meters; default handled by tool)
-    slope_ratio: Optional[float] = None                        # ADD  (default 12.0; 1:12)
-
-
-class Command(BaseModel):
-    tool: str
-    arguments: Optional[CommandArgs] = None
-
-class CommandBatch(BaseModel):
-    commands: List[Command]
-
 # ---------------- Utils ----------------
+# ---------------- Instrumentation ----------------
+# STAGE_HOOK(stage, seconds, tool=None) is called for the LLM call, plan
+# repair, every routed tool, rendering, export and artifact writes.
+# server.py installs one to feed /metrics; None costs nothing.
+STAGE_HOOK = None
+
+def _report_stage(stage: str, seconds: float, tool: str | None = None) -> None:
+    hook = STAGE_HOOK
+    if hook is not None:
+        hook(stage, seconds, tool=tool)
+
+@contextmanager
+def _timed(stage: str, tool: str | None = None):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report_stage(stage, time.perf_counter() - t0, tool=tool)
+
+def _timed_commands(commands):
+    # route_and_execute asks for the next command only after finishing the
+    # current one, so the time between yield and resume is the tool's cost.
+    for cmd in commands:
+        t0 = time.perf_counter()
+        try:
+            yield cmd
+        finally:
+            _report_stage("tool", time.perf_counter() - t0, tool=str(cmd.get("tool")))
+
 def prompt_seed(s: str) -> int:
     return int(hashlib.md5(s.encode("utf-8")).hexdigest()[:8], 16)
 
@@ -520,8 +475,12 @@ SCENE["anchors"] = {}       # per-object anchors, e.g. {"A":{"x_pct":0.5,"y_pct"
 HISTORY: list[dict] = []        # stack of previous scenes (snapshots)
 ARTIFACTS: list[dict] = []      # chronological list of {"svg":..., "json":...}
 FRAME_ID: int = 0               # monotonic counter for unique filenames
+ARTIFACT_PREFIX = "scene"       # artifact filename prefix (per session)
+# placed-object mirror the plan importer writes for Blender livesync (per session)
+STATE = {"grid_w": 40.0, "grid_h": 30.0, "objects": {}}
+# SpatialGrid over SCENE["objects"], built on first query (see spatial_index)
+SCENE_INDEX = None
 
-_LAST_OBJECT_LABEL = None
 SHOW_RAMP_DECOR = False 
 
 def _parse_wh_from_text(text: str):
@@ -533,19 +492,16 @@ def _parse_wh_from_text(text: str):
         return (float(m.group(1)), float(m.group(2)))
     return (None, None)
 
-def _deepcopy_scene():
-    # json roundtrip keeps it simple & deterministic
-    return json.loads(json.dumps(SCENE))
-
 # ATLAS_FINAL_WITH_IMPORTER.py
 def _restore_scene(state: dict):
     SCENE.clear()
-    SCENE.update(json.loads(json.dumps(state)))
+    SCENE.update(scene_json.clone(state))
     SCENE.setdefault("objects", {})
     SCENE.setdefault("constraints", [])
     SCENE.setdefault("anchors", {})
     SCENE.setdefault("grid_w", GRID_W)
     SCENE.setdefault("grid_h", GRID_H)
+    invalidate_spatial_index()
 
 
 
@@ -553,7 +509,7 @@ def _next_artifact_path(seed: int, ext: str) -> str:
     # ext is "svg" or "json"
     global FRAME_ID
     FRAME_ID += 1
-    return os.path.abspath(f"scene_{seed}_{FRAME_ID:04d}.{ext}")
+    return os.path.abspath(f"{ARTIFACT_PREFIX}_{seed}_{FRAME_ID:04d}.{ext}")
 
 def _aabb_overlap(a, b, margin=0.0):
     ax1, ay1 = a["x"] - a["w"]/2 - margin, a["y"] - a["h"]/2 - margin
@@ -561,7 +517,6 @@ def _aabb_overlap(a, b, margin=0.0):
     bx1, by1 = b["x"] - b["w"]/2 - margin, b["y"] - b["h"]/2 - margin
     bx2, by2 = b["x"] + b["w"]/2 + margin, b["y"] + b["h"]/2 + margin
     return not (ax2 <= bx1 or bx2 <= ax1 or ay2 <= by1 or by2 <= ay1)
-_LAST_OBJECT_LABEL = None
 def engine_add_object(label, primitive, x=None, y=None, w=None, h=None, margin=0.8, height=None):
     global _LAST_OBJECT_LABEL
     L = label.upper()
@@ -579,11 +534,13 @@ def engine_add_object(label, primitive, x=None, y=None, w=None, h=None, margin=0
            "primitive": primitive, "height": extrude, "z_offset": snap_to_grid(extrude * 0.5)}
 
     SCENE["objects"][L] = obj
+    _index_touch(L)
     _LAST_OBJECT_LABEL = L
     return obj
 def _deepcopy_scene():
-    import copy
-    return copy.deepcopy(SCENE)
+    # json round trip: SCENE holds only JSON data, and orjson makes it much
+    # cheaper than copy.deepcopy for the undo/redo snapshots
+    return scene_json.clone(SCENE)
 
 
 
@@ -669,7 +626,6 @@ def _expand_ramp(name, P0, P1, W, H0, H1, thickness=0.1):
 
 
 def engine_undo():
-    import copy
     if not UNDO_STACK:
         return
     prev = UNDO_STACK.pop()
@@ -677,7 +633,6 @@ def engine_undo():
     _restore_scene(prev)
 
 def engine_redo():
-    import copy
     if not REDO_STACK:
         return
     nxt = REDO_STACK.pop()
@@ -701,6 +656,7 @@ def engine_mirror_object(target: str, axis: str = "x", pivot: str = "grid_center
         o["x"] = snap_to_grid(2*cx - o["x"])
     elif axis.lower() == "y":
         o["y"] = snap_to_grid(2*cy - o["y"])
+    _index_touch(T)
 
 def _center_z_or_ground(obj: dict) -> float:
     """Return center Z; if missing, assume grounded (H/2) and write it back."""
@@ -737,6 +693,7 @@ def engine_stack_above(target: str, ref: str, gap: float = 0.0, center_xy: bool
     if center_xy:
         to["x"] = snap_to_grid(ro["x"])
         to["y"] = snap_to_grid(ro["y"])
+        _index_touch(T)
 
 
 def engine_stack_below(target: str, ref: str, gap: float = 0.0, center_xy: bool = True):
@@ -764,6 +721,7 @@ def engine_stack_below(target: str, ref: str, gap: float = 0.0, center_xy: bool
     if center_xy:
         to["x"] = snap_to_grid(ro["x"])
         to["y"] = snap_to_grid(ro["y"])
+        _index_touch(T)
 
 
 
@@ -818,6 +776,7 @@ def _place_side(target: str, new_label: str, side: str,
         "height": theight,
         "z_offset": snap_to_grid(theight * 0.5),    # keep same extrusion unless caller overrides later
     }
+    _index_touch(L)
 
 def engine_place_left_of(
     target, new_label, gap=0.0, w=None, h=None, size=None, copy_if_unspecified=True
@@ -870,6 +829,7 @@ def engine_batch_rename(pairs):
         if n in SCENE["objects"]:
             SCENE["objects"][TMP_PREFIX + n] = SCENE["objects"].pop(n)
             SCENE["objects"][TMP_PREFIX + n]["label"] = TMP_PREFIX + n
+            _index_touch(n, TMP_PREFIX + n)
 
     # Now perform renames old -> new
     for old, new in norm:
@@ -878,6 +838,7 @@ def engine_batch_rename(pairs):
         obj = SCENE["objects"].pop(old)
         obj["label"] = new
         SCENE["objects"][new] = obj
+        _index_touch(old, new)
 
     # Optionally: leave TMP_* entries as-is (safest). You can reclaim them later if needed.
 
@@ -943,6 +904,7 @@ def engine_place_relative(target: str, ref: str, direction: str, distance: float
         return  # unsupported direction
 
     to["x"], to["y"] = nx, ny
+    _index_touch(T)
 
 def engine_place_above(target: str, new_label: str, gap: float = 1.0, copy_size: bool = True):
     global _LAST_OBJECT_LABEL
@@ -970,6 +932,7 @@ def engine_place_above(target: str, new_label: str, gap: float = 1.0, copy_size:
         "height": height,
         "z_offset": z_offset
     }
+    _index_touch(L)
     _LAST_OBJECT_LABEL = L
 
 def engine_move_group(targets: list[str], dx: float = 0.0, dy: float = 0.0,
@@ -983,6 +946,7 @@ def engine_move_group(targets: list[str], dx: float = 0.0, dy: float = 0.0,
         for o in objs:
             o["x"] = snap_to_grid(o["x"] + (dx or 0.0))
             o["y"] = snap_to_grid(o["y"] + (dy or 0.0))
+        _index_touch(*tlist)
         return
 
     # symmetric mirror on X, then shift
@@ -997,6 +961,7 @@ def engine_move_group(targets: list[str], dx: float = 0.0, dy: float = 0.0,
         mirrored_cx = 2*cx - o["x"]    # reflect across cx
         o["x"] = snap_to_grid(mirrored_cx + (dx or 0.0))
         o["y"] = snap_to_grid(o["y"] + (dy or 0.0))
+    _index_touch(*tlist)
 def engine_merge_objects(keep: str, remove: str):
     K, R = (keep or "").upper(), (remove or "").upper()
     if K not in SCENE["objects"] or R not in SCENE["objects"] or K == R:
@@ -1020,12 +985,14 @@ def engine_merge_objects(keep: str, remove: str):
 
     # delete the removed one
     del SCENE["objects"][R]
+    _index_touch(K, R)
 def engine_remove_object(label: str):
     global LAST_REMOVED_BBOX
     L = (label or "").upper()
     if L not in SCENE["objects"]:
         return None
     o = SCENE["objects"].pop(L)
+    _index_touch(L)
     bbox = {"x": o["x"], "y": o["y"], "w": o["w"], "h": o["h"], "height": o.get("height")}
     LAST_REMOVED_BBOX = bbox
     return bbox
@@ -1040,6 +1007,7 @@ def engine_move_into_bbox(label: str, bbox: Optional[dict] = None):
         return
     tgt["x"], tgt["y"] = snap_to_grid(bb["x"]), snap_to_grid(bb["y"])
     tgt["w"], tgt["h"] = snap_to_grid(max(GRID_STEP, bb["w"])), snap_to_grid(max(GRID_STEP, bb["h"]))
+    _index_touch(L)
     if bb.get("height") is not None:
         tgt["height"] = snap_to_grid(max(GRID_STEP, bb["height"]))
     _LAST_OBJECT_LABEL = L
@@ -1060,6 +1028,7 @@ def engine_rename_object(old: str, new: str):
     obj = SCENE["objects"].pop(O)
     obj["label"] = N
     SCENE["objects"][N] = obj
+    _index_touch(O, N, TMP)
     # restore TMP if used (optional: user may not need it)
     if TMP in SCENE["objects"] and SCENE["objects"][TMP]["label"] == TMP:
         # leave it or delete it; here we leave it (safer for collision chains)
@@ -1069,6 +1038,7 @@ def _reset_scene(grid_w=GRID_W, grid_h=GRID_H):
     SCENE["grid_w"] = grid_w
     SCENE["grid_h"] = grid_h
     SCENE["objects"] = {}
+    invalidate_spatial_index()
 
 def _nonoverlap(pos, size, margin, placed):
     x, y = pos
@@ -1081,8 +1051,98 @@ def _nonoverlap(pos, size, margin, placed):
             return False
     return True
 
+# draws per label before _free_space_placement gives up on rejection
+# sampling and lists every free grid point instead
+_PLACEMENT_DRAWS = 32
+
+def _free_space_placement(n, size, margin, rng, grid_w, grid_h) -> list:
+    """
+    n non-overlapping centers for random_nonoverlap. Candidates are the grid
+    points the rejection loop can draw (snapped uniform(size, grid - size) on
+    each axis). While the canvas is sparse, points are drawn at random and
+    checked against the placed centers a SpatialGrid finds nearby, so the
+    cost follows the label count, not the canvas area. Once _PLACEMENT_DRAWS
+    draws in a row miss, the canvas is dense: every placement so far blocks
+    the points within _nonoverlap's distance of it and the rest are drawn
+    from the points still free. Deterministic for a given rng; raises E_CANVAS_FULL
+    when no free point is left.
+    """
+    step = GRID_STEP
+    lo_x, hi_x = sorted((snap_to_grid(size), snap_to_grid(grid_w - size)))
+    lo_y, hi_y = sorted((snap_to_grid(size), snap_to_grid(grid_h - size)))
+    nx = int(round((hi_x - lo_x) / step)) + 1
+    ny = int(round((hi_y - lo_y) / step)) + 1
+    reach = size / 2.0 + size / 2.0 + margin   # _nonoverlap's threshold, same arithmetic
+    # lattice points are exact multiples of GRID_STEP apart, so the blocked
+    # disc is the same offset pattern around every center: (di, dj_lo, dj_hi)
+    R = int(math.ceil(reach / step))
+    disc = []
+    for di in range(-R, R + 1):
+        span = [dj for dj in range(-R, R + 1) if math.hypot(di * step, dj * step) < reach]
+        if span:
+            disc.append((di, span[0], span[-1]))
+    spans = {di: (lo, hi) for di, lo, hi in disc}
+    cells = []                  # lattice (i, j) of every placed center
+    # placed centers indexed in lattice units, so a query of +-R points
+    # finds every center whose disc can cover (i, j)
+    near = SpatialGrid(cell=2 * R + 1)
+
+    def taken(i, j):
+        for k in near.query(i - R, j - R, i + R, j + R):
+            pi, pj = cells[k]
+            span = spans.get(pi - i)
+            if span and span[0] <= pj - j <= span[1]:
+                return True
+        return False
+
+    while len(cells) < n:
+        for _ in range(_PLACEMENT_DRAWS):
+            i, j = divmod(rng.randrange(nx * ny), ny)
+            if not taken(i, j):
+                break
+        else:
+            break
+        near.insert(len(cells), i, j, 0, 0)
+        cells.append((i, j))
+
+    if len(cells) < n:
+        # dense canvas: the blocked discs already cover most of it, so the
+        # full list of grid points costs about what the placements do
+        free = list(range(nx * ny))          # free cell ids, i * ny + j
+        where = list(range(len(free)))       # cell id -> index in free, -1 once blocked
+
+        def block(i, j):
+            for di, lo, hi in disc:
+                ii = i + di
+                if not 0 <= ii < nx:
+                    continue
+                base = ii * ny
+                for c in range(base + max(0, j + lo), base + min(ny - 1, j + hi) + 1):
+                    k = where[c]
+                    if k >= 0:
+                        last = free.pop()
+                        if last != c:
+                            free[k] = last
+                            where[last] = k
+                        where[c] = -1
+
+        for i, j in cells:
+            block(i, j)
+        while len(cells) < n:
+            if not free:
+                raise ValueError(f"E_CANVAS_FULL: only {len(cells)} of {n} objects of size {size:g} "
+                                 f"with margin {margin:g} fit on a {grid_w:g}x{grid_h:g} canvas; "
+                                 "use a larger canvas, a smaller margin or placement='grid'")
+            i, j = divmod(free[rng.randrange(len(free))], ny)
+            cells.append((i, j))
+            block(i, j)
+    return [(snap_to_grid(lo_x + i * step), snap_to_grid(lo_y + j * step)) for i, j in cells]
+
+# ATLAS_FAST_PLACEMENT=0 restores the rejection-sampling random_nonoverlap
+# (5000 draws per label, then a row layout for whatever did not fit)
+FAST_PLACEMENT = os.getenv("ATLAS_FAST_PLACEMENT", "1") != "0"
+
 def engine_create_scene(labels, primitive, count, placement, size, margin, seed, grid_w, grid_h):
-    _reset_scene(grid_w, grid_h)
     labels = labels or []
     if count and not labels:
         for i in range(count):
@@ -1094,6 +1154,11 @@ def engine_create_scene(labels, primitive, count, placement, size, margin, seed,
     default_height = snap_to_grid(max(GRID_STEP, size))     # cube by default
     margin = float(margin or 0.8)
     placed = []
+    fast = None
+    if placement != "grid" and FAST_PLACEMENT:
+        # before the reset, so a full canvas leaves the old scene alone
+        fast = _free_space_placement(len(labels), size, margin, rng, grid_w, grid_h)
+    _reset_scene(grid_w, grid_h)
 
     def _make_obj(lab, cx, cy, w=size, h=size, height=default_height):
         height = snap_to_grid(float(height))
@@ -1121,24 +1186,36 @@ def engine_create_scene(labels, primitive, count, placement, size, margin, seed,
             i += 1
             SCENE["objects"][lab] = _make_obj(lab, cx, cy)
 
+    elif fast is not None:
+        for lab, (cx, cy) in zip(labels, fast):
+            SCENE["objects"][lab] = _make_obj(lab, cx, cy)
+
     else:
         attempts_limit = 5000
+        # only placed objects within reach can fail _nonoverlap
+        near = SpatialGrid(cell=max(INDEX_CELL, 2 * size + margin))
+        reach = size + margin
+
+        def _place(lab, cx, cy):
+            SCENE["objects"][lab] = _make_obj(lab, cx, cy)
+            placed.append({"x": cx, "y": cy, "w": size})
+            near.insert(len(placed) - 1, cx, cy, size, size)
+
         for lab in labels:
             ok = False
             for _ in range(attempts_limit):
                 cx = rng.uniform(size, grid_w - size)
                 cy = rng.uniform(size, grid_h - size)
                 cx = snap_to_grid(cx); cy = snap_to_grid(cy)
-                if _nonoverlap((cx, cy), size, margin, placed):
-                    SCENE["objects"][lab] = _make_obj(lab, cx, cy)
-                    placed.append({"x": cx, "y": cy, "w": size})
+                hits = near.query(cx - reach, cy - reach, cx + reach, cy + reach)
+                if _nonoverlap((cx, cy), size, margin, [placed[i] for i in hits]):
+                    _place(lab, cx, cy)
                     ok = True
                     break
             if not ok:
                 cx = snap_to_grid(size + len(placed) * (size + margin))
                 cy = snap_to_grid(size * 1.5)
-                SCENE["objects"][lab] = _make_obj(lab, cx, cy)
-                placed.append({"x": cx, "y": cy, "w": size})
+                _place(lab, cx, cy)
 
 def engine_move(target, dx, dy):
     t = target.upper()
@@ -1146,6 +1223,7 @@ def engine_move(target, dx, dy):
         o = SCENE["objects"][t]
         o["x"] = snap_to_grid(o["x"] + dx)
         o["y"] = snap_to_grid(o["y"] + dy)
+        _index_touch(t)
 def guard_scale_touch(target: str, a: str, b: str, axis: str):
     t, A, B = (target or "").upper(), (a or "").upper(), (b or "").upper()
     if t not in SCENE["objects"] or A not in SCENE["objects"] or B not in SCENE["objects"]:
@@ -1212,6 +1290,7 @@ def guard_scale_touch(target: str, a: str, b: str, axis: str):
             new_h = max(MIN_SIZE, 2.0 * (desired_bottom - cy))
             tgt["h"] = snap_to_grid(new_h)
             tgt["y"] = snap_to_grid(cy)
+    _index_touch(t)
 
 def engine_align(targets, axis, mode):
     tlist = [t.upper() for t in (targets or []) if t]
@@ -1237,6 +1316,7 @@ def engine_align(targets, axis, mode):
         elif mode == "bottoms":
             bot = max(o["y"] + o["h"]/2 for o in objs)
             for o in objs: o["y"] = snap_to_grid(bot - o["h"]/2)
+    _index_touch(*tlist)
 
 def engine_distribute(targets, axis, mode, spacing):
     tlist = [t.upper() for t in (targets or []) if t]
@@ -1303,6 +1383,7 @@ def engine_distribute(targets, axis, mode, spacing):
             for o in objs:
                 o["y"] = snap_to_grid(cur_top + o["h"]/2)
                 cur_top += o["h"] + g
+    _index_touch(*tlist)
 
 
 def engine_scale(target: str, axis: str, factor: float):
@@ -1318,10 +1399,16 @@ def engine_scale(target: str, axis: str, factor: float):
     if axis in ("y", "both"):
         new_h = snap_to_grid(max(GRID_STEP, o["h"] * float(factor)))
         o["h"] = new_h
+    _index_touch(t)
     # keep center x,y; snap already handled on sizes
 
 
-def engine_render_svg(path, view, grid=True):
+def render_svg_text(view="topdown", grid=True) -> str:
+    """Render the current SCENE top-down and return the SVG markup."""
+    with _timed("render_svg"):
+        return _render_svg_text(view, grid)
+
+def _render_svg_text(view, grid):
     assert view == "topdown"
     w_px, h_px = 800, 600
     sx = w_px / SCENE["grid_w"]
@@ -1420,15 +1507,71 @@ def engine_render_svg(path, view, grid=True):
             f'<line x1="{sx:.1f}" y1="{sy:.1f}" x2="{ex:.1f}" y2="{ey:.1f}" stroke="red" stroke-width="3" marker-end="url(#arrowhead)"/>'
         )
 
-    # CLOSE SVG and write once (always write; no DRY_RUN, no LAST_SVG_SUMMARY)
     parts.append("</svg>")
+    return "\n".join(parts)
+
+def engine_render_svg(path, view, grid=True):
     with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(parts))
+        f.write(render_svg_text(view, grid=grid))
     return os.path.abspath(path)
 
+def export_state_dict() -> dict:
+    """Detached copy of SCENE, safe to hand out or serialize later."""
+    with _timed("export_state"):
+        return scene_json.clone(SCENE)
+
 def engine_export_state(path):
-    with open(path, "w", encoding="utf-8") as f: json.dump(SCENE, f, indent=2)
+    scene_json.write(path, SCENE)
     return os.path.abspath(path)
+
+# --- Artifact persistence ---
+# route_and_execute hands the SVG text and scene dict back in memory; the
+# scene_*.svg / scene_*.json files are a side effect controlled by
+# ATLAS_PERSIST_ARTIFACTS: "async" (default, written by a background
+# thread in order), "sync" (written before returning) or "off".
+PERSIST_ARTIFACTS = os.getenv("ATLAS_PERSIST_ARTIFACTS", "async").lower()
+_ARTIFACT_QUEUE = queue.Queue()
+_ARTIFACT_WRITER = [None]
+
+def _write_artifact(path, content):
+    with _timed("artifact_write"):
+        if callable(content):
+            content = content()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(content)
+
+def _artifact_writer():
+    while True:
+        path, content = _ARTIFACT_QUEUE.get()
+        try:
+            _write_artifact(path, content)
+        except Exception as e:
+            print("Artifact write failed:", path, e)
+        finally:
+            _ARTIFACT_QUEUE.task_done()
+
+def persist_artifact(path: str, content) -> str | None:
+    """Persist text or bytes (or a zero-arg callable producing them) per PERSIST_ARTIFACTS; returns the path or None."""
+    if PERSIST_ARTIFACTS == "off":
+        return None
+    path = os.path.abspath(path)
+    if PERSIST_ARTIFACTS == "sync":
+        _write_artifact(path, content)
+        return path
+    if _ARTIFACT_WRITER[0] is None:
+        _ARTIFACT_WRITER[0] = threading.Thread(target=_artifact_writer, name="artifact-writer", daemon=True)
+        _ARTIFACT_WRITER[0].start()
+    _ARTIFACT_QUEUE.put((path, content))
+    return path
+
+def flush_artifacts() -> None:
+    """Block until queued artifact files are on disk."""
+    if _ARTIFACT_WRITER[0] is not None:
+        _ARTIFACT_QUEUE.join()
+
+atexit.register(flush_artifacts)
 def _exists(label: str) -> bool:
     return bool(label) and label.upper() in SCENE["objects"]
 
@@ -1483,6 +1626,167 @@ def _empty_spans_1d(occupied: list[tuple[float,float]], low: float, high: float)
         spans.append((cur, high))
     return spans
 
+# past this many candidate lines the segment-tree sweep beats scanning each
+# line's boxes one by one
+_LOS_DIRECT_LINES = 256
+
+def _los_candidate_lines(ivs: list, lines: list, low: float, high: float) -> list:
+    """
+    The lines of `lines` that can hold the longest empty span. A few sampled
+    lines give a span length every winner must reach; any span that long
+    contains a whole column of a grid 1/2.5 of it wide, so a line only counts
+    if it crosses some column where no box sits. Returns lines unchanged when
+    the grid would be too fine to prune anything.
+    """
+    if not ivs or len(lines) < 3:
+        return lines
+    bound = 0.0
+    for line in {lines[0], lines[-1], *lines[::max(1, len(lines) // 6)]}:
+        occ = [(a, b) for enter, leave, a, b in ivs if enter <= line <= leave]
+        for a, b in _empty_spans_1d(occ, low, high):
+            bound = max(bound, b - a)
+    width = bound / 2.5
+    if width <= 0 or (high - low) / width > 4 * math.sqrt(len(ivs)) + 16:
+        return lines
+    cols = int((high - low) // width)
+    # per column, the line ranges of the boxes that overlap its interior
+    cover = [[] for _ in range(cols)]
+    for enter, leave, a, b in ivs:
+        c0 = max(0, int((a - low) // width) - 1)
+        c1 = min(cols - 1, int((b - low) // width) + 1)
+        for c in range(c0, c1 + 1):
+            if a < low + (c + 1) * width and b > low + c * width:
+                cover[c].append((enter, leave))
+    keep = set()
+    for spans in cover:
+        spans.sort()
+        prev = None   # the covered lines so far end at prev
+        for enter, leave in spans:
+            if prev is None or enter > prev:
+                i = 0 if prev is None else bisect.bisect_right(lines, prev)
+                keep.update(lines[i:bisect.bisect_left(lines, enter)])
+                prev = leave
+            else:
+                prev = max(prev, leave)
+        keep.update(lines[0 if prev is None else bisect.bisect_right(lines, prev):])
+    return sorted(keep)
+
+def _sweep_empty_span_max(boxes: list, lines: list, low: float, high: float):
+    """
+    Longest empty span of [low, high] over the given scanlines, as
+    _empty_spans_1d finds it line by line. boxes are (enter, leave, a, b):
+    [a, b] is occupied on lines enter <= line <= leave. Drops the lines that
+    cannot win (_los_candidate_lines); if many are left, sweeps them in
+    order, adding and removing intervals in a segment tree over the interval
+    endpoints that keeps each node's empty runs. Returns (span, line, a, b)
+    for the first longest span (lowest line, then leftmost), or None.
+    """
+    if low > high: low, high = high, low
+    ivs = []
+    for enter, leave, a, b in boxes:
+        if enter <= leave and b > low and a < high:
+            a, b = max(low, a), min(high, b)
+            ivs.append((enter, leave, min(a, b), max(a, b)))
+    lines = _los_candidate_lines(ivs, lines, low, high)
+    if len(lines) <= _LOS_DIRECT_LINES:
+        best = None
+        for line in lines:
+            occ = [(a, b) for enter, leave, a, b in ivs if enter <= line <= leave]
+            for a, b in _empty_spans_1d(occ, low, high):
+                if b - a > (best[0] if best else 0.0):
+                    best = (b - a, line, a, b)
+        return best
+    coords = sorted({low, high, *(iv[2] for iv in ivs), *(iv[3] for iv in ivs)})
+    if len(coords) < 2:
+        return None
+    pos = {c: k for k, c in enumerate(coords)}
+    # leaf k is the gap (coords[k], coords[k+1]); padding leaves stay covered.
+    # A zero-width interval only blocks its point: it marks the leaf to its
+    # right as not joinable on the left.
+    segs = len(coords) - 1
+    size = 1
+    while size < segs: size *= 2
+    cnt = [0] * size + [0 if k < segs else 1 for k in range(size)]
+    points = [0] * segs
+    lo = [None] * (2 * size); hi = [None] * (2 * size)
+    lo[size:size + segs] = coords[:-1]
+    hi[size:size + segs] = coords[1:]
+    for i in range(size - 1, 0, -1):
+        lo[i] = lo[2 * i]
+        hi[i] = hi[2 * i + 1] if hi[2 * i + 1] is not None else hi[2 * i]
+    # per node: (all empty, end of empty prefix, start of empty suffix, best run)
+    COVERED = (False, None, None, None)
+    info = [COVERED] * (2 * size)
+    open_leaf = [(True, hi[size + k], lo[size + k], (hi[size + k] - lo[size + k], lo[size + k], hi[size + k]))
+                 for k in range(segs)]
+
+    def pull(i):
+        if cnt[i] > 0:
+            info[i] = COVERED
+        elif i >= size:
+            leaf = open_leaf[i - size]
+            info[i] = leaf if not points[i - size] else (False, None, leaf[2], leaf[3])
+        else:
+            fl, pl, sl, best = info[2 * i]
+            fr, pr, sr, br = info[2 * i + 1]
+            pre = (pr if pr is not None else hi[2 * i]) if fl else pl
+            suf = (sl if sl is not None else lo[2 * i + 1]) if fr else sr
+            # runs in left-to-right order: the left best, the run across the
+            # middle, the right best; a later run wins only if it is longer,
+            # or the same length from the same start (it extends the earlier)
+            if sl is not None and pr is not None:
+                cross = (pr - sl, sl, pr)
+                if best is None or cross[0] > best[0] or (cross[0] == best[0] and sl == best[1]):
+                    best = cross
+            if br is not None and (best is None or br[0] > best[0]):
+                best = br
+            info[i] = (fl and fr, pre, suf, best)
+
+    for i in range(2 * size - 1, 0, -1):
+        pull(i)
+
+    def update(a, b, delta):
+        if a == b:
+            k = pos[a]
+            if k == 0 or k == segs:
+                return
+            points[k] += delta
+            l, r = size + k, size + k
+            pull(l)
+        else:
+            l, r = size + pos[a], size + pos[b]
+            i, j = l, r - 1
+            while l < r:
+                if l & 1: cnt[l] += delta; pull(l); l += 1
+                if r & 1: r -= 1; cnt[r] += delta; pull(r)
+                l >>= 1; r >>= 1
+            l, r = i, j
+        # re-pull both boundary paths up to where they meet, then the shared
+        # path above that only while the nodes still change
+        l >>= 1; r >>= 1
+        while l != r:
+            pull(l); pull(r); l >>= 1; r >>= 1
+        pull(l); l >>= 1
+        while l:
+            old = info[l]
+            pull(l)
+            if info[l] == old: break
+            l >>= 1
+
+    enters = sorted(ivs, key=lambda iv: iv[0])
+    leaves = sorted(ivs, key=lambda iv: iv[1])
+    ei = li = 0
+    best = None
+    for line in lines:
+        while ei < len(enters) and enters[ei][0] <= line:
+            update(enters[ei][2], enters[ei][3], 1); ei += 1
+        while li < len(leaves) and leaves[li][1] < line:
+            update(leaves[li][2], leaves[li][3], -1); li += 1
+        run = info[1][3]
+        if run is not None and run[0] > (best[0] if best else 0.0):
+            best = (run[0], line, run[1], run[2])
+    return best
+
 def _scanline_empty_span_max(objs: dict, gw: float, gh: float) -> tuple[float, dict]:
     """
     Conservative LOS estimator (axis-aligned):
@@ -1501,33 +1805,15 @@ def _scanline_empty_span_max(objs: dict, gw: float, gh: float) -> tuple[float, d
         ys.update([t, b, o["y"]])
         xs.update([l, r, o["x"]])
 
-    # horizontal
-    max_h = 0.0; where_h = None
-    for y in sorted(ys):
-        occ = []
-        for (l,r,t,b) in rects.values():
-            if t <= y <= b:
-                occ.append((l, r))
-        empty = _empty_spans_1d(occ, 0.0, gw)
-        for a,b in empty:
-            span = b - a
-            if span > max_h:
-                max_h = span
-                where_h = {"y": float(y), "x0": float(a), "x1": float(b)}
+    # horizontal: box occupies [l, r] on lines t <= y <= b
+    hit = _sweep_empty_span_max([(t, b, l, r) for (l,r,t,b) in rects.values()], sorted(ys), 0.0, gw)
+    max_h = hit[0] if hit else 0.0
+    where_h = {"y": float(hit[1]), "x0": float(hit[2]), "x1": float(hit[3])} if hit else None
 
     # vertical
-    max_v = 0.0; where_v = None
-    for x in sorted(xs):
-        occ = []
-        for (l,r,t,b) in rects.values():
-            if l <= x <= r:
-                occ.append((t, b))
-        empty = _empty_spans_1d(occ, 0.0, gh)
-        for a,b in empty:
-            span = b - a
-            if span > max_v:
-                max_v = span
-                where_v = {"x": float(x), "y0": float(a), "y1": float(b)}
+    hit = _sweep_empty_span_max([(l, r, t, b) for (l,r,t,b) in rects.values()], sorted(xs), 0.0, gh)
+    max_v = hit[0] if hit else 0.0
+    where_v = {"x": float(hit[1]), "y0": float(hit[2]), "y1": float(hit[3])} if hit else None
 
     return max(max_h, max_v), {"max_h": max_h, "where_h": where_h, "max_v": max_v, "where_v": where_v}
 
@@ -1583,18 +1869,23 @@ def _edges(o):
 def _set_center(o, cx=None, cy=None):
     if cx is not None: o["x"] = snap_to_grid(cx)
     if cy is not None: o["y"] = snap_to_grid(cy)
+    _index_touch_obj(o)
 
 def _set_left(o, x_left):
     o["x"] = snap_to_grid(x_left + o["w"]/2)
+    _index_touch_obj(o)
 
 def _set_right(o, x_right):
     o["x"] = snap_to_grid(x_right - o["w"]/2)
+    _index_touch_obj(o)
 
 def _set_top(o, y_top):
     o["y"] = snap_to_grid(y_top + o["h"]/2)
+    _index_touch_obj(o)
 
 def _set_bottom(o, y_bottom):
     o["y"] = snap_to_grid(y_bottom - o["h"]/2)
+    _index_touch_obj(o)
 
 # Anchors: persistent % from canvas
 def engine_set_anchor(label: str, x_pct: float=None, y_pct: float=None):
@@ -1808,6 +2099,7 @@ def engine_resize_canvas(new_w: int, new_h: int, scale_sizes: bool = False):
             s = (sx + sy) / 2.0
             o["w"] = snap_to_grid(max(GRID_STEP, o["w"] * s))
             o["h"] = snap_to_grid(max(GRID_STEP, o["h"] * s))
+    invalidate_spatial_index()
 
 
 # ---------------- Router ----------------
@@ -1824,7 +2116,7 @@ def route_and_execute(command_batch: Dict, natural: str = "", merge_existing: bo
             snap_taken = True
 
     try:
-        commands = command_batch["commands"]
+        commands = _timed_commands(command_batch["commands"])
 
         for item in commands:
             tool = item["tool"]
@@ -1972,6 +2264,7 @@ def route_and_execute(command_batch: Dict, natural: str = "", merge_existing: bo
             elif tool == "add_ramp":
                 new_objs = tool_add_ramp(args, SCENE)
                 SCENE["objects"].update(new_objs)
+                _index_touch(*new_objs)
             elif tool == "move":
                 _maybe_snapshot()
                 if not args.get("target"):
@@ -2120,6 +2413,7 @@ def route_and_execute(command_batch: Dict, natural: str = "", merge_existing: bo
                             SCENE["objects"][t.upper()]["x"] = snap_to_grid(SCENE["grid_w"] / 2.0)
                         else:
                             SCENE["objects"][t.upper()]["y"] = snap_to_grid(SCENE["grid_h"] / 2.0)
+                        _index_touch(t.upper())
                     engine_solve_constraints()
                     print(f"[WARN] align with 1 target auto-upgraded to {side} centering for {t}")
                     continue
@@ -2301,18 +2595,21 @@ def route_and_execute(command_batch: Dict, natural: str = "", merge_existing: bo
                 if args.get("view") != "topdown":
                     fail("E_VIEW_REQUIRED", "render_svg must use view='topdown'")
                 seed = int(args.get("seed") or 0)
-                svg_path = _next_artifact_path(seed, "svg")
-                svg_path = engine_render_svg(path=svg_path, view="topdown", grid=bool(args.get("grid", True)))
+                svg_text = render_svg_text(view="topdown", grid=bool(args.get("grid", True)))
+                svg_path = persist_artifact(_next_artifact_path(seed, "svg"), svg_text)
                 out["svg"] = svg_path
+                out["svg_text"] = svg_text
                   # log artifact even if export doesn't follow in this plan
                 ARTIFACTS.append({"svg": svg_path})
 
             elif tool == "export_state":
 
                 seed = int(args.get("seed") or 0)
-                json_path = _next_artifact_path(seed, "json")
-                json_path = engine_export_state(path=json_path)
+                state = export_state_dict()
+                json_path = persist_artifact(_next_artifact_path(seed, "json"),
+                                             lambda: scene_json.dumpb(state, pretty=scene_json.PRETTY))
                 out["json"] = json_path
+                out["scene"] = state
                   # attach json to the last artifact if it doesn't have one yet
                 if ARTIFACTS and "json" not in ARTIFACTS[-1]:
                     ARTIFACTS[-1]["json"] = json_path
@@ -2428,38 +2725,358 @@ def _extract_placement(text: str) -> str:
     if re.search(r"\bcluster\b", text, re.I): return "cluster"
     return "random_nonoverlap"
 
+# ---------------- Local planner ----------------
+# Deterministic fast path for prompts that are a single plain edit
+# ("move A left 2", "undo", "align A B C lefts", "put Z between A and B",
+# "set height of B to 3", ...). plan_locally only answers when the whole
+# prompt matches one pattern and every label it names exists; anything else
+# returns None and goes to the model. ATLAS_LOCAL_PLANNER=0 turns it off.
+LOCAL_PLANNER = os.getenv("ATLAS_LOCAL_PLANNER", "1") != "0"
+
+_L = r"[A-Za-z][A-Za-z0-9_]*"
+_NUM = r"-?\d+(?:\.\d+)?"
+_LIST = rf"{_L}(?:\s*(?:,\s*(?:and\s+)?|\s+and\s+|\s*&\s*|\s+){_L})+?"
+_OBJ = r"(?:(?:the\s+)?(?:cube|square|rect|object|box)\s+)?"
+_UNIT = r"(?:\s*(?:m|meters?|metres?|units?))?"
+_MODES = {"left": "lefts", "right": "rights", "top": "tops", "bottom": "bottoms", "center": "centers"}
+
+_LOCAL_RULES = []
+
+def _local_rule(pattern):
+    # patterns are compiled on the first plan_locally call, not at import
+    def deco(fn):
+        _LOCAL_RULES.append((rf"^\s*{pattern}\s*[.!]?\s*$", fn))
+        return fn
+    return deco
+
+_COMPILED_RULES = []
+
+def _compiled_local_rules() -> list:
+    if len(_COMPILED_RULES) != len(_LOCAL_RULES):
+        _COMPILED_RULES[:] = [(re.compile(p, re.I), fn) for p, fn in _LOCAL_RULES]
+    return _COMPILED_RULES
+
+def _local_labels(text: str):
+    labels = [t.upper() for t in re.split(r"\s*(?:,|&|\band\b|\s)\s*", text) if t]
+    if len(set(labels)) != len(labels) or not all(_exists_label(L) for L in labels):
+        return None
+    return labels
+
+@_local_rule(r"(undo|redo)(?:\s+(?:that|it|the\s+last\s+(?:change|edit|step)))?")
+def _local_undo(m):
+    return [{"tool": m.group(1).lower(), "arguments": {}}]
+
+@_local_rule(rf"move\s+{_OBJ}({_L})\s+(left|right|up|down)\s+(?:by\s+)?({_NUM}){_UNIT}")
+def _local_move_dir(m):
+    if not _exists_label(m.group(1)):
+        return None
+    sx, sy = DIR_TO_DXY[m.group(2).lower()]
+    dist = float(m.group(3))
+    return [{"tool": "move", "arguments": {"target": m.group(1).upper(), "dx": sx * dist, "dy": sy * dist}}]
+
+@_local_rule(rf"move\s+{_OBJ}({_L})\s+by\s*\(?\s*({_NUM})(?:\s*,\s*|\s+)({_NUM})\s*\)?{_UNIT}")
+def _local_move_by(m):
+    if not _exists_label(m.group(1)):
+        return None
+    return [{"tool": "move", "arguments": {"target": m.group(1).upper(),
+                                          "dx": float(m.group(2)), "dy": float(m.group(3))}}]
+
+@_local_rule(rf"align\s+({_LIST})\s+(?:by\s+|to\s+)?(?:their\s+|the\s+)?(left|right|top|bottom)(?:s|\s+edges?)")
+def _local_align_edges(m):
+    labels = _local_labels(m.group(1))
+    mode = _MODES[m.group(2).lower()]
+    if not labels:
+        return None
+    return [{"tool": "align", "arguments": {
+        "targets": labels, "axis": "y" if mode in ("tops", "bottoms") else "x", "mode": mode}}]
+
+@_local_rule(rf"align\s+({_LIST})\s+(vertically|horizontally)\s+(?:by\s+)?(?:their\s+)?(centers|lefts|rights|tops|bottoms)")
+def _local_align_axis(m):
+    # same reading as _repair_plan: "vertically" lines the objects up along x
+    labels = _local_labels(m.group(1))
+    mode = m.group(3).lower()
+    if not labels:
+        return None
+    axis = "x" if m.group(2).lower() == "vertically" else "y"
+    if mode in ("tops", "bottoms"):
+        axis = "y"
+    elif mode in ("lefts", "rights"):
+        axis = "x"
+    return [{"tool": "align", "arguments": {"targets": labels, "axis": axis, "mode": mode}}]
+
+@_local_rule(rf"distribute\s+({_LIST})\s+(horizontally|vertically)\s+(?:with\s+)?(?:(equal\s+gaps?)|(?:spacing|equal\s+gaps?\s+of)\s+({_NUM}){_UNIT})")
+def _local_distribute(m):
+    labels = _local_labels(m.group(1))
+    if not labels or len(labels) < 3:
+        return None
+    args = {"targets": labels, "axis": "x" if m.group(2).lower() == "horizontally" else "y"}
+    if m.group(3):
+        args["mode"] = "equal_gaps"
+    else:
+        args.update(mode="fixed_spacing", spacing=_clamp_nonneg(m.group(4), default=0.0))
+    return [{"tool": "distribute", "arguments": args}]
+
+@_local_rule(rf"(?:put|place|move|center)\s+{_OBJ}({_L})\s+between\s+({_L})\s+(?:and|&)\s+({_L})(?:\s+(horizontally|vertically))?")
+def _local_between(m):
+    tgt, a, b = (g.upper() for g in m.group(1, 2, 3))
+    if len({tgt, a, b}) != 3 or not all(_exists_label(L) for L in (tgt, a, b)):
+        return None
+    axis = "y" if (m.group(4) or "").lower() == "vertically" else "x"
+    return [{"tool": "add_constraint", "arguments": {"kind": f"between_{axis}", "target": tgt, "a": a, "b": b}},
+            {"tool": "solve_constraints", "arguments": {}}]
+
+@_local_rule(rf"(?:set\s+(?:the\s+)?height\s+of\s+{_OBJ}({_L})|set\s+{_OBJ}({_L})(?:'s)?\s+height|make\s+{_OBJ}({_L}))"
+             rf"\s+(?:to\s+|=\s*)?({_NUM}){_UNIT}(\s+tall)?")
+def _local_set_height(m):
+    label = m.group(1) or m.group(2) or m.group(3)
+    if m.group(3) and not m.group(5):
+        return None     # "make A 3" without "tall" could mean anything
+    if not _exists_label(label):
+        return None
+    return [{"tool": "set_height", "arguments": {
+        "target": label.upper(), "height": _clamp_min(m.group(4), GRID_STEP)}}]
+
+@_local_rule(rf"(?:remove|delete)\s+{_OBJ}({_L})")
+def _local_remove(m):
+    if not _exists_label(m.group(1)):
+        return None
+    return [{"tool": "remove_object", "arguments": {"target": m.group(1).upper()}}]
+
+@_local_rule(rf"rename\s+{_OBJ}({_L})\s+(?:to|as)\s+({_L})")
+def _local_rename(m):
+    old, new = m.group(1).upper(), m.group(2).upper()
+    if not _exists_label(old) or _exists_label(new):
+        return None
+    return [{"tool": "rename_object", "arguments": {"target": old, "new_label": new}}]
+
+def plan_locally(natural: str) -> Dict | None:
+    """A complete CommandBatch for a simple edit prompt, or None if the model is needed."""
+    for rx, build in _compiled_local_rules():
+        m = rx.match(natural or "")
+        if m is None:
+            continue
+        commands = build(m)
+        if not commands:
+            return None
+        seed = prompt_seed(natural)
+        for cmd in commands:
+            cmd["arguments"].setdefault("seed", seed)
+        commands.append({"tool": "render_svg", "arguments": {"seed": seed, "view": "topdown"}})
+        commands.append({"tool": "export_state", "arguments": {"seed": seed}})
+        return {"commands": commands, "planner": "local"}
+    return None
+
+# ---------------- Plan cache ----------------
+# Planning is deterministic (temperature=0, seed derived from the prompt), so
+# the model's raw reply is cached under (normalized prompt, scene summary
+# hash, model, system prompt version) in a bounded in-memory LRU; entries
+# expire after PLAN_CACHE_TTL_S. ATLAS_PLAN_CACHE: "memory" (default),
+# "disk" to also keep one file per entry under PLAN_CACHE_DIR across
+# restarts, or "off".
+PLAN_CACHE_MODE = os.getenv("ATLAS_PLAN_CACHE", "memory").lower()
+PLAN_CACHE_DIR = os.getenv("ATLAS_PLAN_CACHE_DIR", ".atlas_plan_cache")
+PLAN_CACHE_SIZE = int(os.getenv("ATLAS_PLAN_CACHE_SIZE", "256"))
+PLAN_CACHE_DISK_MAX = int(os.getenv("ATLAS_PLAN_CACHE_DISK_MAX", "5000"))
+PLAN_CACHE_TTL_S = float(os.getenv("ATLAS_PLAN_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+def _normalize_prompt(natural: str) -> str:
+    return " ".join((natural or "").split()).casefold()
+
+class PlanCache:
+    """LRU of raw plan replies, optionally backed by a directory of JSON files."""
+    def __init__(self, mode=PLAN_CACHE_MODE, directory=PLAN_CACHE_DIR, size=PLAN_CACHE_SIZE,
+                 disk_max=PLAN_CACHE_DISK_MAX, ttl_s=PLAN_CACHE_TTL_S):
+        from collections import OrderedDict
+        self.mode, self.directory = mode, directory
+        self.size, self.disk_max, self.ttl_s = size, disk_max, ttl_s
+        self._mem = OrderedDict()   # key -> (created, raw)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "puts": 0,
+                      "evictions": 0, "expired": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("disk", "memory")
+
+    def key(self, natural: str, scene_summary: str, model: str) -> str:
+        summary_hash = hashlib.sha256(scene_summary.encode("utf-8")).hexdigest()
+        parts = [_normalize_prompt(natural), summary_hash, model or "", system_prompt_version()]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _remember(self, key, created, raw):
+        # caller holds _lock
+        self._mem[key] = (created, raw)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.size:
+            self._mem.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and now - hit[0] <= self.ttl_s:
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                return hit[1]
+            if hit is not None:
+                del self._mem[key]
+                self.stats["expired"] += 1
+        if self.mode == "disk":
+            try:
+                entry = scene_json.read(self._path(key))
+            except (OSError, ValueError):
+                entry = None
+            if isinstance(entry, dict) and now - float(entry.get("created", 0)) <= self.ttl_s:
+                with self._lock:
+                    self._remember(key, float(entry["created"]), entry["raw"])
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                return entry["raw"]
+            if entry is not None:
+                self._unlink(self._path(key))
+                with self._lock:
+                    self.stats["expired"] += 1
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, raw: str, model: str = "") -> None:
+        if not self.enabled:
+            return
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, raw)
+            self.stats["puts"] += 1
+        if self.mode == "disk":
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = self._path(key) + f".{uuid.uuid4().hex}.tmp"
+                scene_json.write(tmp, {"created": created, "model": model, "raw": raw}, pretty=False)
+                os.replace(tmp, self._path(key))
+                self._trim_disk()
+            except OSError as e:
+                print("Plan cache write failed:", e)
+
+    def _trim_disk(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        if len(entries) <= self.disk_max:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - self.disk_max]:
+            self._unlink(e.path)
+            with self._lock:
+                self.stats["evictions"] += 1
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+        if self.mode == "disk" and os.path.isdir(self.directory):
+            for e in os.scandir(self.directory):
+                if e.name.endswith(".json"):
+                    self._unlink(e.path)
+
+PLAN_CACHE = PlanCache()
+
+def system_prompt_version() -> str:
+    """Short hash of everything static the planner is sent; part of the cache key."""
+    text = static_system_prompt() + json.dumps(TOOL_PLAN_SCHEMA, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def _cached_plan(raw: str, seed: int) -> dict:
+    # a hit may come from a prompt that differs only in case/whitespace,
+    # whose derived seed was different
+    plan = json.loads(raw)
+    for cmd in plan.get("commands", []):
+        args = cmd.get("arguments")
+        if isinstance(args, dict) and "seed" in args:
+            args["seed"] = seed
+    return plan
+
+def scene_summary_text(natural: str) -> str:
+    if SCENE_ENCODING == "json":
+        return json.dumps(build_scene_summary(natural), ensure_ascii=False)
+    return encode_scene_state(natural)
+
+# The first message is byte-identical for every request so providers can
+# cache it as a prompt prefix; everything per-request (seed, scene state,
+# user text) comes after it.
+PLAN_RULES = (
+    "- Always include the request seed (given after these rules) in every tool call's arguments.\n"
+    "- Always end with render_svg(view='topdown') and export_state.\n"
+    "- For MOVE: require target + (dx,dy) or (direction + distance).\n"
+    "- For ALIGN: require targets + axis + mode.\n"
+    "- For DISTRIBUTE: require targets + axis + mode; spacing only if mode=fixed_spacing."
+)
+
+def static_system_prompt() -> str:
+    # Make sure SYSTEM_PROMPT exists in your notebook (the big rules string).
+    return (SYSTEM_PROMPT if 'SYSTEM_PROMPT' in globals() else "") + "\n\n" + PLAN_RULES
+
+def _plan_messages(natural: str, seed: int, scene_summary: str | None = None) -> list:
+    if scene_summary is None:
+        scene_summary = scene_summary_text(natural)
+    return [
+        {"role": "system", "content": static_system_prompt()},
+        {"role": "system", "content": f"Derived SEED for this request: {seed}"},
+        {"role": "system", "content": f"SCENE_STATE (read-only {'JSON' if SCENE_ENCODING == 'json' else 'table'}):\n{scene_summary}"},
+        {"role": "user", "content": natural},
+    ]
+
+# Token usage of planner calls; cached_tokens is the part of the prompt the
+# provider served from its prefix cache.
+PLANNER_USAGE = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+_USAGE_LOCK = threading.Lock()
+
+def _record_usage(usage) -> None:
+    details = getattr(usage, "prompt_tokens_details", None)
+    with _USAGE_LOCK:
+        PLANNER_USAGE["calls"] += 1
+        if usage is None:
+            return
+        PLANNER_USAGE["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        PLANNER_USAGE["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+        PLANNER_USAGE["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+
 def ask_agent_multi(natural: str, model: str = "gpt-4o") -> Dict:
     """
     Uses Chat Completions with Structured Outputs (JSON Schema).
     Returns: {"commands": [...]} exactly matching TOOL_PLAN_SCHEMA.
     """
-    # Make sure SYSTEM_PROMPT exists in your notebook (the big rules string).
     seed = prompt_seed(natural)
+    summary = scene_summary_text(natural)
+    key = PLAN_CACHE.key(natural, summary, model)
+    raw = PLAN_CACHE.get(key)
+    if raw is not None:
+        return {**_finish_plan(_cached_plan(raw, seed), natural, seed), "planner": "cache"}
+    messages = _plan_messages(natural, seed, summary)
+    with _engine_released(), _timed("llm"):
+        comp = client.chat.completions.create(
+            model=model,
+            temperature=0,
+            messages=messages,
+            response_format={"type": "json_schema", "json_schema": TOOL_PLAN_SCHEMA},
+        )
 
-    system = (
-        (SYSTEM_PROMPT if 'SYSTEM_PROMPT' in globals() else "")
-        + f"\n\nDerived SEED for this request: {seed}\n"
-           "- Always include this seed in every tool call's arguments.\n"
-          "- Always end with render_svg(view='topdown') and export_state.\n"
-          "- For MOVE: require target + (dx,dy) or (direction + distance).\n"
-          "- For ALIGN: require targets + axis + mode.\n"
-          "- For DISTRIBUTE: require targets + axis + mode; spacing only if mode=fixed_spacing."
-    )
-    scene_summary = json.dumps(build_scene_summary(natural), ensure_ascii=False)
-    comp = client.chat.completions.create(
-        model=model,
-        temperature=0,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "system", "content": f"SCENE_STATE (read-only JSON):\n{scene_summary}"},
-            {"role": "user", "content": natural},
-        ],
-        response_format={"type": "json_schema", "json_schema": TOOL_PLAN_SCHEMA},
-    )
-
+    _record_usage(getattr(comp, "usage", None))
     raw = comp.choices[0].message.content  # JSON string per schema
     plan = json.loads(raw)
+    PLAN_CACHE.put(key, raw, model)
+    return {**_finish_plan(plan, natural, seed), "planner": "llm"}
 
+def _finish_plan(plan: dict, natural: str, seed: int) -> dict:
     # Safety: enforce seed + topdown view for every command
     for cmd in plan.get("commands", []):
         args = cmd.setdefault("arguments", {})
@@ -2467,18 +3084,486 @@ def ask_agent_multi(natural: str, model: str = "gpt-4o") -> Dict:
         if cmd["tool"] == "render_svg":
             args["view"] = "topdown"
     # Enforce seed/view + repair missing edit args from the prompt
-    plan = _repair_plan(plan, natural, seed)
+    with _timed("repair"):
+        plan = _repair_plan(plan, natural, seed)
     return plan
 
+# ---------------- Streamed planning ----------------
+class _CommandStreamParser:
+    """
+    Incremental parser for a streamed CommandBatch.
+    feed() takes raw text chunks and returns the commands whose closing
+    brace arrived in that chunk, each already json-decoded.
+    """
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.in_commands = False
+        self.start = None
+
+    def feed(self, chunk: str) -> list:
+        self.buf += chunk
+        out = []
+        i = self.pos
+        buf = self.buf
+        while i < len(buf):
+            ch = buf[i]
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+            elif ch == '"':
+                self.in_str = True
+            elif ch in "{[":
+                self.depth += 1
+                if ch == "[" and self.depth == 2 and not self.in_commands:
+                    self.in_commands = True
+                elif ch == "{" and self.depth == 3 and self.in_commands:
+                    self.start = i
+            elif ch in "}]":
+                if ch == "}" and self.depth == 3 and self.start is not None:
+                    out.append(json.loads(buf[self.start:i + 1]))
+                    self.start = None
+                elif ch == "]" and self.depth == 2:
+                    self.in_commands = False
+                self.depth -= 1
+            i += 1
+        # drop consumed text that no open command still needs
+        keep = self.start if self.start is not None else i
+        self.buf = buf[keep:]
+        self.pos = i - keep
+        if self.start is not None:
+            self.start = 0
+        return out
+
+
+def _whole_plan_intent(natural: str) -> bool:
+    """True when _repair_plan would replace the model's plan outright (undo / between)."""
+    if re.search(r"\b(undo|reverse|revert|go back|back)\b", natural, re.I):
+        return True
+    return bool(re.search(r"\bbetween\s+([A-Za-z])\s+(?:and|&)\s+([A-Za-z])\b", natural, re.I)
+                and re.search(r"\b(?:cube|square|rect)?\s*([A-Za-z])\b.*?\bbetween\b", natural, re.I))
+
+
+def ask_agent_stream(natural: str, model: str = "gpt-4o", info: dict | None = None):
+    """
+    Streaming counterpart of ask_agent_multi.
+    Yields repaired commands one at a time as the completion streams in, so
+    route_and_execute can start on the first command before the last token.
+    Always finishes with render_svg + export_state.
+    info, if given, gets info["planner"] = "cache" or "llm".
+    """
+    info = {} if info is None else info
+    seed = prompt_seed(natural)
+    if _whole_plan_intent(natural):
+        # the repair step throws the model's plan away for these anyway
+        plan = ask_agent_multi(natural, model=model)
+        info["planner"] = plan["planner"]
+        yield from plan["commands"]
+        return
+    summary = scene_summary_text(natural)
+    key = PLAN_CACHE.key(natural, summary, model)
+    raw = PLAN_CACHE.get(key)
+    if raw is not None:
+        # nothing to stream: the cached plan is complete already
+        info["planner"] = "cache"
+        yield from _finish_plan(_cached_plan(raw, seed), natural, seed)["commands"]
+        return
+    info["planner"] = "llm"
+
+    messages = _plan_messages(natural, seed, summary)
+    t0 = time.perf_counter()
+    with _engine_released():
+        stream = iter(client.chat.completions.create(
+            model=model,
+            temperature=0,
+            messages=messages,
+            response_format={"type": "json_schema", "json_schema": TOOL_PLAN_SCHEMA},
+            stream=True,
+            stream_options={"include_usage": True},
+        ))
+    llm_s, repair_s = time.perf_counter() - t0, 0.0
+    parser = _CommandStreamParser()
+    seen = set()
+    received = []
+    usage = None
+    while True:
+        # other sessions may run while we wait on the network
+        t0 = time.perf_counter()
+        with _engine_released():
+            chunk = next(stream, None)
+        llm_s += time.perf_counter() - t0
+        if chunk is None:
+            break
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage     # final chunk when include_usage is set
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content
+        if not text:
+            continue
+        received.append(text)
+        for cmd in parser.feed(text):
+            if cmd.get("tool") not in ALLOWED_TOOLS:
+                cmd = {"tool": "report_error", "arguments": {
+                    "code": "E_TOOL_UNKNOWN", "message": f"Unknown tool: {cmd.get('tool')}"}}
+            args = cmd.setdefault("arguments", {})
+            args.setdefault("seed", seed)
+            if cmd["tool"] == "render_svg":
+                args["view"] = "topdown"
+            # repair one command at a time; keep the set_anchor it may prepend
+            # (once), drop the render/export it appends -- those come at the end
+            t0 = time.perf_counter()
+            repaired = _repair_plan({"commands": [cmd]}, natural, seed)["commands"]
+            repair_s += time.perf_counter() - t0
+            for c in repaired:
+                if c is not cmd and (c.get("tool") != "set_anchor" or "set_anchor" in seen):
+                    continue
+                seen.add(c.get("tool"))
+                yield c
+
+    _report_stage("llm", llm_s)
+    _report_stage("repair", repair_s)
+    _record_usage(usage)
+    raw = "".join(received)
+    try:
+        json.loads(raw)
+    except ValueError:
+        pass    # truncated or malformed stream: don't cache it
+    else:
+        PLAN_CACHE.put(key, raw, model)
+    if "render_svg" not in seen:
+        yield {"tool": "render_svg", "arguments": {"seed": seed, "view": "topdown"}}
+    if "export_state" not in seen:
+        yield {"tool": "export_state", "arguments": {"seed": seed}}
+
+
+# ---------------- Scene state for the planner ----------------
+# "compact" (default) sends the scene as a label,cx,cy,w,h table in integer
+# grid cells, filled in relevance order until SCENE_TOKEN_BUDGET (estimated
+# tokens) is used up. "json" keeps the older build_scene_summary JSON.
+SCENE_ENCODING = os.getenv("ATLAS_SCENE_ENCODING", "compact").lower()
+SCENE_TOKEN_BUDGET = int(os.getenv("ATLAS_SCENE_TOKEN_BUDGET", "2000"))
+_TOKEN_RX = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: words, 1-3 digit runs and punctuation count one each."""
+    return len(_TOKEN_RX.findall(text))
+
+def _cells(v) -> int:
+    return int(round(float(v) / GRID_STEP))
+
+class SpatialGrid:
+    """
+    Uniform-grid index over object centers. Each key lives in the bucket of
+    its center; `pad` remembers the largest half-extent seen so window
+    queries widen by it and still find every rectangle that overlaps.
+    nearest() walks rings of buckets outward and stops once no unseen bucket
+    can hold anything closer.
+    """
+    def __init__(self, cell: float = 4.0):
+        self.cell = max(float(cell), GRID_STEP)
+        self.buckets = {}
+        self.rects = {}
+        self.pad = 0.0
+        self.bounds = None   # (i0, j0, i1, j1) of buckets ever used
+        self.source = None   # the objects dict this index mirrors (spatial_index)
+
+    @classmethod
+    def from_objects(cls, objs: dict, cell: float | None = None,
+                     grid_w: float = 40.0, grid_h: float = 30.0) -> "SpatialGrid":
+        """Index objs. Without a cell size, one is picked for a grid_w x grid_h canvas."""
+        if cell is None:
+            area = grid_w * grid_h
+            # about four objects per bucket on an evenly filled canvas
+            cell = 2.0 * math.sqrt(area / max(len(objs), 1))
+        grid = cls(cell)
+        if not objs:
+            return grid
+        # bulk load: same result as insert() per object, without the
+        # per-call bookkeeping
+        c, floor, buckets = grid.cell, math.floor, grid.buckets
+        rects = grid.rects = {k: (o["x"], o["y"], o["w"], o["h"]) for k, o in objs.items()}
+        for k, (x, y, w, h) in rects.items():
+            cell_ = (int(floor(x / c)), int(floor(y / c)))
+            b = buckets.get(cell_)
+            if b is None:
+                buckets[cell_] = {k}
+            else:
+                b.add(k)
+        grid.pad = max(max(w, h) for _, _, w, h in rects.values()) / 2
+        grid.bounds = (min(i for i, _ in buckets), min(j for _, j in buckets),
+                       max(i for i, _ in buckets), max(j for _, j in buckets))
+        return grid
+
+    def _cell_of(self, x, y):
+        return int(math.floor(x / self.cell)), int(math.floor(y / self.cell))
+
+    def insert(self, key, x, y, w, h) -> None:
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = (x, y, w, h)
+        self.pad = max(self.pad, w / 2, h / 2)
+        i, j = self._cell_of(x, y)
+        self.buckets.setdefault((i, j), set()).add(key)
+        if self.bounds is None:
+            self.bounds = (i, j, i, j)
+        else:
+            i0, j0, i1, j1 = self.bounds
+            self.bounds = (min(i0, i), min(j0, j), max(i1, i), max(j1, j))
+
+    def remove(self, key) -> None:
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        cell = self._cell_of(rect[0], rect[1])
+        b = self.buckets.get(cell)
+        if b is not None:
+            b.discard(key)
+            if not b:
+                del self.buckets[cell]
+
+    def query(self, x0, y0, x1, y1) -> set:
+        """Keys whose rectangle intersects [x0,x1]x[y0,y1]."""
+        if self.bounds is None:
+            return set()
+        i0, j0 = self._cell_of(x0 - self.pad, y0 - self.pad)
+        i1, j1 = self._cell_of(x1 + self.pad, y1 + self.pad)
+        b0, c0, b1, c1 = self.bounds
+        i0, j0, i1, j1 = max(i0, b0), max(j0, c0), min(i1, b1), min(j1, c1)
+        found = set()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                for k in self.buckets.get((i, j), ()):
+                    x, y, w, h = self.rects[k]
+                    if x + w / 2 >= x0 and x - w / 2 <= x1 and y + h / 2 >= y0 and y - h / 2 <= y1:
+                        found.add(k)
+        return found
+
+    def nearest(self, x, y, k: int, exclude=()) -> list:
+        """Up to k keys ordered by center distance from (x, y)."""
+        if self.bounds is None or k <= 0:
+            return []
+        ci, cj = self._cell_of(x, y)
+        i0, j0, i1, j1 = self.bounds
+        max_r = max(ci - i0, i1 - ci, cj - j0, j1 - cj, 0)
+        best = []
+        for r in range(max_r + 1):
+            if r == 0:
+                ring = [(ci, cj)]
+            else:
+                ring = [(ci + d, cj + s) for d in range(-r, r + 1) for s in (-r, r)]
+                ring += [(ci + s, cj + d) for d in range(-r + 1, r) for s in (-r, r)]
+            for cell in ring:
+                for key in self.buckets.get(cell, ()):
+                    if key not in exclude:
+                        kx, ky = self.rects[key][:2]
+                        best.append((math.hypot(kx - x, ky - y), key))
+            if len(best) >= k:
+                best.sort()
+                del best[k:]
+                # every unvisited bucket is at least r cells from (x, y)
+                if best[-1][0] <= r * self.cell:
+                    break
+        best.sort()
+        return [key for _, key in best[:k]]
+
+
+# ---------------- Scene spatial index ----------------
+# One SpatialGrid per session over SCENE["objects"], built on the first
+# query. The engine keeps it current where it edits the scene: functions
+# that add, move, resize, rename or remove objects call _index_touch() with
+# the labels they changed, and whole-scene writes (_restore_scene, so undo
+# and redo, _reset_scene, engine_resize_canvas) drop it. A replaced objects
+# dict or a changed object count also forces a rebuild. Code that edits
+# SCENE without going through an engine function should call
+# invalidate_spatial_index().
+INDEX_CELL = max(GRID_STEP, GRID_STEP * round(float(os.getenv("ATLAS_INDEX_CELL_M", "4.0")) / GRID_STEP))
+
+def spatial_index() -> SpatialGrid:
+    """The current session's SpatialGrid, rebuilt if it is missing or stale."""
+    global SCENE_INDEX
+    objs = SCENE["objects"]
+    idx = SCENE_INDEX
+    if idx is None or idx.source is not objs or len(idx.rects) != len(objs):
+        idx = SCENE_INDEX = SpatialGrid.from_objects(objs, cell=INDEX_CELL)
+        idx.source = objs
+    return idx
+
+def invalidate_spatial_index() -> None:
+    global SCENE_INDEX
+    SCENE_INDEX = None
+
+def _index_refresh(labels) -> None:
+    idx = SCENE_INDEX
+    if idx is None:
+        return
+    objs = SCENE["objects"]
+    for L in labels:
+        o = objs.get(L)
+        if o is None:
+            idx.remove(L)
+        elif idx.rects.get(L) != (o["x"], o["y"], o["w"], o["h"]):
+            idx.insert(L, o["x"], o["y"], o["w"], o["h"])
+
+def _index_touch(*labels) -> None:
+    """Re-read labels into the index after an engine edit; free until it is built."""
+    if SCENE_INDEX is not None:
+        _index_refresh(labels)
+
+def _index_touch_obj(o: dict) -> None:
+    # the _set_* helpers get the object, not its key; objects loaded from an
+    # editor model may carry no (or a stale) label
+    if SCENE_INDEX is None:
+        return
+    L = o.get("label")
+    if SCENE["objects"].get(L) is o:
+        _index_refresh((L,))
+    else:
+        invalidate_spatial_index()
+
+def objects_in_rect(x0: float, y0: float, x1: float, y1: float) -> set:
+    """Labels whose footprint intersects the rectangle [x0,x1]x[y0,y1] (meters)."""
+    return spatial_index().query(x0, y0, x1, y1)
+
+def objects_overlapping(label: str, margin: float = 0.0) -> set:
+    """Labels L with _aabb_overlap(label, L, margin), excluding label itself."""
+    o = SCENE["objects"][label.upper()]
+    # _aabb_overlap grows both boxes by margin
+    x0, x1 = o["x"] - o["w"] / 2 - 2 * margin, o["x"] + o["w"] / 2 + 2 * margin
+    y0, y1 = o["y"] - o["h"] / 2 - 2 * margin, o["y"] + o["h"] / 2 + 2 * margin
+    hits = spatial_index().query(x0, y0, x1, y1)
+    hits.discard(label.upper())
+    objs = SCENE["objects"]
+    return {k for k in hits if _aabb_overlap(o, objs[k], margin)}
+
+def nearest_objects(x: float, y: float, k: int = 8, exclude=()) -> list:
+    """Up to k labels ordered by center distance from (x, y)."""
+    return spatial_index().nearest(x, y, k, exclude=set(exclude))
+
+
+_SUMMARY_KNN = 8
+# rows past the focus region ordered by distance; more than a token budget shows
+_SUMMARY_NEAR = 500
+_STOPWORDS = {"THE", "AND", "MOVE", "LEFT", "RIGHT", "DOWN", "ABOVE", "BELOW", "ALIGN", "BETWEEN",
+              "NEXT", "NEAR", "WITH", "FROM", "INTO", "ONTO", "THAT", "THIS", "THEM", "THEIR", "EDGE",
+              "EDGES", "NORTH", "SOUTH", "EAST", "WEST", "FRONT", "BACK", "SIDE", "CUBE", "SQUARE",
+              "RECT", "OBJECT", "OBJECTS", "HEIGHT", "WIDTH", "SIZE", "CENTER", "CENTRE", "ADD", "PUT",
+              "PLACE", "REMOVE", "DELETE", "RENAME", "SCALE", "MAKE", "SET", "UNDO", "REDO", "KEEP",
+              "DISTRIBUTE", "MIRROR", "STACK", "GAP", "GAPS", "EQUAL", "SPACING", "METERS", "TALL"}
+
+def mentioned_labels(natural: str) -> list:
+    """
+    Scene labels the prompt refers to, in order of appearance. Matches whole
+    labels (single letters, CASTLE_RUIN, "castle ruin", "castle-ruin"), then
+    label parts ("forest" -> FOREST_W, FOREST_E when few labels share it),
+    then close spellings of the remaining longer words.
+    """
+    objs = SCENE["objects"]
+    words = re.findall(r"[A-Za-z0-9]+", natural or "")
+    upper = [w.upper() for w in words]
+    found, used = {}, set()
+
+    def add(label, span):
+        found.setdefault(label, min(span))
+        used.update(span)
+
+    for n in (4, 3, 2, 1):
+        for i in range(len(upper) - n + 1):
+            span = range(i, i + n)
+            if used.intersection(span):
+                continue
+            cand = "_".join(upper[i:i + n])
+            if cand in objs and (n > 1 or len(cand) == 1 or cand not in _STOPWORDS):
+                add(cand, span)
+    rest = [(i, w) for i, w in enumerate(upper)
+            if i not in used and len(w) >= 4 and not w.isdigit() and w not in _STOPWORDS]
+    parts = {}
+    for label in objs if rest else ():
+        for part in label.split("_") if "_" in label else [label] * (len(label) >= 4):
+            parts.setdefault(part, []).append(label)
+    # parts shared by many labels (TREE_1..TREE_900) say nothing specific
+    parts = {p: ls for p, ls in parts.items() if p.isalpha() and len(ls) <= _SUMMARY_KNN}
+    for i, w in rest:
+        hit = w if w in parts else next(iter(difflib.get_close_matches(w, parts, n=1, cutoff=0.8)), None)
+        for label in parts.get(hit, ()):
+            add(label, [i])
+    return sorted(found, key=found.get)
+
+def _summary_order(natural: str) -> list:
+    """
+    Object keys in the order the planner should see them: mentioned labels,
+    then their nearest neighbours, then whatever overlaps the region they
+    span, then everything else by distance from that region.
+    """
+    objs = SCENE["objects"]
+    focus = mentioned_labels(natural)
+    if not focus:
+        return list(objs)
+    grid = spatial_index()
+    order, seen = list(focus), set(focus)
+    for k in focus:
+        o = objs[k]
+        for n in grid.nearest(o["x"], o["y"], _SUMMARY_KNN, exclude=seen):
+            order.append(n)
+            seen.add(n)
+    x0 = min(objs[k]["x"] - objs[k]["w"] / 2 for k in focus)
+    x1 = max(objs[k]["x"] + objs[k]["w"] / 2 for k in focus)
+    y0 = min(objs[k]["y"] - objs[k]["h"] / 2 for k in focus)
+    y1 = max(objs[k]["y"] + objs[k]["h"] / 2 for k in focus)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    dist = lambda k: math.hypot(objs[k]["x"] - cx, objs[k]["y"] - cy)
+    region = sorted(grid.query(x0, y0, x1, y1) - seen, key=dist)
+    order += region
+    seen.update(region)
+    rest = [k for k in objs if k not in seen]
+    near = heapq.nsmallest(_SUMMARY_NEAR, rest, key=dist)
+    order += near
+    seen.update(near)
+    order += [k for k in rest if k not in seen]
+    return order
+
+def encode_scene_state(natural: str, budget: int | None = None) -> str:
+    """Columnar SCENE_STATE table in grid cells, cut off at the token budget."""
+    budget = SCENE_TOKEN_BUDGET if budget is None else budget
+    objs = SCENE["objects"]
+    lines = [f"grid {_cells(SCENE['grid_w'])}x{_cells(SCENE['grid_h'])}", "label,cx,cy,w,h"]
+    used = sum(estimate_tokens(line) + 1 for line in lines)
+    order = _summary_order(natural)
+    shown = 0
+    for k in order:
+        o = objs[k]
+        row = f"{k},{_cells(o['x'])},{_cells(o['y'])},{_cells(o['w'])},{_cells(o['h'])}"
+        cost = estimate_tokens(row) + 1
+        if used + cost > budget:
+            break
+        lines.append(row)
+        used += cost
+        shown += 1
+    if shown < len(order):
+        lines.append(f"({len(order) - shown} more objects not shown)")
+    return "\n".join(lines)
+
+# the planner needs to know how to read the table (static, so part of the cached prefix)
+if SCENE_ENCODING != "json":
+    PLAN_RULES += (
+        "\n- SCENE_STATE is a table: a `grid W x H` line, then one `label,cx,cy,w,h` row per object."
+        f" All numbers are grid cells of {GRID_STEP} m: multiply by {GRID_STEP} for meters."
+        " cx,cy is the center; edges are cx-w/2, cx+w/2, cy-h/2, cy+h/2."
+        " Objects may be left out when the scene is large."
+    )
+
 def build_scene_summary(natural: str, max_items: int = 20) -> dict:
     # pick labels mentioned in the prompt (plus their neighbors if needed)
-    labels = set(re.findall(r"\b[A-Za-z]\b", natural))
-    labels = {L.upper() for L in labels}
     objs = SCENE["objects"]
-    keys = list(objs.keys())
-
-    # if no labels found, include up to max_items to keep context small
-    chosen = [k for k in keys if k in labels] or keys[:max_items]
+    # most relevant first: mentioned labels, their neighbours, then the rest
+    chosen = _summary_order(natural)[:max_items]
 
     def pack(o):
         x, y, w, h = o["x"], o["y"], o["w"], o["h"]
@@ -2496,6 +3581,139 @@ def build_scene_summary(natural: str, max_items: int = 20) -> dict:
     }
 
 
+# ---------------- Sessions ----------------
+# The engine works on the module globals below.  A SceneSession owns its own
+# copy of them; `with session.bound():` swaps them in for the calling thread
+# and holds the engine lock until the block exits.  Outside any bound()
+# block the globals belong to the default session, so notebook-style use
+# keeps working unchanged.
+#
+# Engine work is therefore serialized across sessions: only the model call
+# (_engine_released) overlaps between them.  Any new per-editor global must
+# be added to _SESSION_FIELDS or it is shared by every session;
+# tests/test_sessions.py fails for a `global` rebind that is not listed.
+_SESSION_FIELDS = (
+    ("SCENE", "scene"), ("HISTORY", "history"),
+    ("UNDO_STACK", "undo_stack"), ("REDO_STACK", "redo_stack"),
+    ("ARTIFACTS", "artifacts"), ("FRAME_ID", "frame_id"),
+    ("_LAST_OBJECT_LABEL", "last_object_label"),
+    ("LAST_REMOVED_BBOX", "last_removed_bbox"),
+    ("STATE", "state"), ("ARTIFACT_PREFIX", "artifact_prefix"),
+    ("SCENE_INDEX", "scene_index"),
+)
+_ENGINE_LOCK = threading.Lock()
+_ENGINE_TLS = threading.local()     # .session / .depth for the thread holding the lock
+
+SESSION_TTL_S = float(os.getenv("ATLAS_SESSION_TTL_S", "3600"))
+DEFAULT_SESSION_ID = "default"
+
+
+class SceneSession:
+    """
+    Scene, edit history and artifact counters for one editor. Sessions
+    isolate state; they do not run engine work in parallel (see above).
+    """
+    def __init__(self, session_id: str | None = None, grid_w=GRID_W, grid_h=GRID_H):
+        self.id = session_id or uuid.uuid4().hex
+        self.scene = {"grid_w": grid_w, "grid_h": grid_h, "objects": {},
+                      "constraints": [], "anchors": {}}
+        self.history, self.undo_stack, self.redo_stack, self.artifacts = [], [], [], []
+        self.frame_id = 0
+        self.last_object_label = None
+        self.last_removed_bbox = None
+        self.state = {"grid_w": float(grid_w), "grid_h": float(grid_h), "objects": {}}
+        self.scene_index = None
+        self.artifact_prefix = "scene_" + re.sub(r"[^A-Za-z0-9_-]", "_", self.id)[:32]
+        self.lock = threading.Lock()   # one prompt at a time per session
+        self.last_used = time.time()
+
+    @contextmanager
+    def bound(self):
+        if getattr(_ENGINE_TLS, "depth", 0):
+            if _ENGINE_TLS.session is not self:
+                raise RuntimeError("another SceneSession is already bound on this thread")
+            _ENGINE_TLS.depth += 1
+            try:
+                yield self
+            finally:
+                _ENGINE_TLS.depth -= 1
+            return
+        _ENGINE_LOCK.acquire()
+        _activate(self)
+        _ENGINE_TLS.session, _ENGINE_TLS.depth = self, 1
+        try:
+            yield self
+        finally:
+            self.last_used = time.time()
+            _ENGINE_TLS.session, _ENGINE_TLS.depth = None, 0
+            _activate(_DEFAULT_SESSION)
+            _ENGINE_LOCK.release()
+
+
+_DEFAULT_SESSION = SceneSession(DEFAULT_SESSION_ID)
+_DEFAULT_SESSION.artifact_prefix = "scene"
+_ACTIVE = [_DEFAULT_SESSION]        # whose state the module globals hold right now
+
+
+def _activate(sess: SceneSession) -> None:
+    # caller holds _ENGINE_LOCK (or is the single-threaded default user)
+    cur = _ACTIVE[0]
+    if cur is sess:
+        return
+    g = globals()
+    for name, attr in _SESSION_FIELDS:
+        setattr(cur, attr, g.get(name))
+    for name, attr in _SESSION_FIELDS:
+        g[name] = getattr(sess, attr)
+    _ACTIVE[0] = sess
+
+
+@contextmanager
+def _engine_released():
+    """Give up the engine lock around slow I/O (the LLM call) if this thread holds it."""
+    depth = getattr(_ENGINE_TLS, "depth", 0)
+    if not depth:
+        yield
+        return
+    sess = _ENGINE_TLS.session
+    _ENGINE_TLS.session, _ENGINE_TLS.depth = None, 0
+    _activate(_DEFAULT_SESSION)
+    _ENGINE_LOCK.release()
+    try:
+        yield
+    finally:
+        _ENGINE_LOCK.acquire()
+        _activate(sess)
+        _ENGINE_TLS.session, _ENGINE_TLS.depth = sess, depth
+
+
+_SESSIONS: dict[str, SceneSession] = {DEFAULT_SESSION_ID: _DEFAULT_SESSION}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(session_id: str | None = None, create: bool = True) -> SceneSession | None:
+    """Look up (or create) the session for an id; None/"" means the default session."""
+    sid = str(session_id or DEFAULT_SESSION_ID)
+    now = time.time()
+    with _SESSIONS_LOCK:
+        for k in [k for k, s in _SESSIONS.items()
+                  if k != DEFAULT_SESSION_ID and now - s.last_used > SESSION_TTL_S]:
+            del _SESSIONS[k]
+        sess = _SESSIONS.get(sid)
+        if sess is None and create:
+            sess = _SESSIONS[sid] = SceneSession(sid)
+        if sess is not None:
+            sess.last_used = now
+        return sess
+
+
+def drop_session(session_id: str) -> bool:
+    if session_id == DEFAULT_SESSION_ID:
+        return False
+    with _SESSIONS_LOCK:
+        return _SESSIONS.pop(session_id, None) is not None
+
+
 # ---------------- Runner ----------------
 def _normalize_editor_model(model: dict) -> dict:
     """Normalize editor JSON into engine scene format."""
@@ -2533,11 +3751,37 @@ def _load_scene_from_model(model: dict | None) -> None:
     _restore_scene(state)
 
 
-def run_prompt(prompt: str, model: str | None = None, base_model: dict | None = None) -> dict:
+def _stepped(commands, on_step):
+    # route_and_execute pulls the next command only once the previous one
+    # has finished, so resuming here means `prev` has been applied.
+    prev = None
+    for cmd in commands:
+        if prev is not None:
+            on_step(prev)
+        prev = cmd
+        yield cmd
+    if prev is not None:
+        on_step(prev)
+
+
+def run_prompt(prompt: str, model: str | None = None, base_model: dict | None = None,
+               stream: bool = False, on_step=None, session: "SceneSession | str | None" = None) -> dict:
     """
     Takes current scene JSON (base_model), merges agent edits into it.
-    Returns {"svg": "...", "json": "..."}.
+    Returns {"svg": path, "json": path, "svg_text": str, "scene": dict,
+    "planner": "local" | "cache" | "llm"}; the paths are None when
+    ATLAS_PERSIST_ARTIFACTS=off.
+    stream=True executes commands as they arrive from the model;
+    on_step(cmd) is called after each command has been applied to SCENE.
+    session (a SceneSession or session id) selects whose scene is edited;
+    the default session is the module-level SCENE.
     """
+    sess = session if isinstance(session, SceneSession) else get_session(session)
+    with sess.lock, sess.bound():
+        return _run_prompt_bound(prompt, model, base_model, stream, on_step)
+
+
+def _run_prompt_bound(prompt, model, base_model, stream, on_step) -> dict:
     # load current scene if provided
     if base_model:
         try:
@@ -2545,19 +3789,62 @@ def run_prompt(prompt: str, model: str | None = None, base_model: dict | None =
         except Exception as e:
             print("Failed to load base_model:", e)
 
-    # interpret user command
-    commands = ask_agent_multi(prompt, model=(model or OPENAI_AGENT_MODEL))
+    # interpret user command: local fast path first, then cache / model
+    info = {}
+    with _timed("plan_local"):
+        commands = plan_locally(prompt) if LOCAL_PLANNER else None
+    if commands is not None:
+        info["planner"] = "local"
+    elif stream:
+        commands = {"commands": ask_agent_stream(prompt, model=(model or OPENAI_AGENT_MODEL), info=info)}
+    else:
+        commands = ask_agent_multi(prompt, model=(model or OPENAI_AGENT_MODEL))
+        info["planner"] = commands.get("planner")
+    if on_step is not None:
+        commands = {"commands": _stepped(commands["commands"], on_step)}
 
     # execute and update existing scene rather than replacing it
     outputs = route_and_execute(commands, prompt, merge_existing=True)
 
-    return {k: v for k, v in outputs.items() if k in ("svg", "json")}
+    out = {k: v for k, v in outputs.items() if k in ("svg", "json", "svg_text", "scene")}
+    out["planner"] = info.get("planner")
+    return out
 
 
+BATCH_CONCURRENCY = int(os.getenv("ATLAS_BATCH_CONCURRENCY", "8"))
 
 
+def run_prompts(items: list, model: str | None = None, concurrency: int | None = None) -> list:
+    """
+    Run many independent prompts, each against its own throwaway scene.
+    items: dicts {"prompt": str, "base_model": dict | None}.
+    Up to `concurrency` items (default ATLAS_BATCH_CONCURRENCY) are in flight
+    at once; engine work still runs one item at a time, but model calls
+    overlap because the engine lock is released around them.
+    Returns one entry per item, in order: {"ok": True, **run_prompt(...)}
+    or {"ok": False, "error": "..."}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def one(item):
+        try:
+            prompt = (item.get("prompt") or "").strip()
+            if not prompt:
+                return {"ok": False, "error": "Missing 'prompt'"}
+            # not registered in _SESSIONS, so nothing outlives the item
+            sess = SceneSession()
+            return {"ok": True, **run_prompt(prompt, model=model, base_model=item.get("base_model"),
+                                             session=sess)}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    workers = max(1, min(concurrency or BATCH_CONCURRENCY, len(items) or 1))
+    if workers == 1:
+        return [one(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        return list(pool.map(one, items))
+
 
-import re
 
 DIR_TO_DXY = {
     "left":  (-1.0, 0.0),
@@ -2910,165 +4197,6 @@ def _repair_plan(plan: dict, natural: str, seed: int) -> dict:
 
 
 
-# ---- New Cell ----
-
-# --- Blender MCP socket sender + delta applier for "objects" JSON schema
-
-import json, socket, os, copy, time
-from pathlib import Path
-
-MCP_HOST = "localhost"
-MCP_PORT = 9876
-STATE_FILE = Path(".atlas_last_scene_state.json")  # persists across cells
-
-def _send_to_blender_mcp(payload: dict, host=MCP_HOST, port=MCP_PORT, timeout=5):
-    """Send a JSON command batch to the already-open Blender MCP add-on."""
-    data = (json.dumps(payload) + "\n").encode("utf-8")  # newline-terminated
-    with socket.create_connection((host, port), timeout=timeout) as s:
-        s.sendall(data)
-        # (Optional) read a short reply if the add-on responds
-        try:
-            s.shutdown(socket.SHUT_WR)
-            reply = s.recv(65536)
-            if reply:
-                print("MCP reply:", reply.decode("utf-8", errors="ignore")[:500])
-        except Exception:
-            pass
-
-def _load_objects_from_json(json_path: str) -> dict:
-    """Return the 'objects' dict; if file has 'commands' only, synthesize objects from add_object commands."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        spec = json.load(f)
-    if "objects" in spec and isinstance(spec["objects"], dict):
-        return copy.deepcopy(spec["objects"])
-    # fallback: build objects from add_object commands (best-effort)
-    objs = {}
-    for c in spec.get("commands", []):
-        if c.get("tool") == "add_object":
-            a = c.get("arguments", {}) or {}
-            label = a.get("label") or a.get("name") or f"Obj{len(objs)+1}"
-            objs[label] = {
-                "primitive": a.get("primitive", "cube"),
-                "x": a.get("x", 0.0), "y": a.get("y", 0.0), "z": a.get("z", 0.0),
-                "w": a.get("w") or a.get("width") or a.get("size") or 1.0,
-                "h": a.get("h") or a.get("depth") or a.get("size") or 1.0,
-                "height": a.get("height") or a.get("size") or 1.0,
-            }
-    return objs
-
-def _norm(obj: dict):
-    """Normalize numeric fields to floats and provide defaults."""
-    return {
-        "primitive": obj.get("primitive", "cube"),
-        "x": float(obj.get("x", 0.0)),
-        "y": float(obj.get("y", 0.0)),
-        "z": float(obj.get("z", 0.0)),
-        "w": float(obj.get("w") or obj.get("width") or obj.get("size") or 1.0),
-        "h": float(obj.get("h") or obj.get("depth") or obj.get("size") or 1.0),
-        "height": float(obj.get("height") or obj.get("size") or 1.0),
-    }
-
-def _build_delta_commands(prev_objs: dict, curr_objs: dict):
-    """
-    Compare prev vs curr 'objects' dicts. Emit:
-      - add_object for new labels
-      - move for position deltas
-      - resize (via scale-by-dimension) for dimension deltas
-    """
-    commands = []
-
-    # 1) Adds for new objects
-    for label, o in curr_objs.items():
-        if label not in prev_objs:
-            oN = _norm(o)
-            commands.append({
-                "tool": "add_object",
-                "arguments": {
-                    "label": label,
-                    "primitive": oN["primitive"],
-                    "x": oN["x"], "y": oN["y"], "z": oN["z"],
-                    "w": oN["w"], "h": oN["h"], "height": oN["height"],
-                }
-            })
-
-    # 2) Moves & resizes for existing objects
-    def _ne(a,b,eps=1e-6): return abs(a-b) > eps
-
-    for label, oCurr in curr_objs.items():
-        if label not in prev_objs:
-            continue
-        a = _norm(prev_objs[label]); b = _norm(oCurr)
-
-        # position delta
-        dx, dy, dz = b["x"]-a["x"], b["y"]-a["y"], b["z"]-a["z"]
-        if _ne(dx,0.0) or _ne(dy,0.0) or _ne(dz,0.0):
-            commands.append({
-                "tool": "move",
-                "arguments": {"label": label, "dx": dx, "dy": dy, "dz": dz}
-            })
-
-        # size delta (emit a "resize_to" custom op that your MCP add-on should understand; if not, we can fall back to delete+add)
-        if _ne(a["w"], b["w"]) or _ne(a["h"], b["h"]) or _ne(a["height"], b["height"]):
-            commands.append({
-                "tool": "resize_to",
-                "arguments": {"label": label, "w": b["w"], "h": b["h"], "height": b["height"]}
-            })
-
-    # 3) (Optional) Deletes for removed objects
-    for label in prev_objs.keys() - curr_objs.keys():
-        commands.append({"tool": "delete", "arguments": {"label": label}})
-
-    return commands
-
-def _load_prev_state():
-    if STATE_FILE.exists():
-        try:
-            return json.loads(STATE_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    return {}
-
-def _save_state(objs: dict):
-    STATE_FILE.write_text(json.dumps(objs, indent=2), encoding="utf-8")
-
-def apply_scene_delta(json_path: str, reset_if_empty=True):
-    """Compute delta from last state and push only the edits to Blender via MCP."""
-    curr = _load_objects_from_json(json_path)
-
-    # Normalize all
-    currN = {k:_norm(v) for k,v in curr.items()}
-    prevN = _load_prev_state()
-
-    # First run? Do a reset + full add to ensure clean slate.
-    if not prevN and reset_if_empty:
-        cmds = []
-        cmds.append({"tool": "reset_scene", "arguments": {}})  # let add-on clear the scene, set meters, etc.
-        for label, o in currN.items():
-            cmds.append({
-                "tool":"add_object",
-                "arguments":{"label":label,"primitive":o["primitive"],
-                             "x":o["x"],"y":o["y"],"z":o["z"],
-                             "w":o["w"],"h":o["h"],"height":o["height"]}
-            })
-        payload = {"commands": cmds}
-        _send_to_blender_mcp(payload)
-        _save_state(currN)
-        print(f"Applied initial scene: {len(cmds)-1} objects.")
-        return
-
-    # Subsequent runs: compute delta
-    cmds = _build_delta_commands(prevN, currN)
-    if not cmds:
-        print("No changes detected.")
-        return
-
-    payload = {"commands": cmds}
-    _send_to_blender_mcp(payload)
-    _save_state(currN)
-    print(f"Applied {len(cmds)} change(s).")
-
-
-
 def tool_add_ramp(args: dict, scene: dict):
     """
     Modes:
@@ -3246,631 +4374,32 @@ def tool_add_ramp(args: dict, scene: dict):
         raise ValueError("E_ARGS: mode must be 'between' or 'side'")
 
 
-# Import a JSON from outsource
-# ==== UNIVERSAL PLAN JSON IMPORTER ===========================================
-# Converts ANY reasonable top-down plan JSON into your agent's command batch:
-# - Auto-detects units & scale; supports px/cm/m (+ optional scale bar in meta)
-# - Finds "objects" anywhere; supports rect/circle/ellipse/polygon/polyline/line
-# - Everything -> axis-aligned rectangle footprint; preserves label & height if present
-# - Snaps all dimensions/positions to your 0.5 m grid
-# - Finishes with render_svg + export_state
-#
-# Usage:
-#   outs = import_any_topdown_json_and_build(plan_json_str, write_to_watch=True)
-#   print(outs.get("svg"), outs.get("json"))
-
-import math, json, os
-
-GRID_CELL = 0.5     # your system's snap size (meters)
-DEFAULT_H = 0.5     # fallback height if none is given (meters)
-# ---- Pixel-faithful profile toggles ----
-SNAP_POSITIONS = True     # snap centers to grid
-SNAP_SIZES = False             # do NOT snap sizes
-REBASE_TO_MARGIN = False    # no re-base; keep original px origin
-MARGIN_M = 0.0
-AUTO_CANVAS_POLICY = "resize_scene"  # critical
-MAX_GRID_W = 400.0
-MAX_GRID_H = 400.0
-# Keep real heights; no plan cap by default (set to e.g. 0.20 if you want)
-PLAN_MAX_H = None
-
-# Accept only these shapes (unknowns skipped unless they provide x,y,w,h)
-ACCEPTED_TYPES = {"rect", "circle", "ellipse", "polygon", "polyline"}
-def _snap_pos(v, step=GRID_CELL):
-    return round(float(v)/step)*step if SNAP_POSITIONS else float(v)
-
-def _snap_size(v, step=GRID_CELL):
-    return round(float(v)/step)*step if SNAP_SIZES else float(v)
-
-def _canvas_px(plan, default=(800, 800)):
-    cv = plan.get("canvas") or {}
-    if "width" in cv and "height" in cv:
-        return float(cv["width"]), float(cv["height"])
-    vb = cv.get("viewBox") or cv.get("viewbox")
-    if isinstance(vb, (list, tuple)) and len(vb) == 4:
-        return float(vb[2]), float(vb[3])
-    return default
-def _label_from(entry):
-    o, k = entry["node"], entry["key"]
-    # preserve verbatim (no uppercasing)
-    return str(o.get("label") or o.get("id") or k or "OBJ")
-
-def _apply_height_cap(h):
-    return min(h, PLAN_MAX_H) if PLAN_MAX_H else h
-
-
-def _looks_like_room(ow, ia):
-    if not (ow and ia): 
-        return False
-    try:
-        xO,yO,wO,hO = float(ow["x"]), float(ow["y"]), float(ow["w"]), float(ow["h"])
-        xI,yI,wI,hI = float(ia["x"]), float(ia["y"]), float(ia["w"]), float(ia["h"])
-    except Exception:
-        return False
-    inside = (xO < xI) and (yO < yI) and (xO+wO > xI+wI) and (yO+hO > yI+hI)
-    min_thick = max(1e-6, min(wO, hO) * 0.02)  # 2% thickness floor
-    thick_ok  = (wO - wI) > min_thick and (hO - hI) > min_thick
-    return inside and thick_ok
-
-def _snap(v, step=GRID_CELL): 
-    return round(float(v)/step)*step
-
-def _units_to_m_per_px(units: str) -> float:
-    """
-    Returns meters per "pixel-like" unit. If units are physical, returns scale accordingly.
-    - 'm'   -> 1.0 (already meters)
-    - 'cm'  -> 0.01
-    - 'mm'  -> 0.001
-    - 'px'  -> derived separately from scale bar, else default 100 px ≈ 1 m
-    - unknown -> assume px (100 px ≈ 1 m)
-    """
-    if not units: 
-        # treat as px; m/px resolved later
-        return None
-    u = str(units).strip().lower()
-    if u in ("m", "meter", "meters"):
-        return 1.0
-    if u in ("cm", "centimeter", "centimeters"):
-        return 0.01
-    if u in ("mm", "millimeter", "millimeters"):
-        return 0.001
-    if u in ("px", "pixel", "pixels"):
-        return None  # defer to scale bar/default
-    # unknown → treat as px
-    return None
-
-def _m_per_px_from_meta(plan: dict) -> float:
-    """Use meta.approx_scale_bar.length_px ≈ 1 m if present, else default 100 px/m."""
-    meta = (plan.get("meta") or {})
-    sb = (meta.get("approx_scale_bar") or {})
-    if isinstance(sb, dict) and "length_px" in sb:
-        try:
-            px = float(sb["length_px"])
-            if px > 0:
-                return 1.0 / px
-        except:
-            pass
-    # default: 100 px ≈ 1 m
-    return 1.0 / 100.0
-
-def _resolve_scale(plan: dict):
-    """
-    Returns (m_per_unit, is_px_like).
-
-    Heuristic:
-    - If many nodes look like agent objects (have 'primitive' and 'height' and x,y,w,h),
-      assume meters (1.0) and not px-like.
-    - Else use explicit units if present, else fall back to px-like via meta/defaults.
-    """
-    # quick probe for agent-style objects
-    def _probe_agentish(nodes):
-        hits = 0; total = 0
-        for n in nodes:
-            if isinstance(n, dict):
-                total += 1
-                if all(k in n for k in ("x","y","w","h")) and ("primitive" in n) and ("height" in n):
-                    hits += 1
-        return hits, total
-
-    # collect a shallow sample of dict values from plan
-    sample_vals = []
-    if isinstance(plan, dict):
-        sample_vals.extend(v for v in plan.values() if isinstance(v, dict))
-        obj = plan.get("objects")
-        if isinstance(obj, dict):
-            sample_vals.extend(list(obj.values())[:20])
-        elif isinstance(obj, list):
-            sample_vals.extend([v for v in obj if isinstance(v, dict)][:20])
-
-    hits, total = _probe_agentish(sample_vals)
-    if total and hits/total >= 0.4:   # 40% look agent-style → assume meters
-        return 1.0, False
-
-    # else use declared units / px-like path
-    units = (plan.get("units") or plan.get("unit") or "").strip().lower()
-    m_per_unit = _units_to_m_per_px(units)
-    if m_per_unit is not None:
-        return m_per_unit, False
-    return _m_per_px_from_meta(plan), True
-
-def _bbox_from_rect(o):
-    # rect with top-left x,y and w,h
-    return float(o["x"]), float(o["y"]), float(o["w"]), float(o["h"])
-
-def _bbox_from_circle(o):
-    cx, cy, r = float(o["cx"]), float(o["cy"]), float(o["r"])
-    x = cx - r; y = cy - r; w = 2*r; h = 2*r
-    return x, y, w, h
-
-def _bbox_from_ellipse(o):
-    cx, cy, rx, ry = float(o["cx"]), float(o["cy"]), float(o["rx"]), float(o["ry"])
-    x = cx - rx; y = cy - ry; w = 2*rx; h = 2*ry
-    return x, y, w, h
-
-def _bbox_from_points(points):
-    xs = [p[0] for p in points]; ys = [p[1] for p in points]
-    x0, y0 = min(xs), min(ys); x1, y1 = max(xs), max(ys)
-    return x0, y0, (x1 - x0), (y1 - y0)
-
-def _parse_points_any(o):
-    """
-    Accepts:
-      - list of [x,y] pairs in o["points"]
-      - SVG-like "points" string "x1,y1 x2,y2 ..."
-      - explicit bbox dict in o["bbox"] = {x,y,w,h}
-    """
-    if "bbox" in o and isinstance(o["bbox"], dict):
-        b = o["bbox"]; 
-        if all(k in b for k in ("x","y","w","h")):
-            return float(b["x"]), float(b["y"]), float(b["w"]), float(b["h"])
-    pts = o.get("points")
-    if isinstance(pts, str):
-        try:
-            arr = []
-            for token in pts.strip().split():
-                xy = token.split(",")
-                if len(xy) == 2:
-                    arr.append((float(xy[0]), float(xy[1])))
-            if arr:
-                return _bbox_from_points(arr)
-        except:
-            return None
-    if isinstance(pts, list) and pts and isinstance(pts[0], (list, tuple)):
-        try:
-            return _bbox_from_points([(float(a), float(b)) for a,b in pts])
-        except:
-            return None
-    return None
-
-def _bbox_from_line(o):
-    # line: (x1,y1)→(x2,y2). thickness from strokeWidth if any (else small).
-    x1, y1, x2, y2 = float(o["x1"]), float(o["y1"]), float(o["x2"]), float(o["y2"])
-    stroke = float(o.get("strokeWidth", o.get("stroke_width", 0.0)) or 0.0)
-    x0, x1m = min(x1,x2), max(x1,x2)
-    y0, y1m = min(y1,y2), max(y1,y2)
-    w = max(1e-6, x1m - x0); h = max(1e-6, y1m - y0)
-    # inflate minimally by stroke to avoid zero-height rectangles
-    w = max(w, stroke); h = max(h, stroke)
-    return x0, y0, w, h
-def _bbox_from_generic(o):
-    t = (o.get("type") or o.get("shape") or "").strip().lower()
-
-    try:
-        if t == "rect":
-            return float(o["x"]), float(o["y"]), float(o["w"]), float(o["h"])
-        if t == "circle":
-            cx, cy, r = float(o["cx"]), float(o["cy"]), float(o["r"])
-            d = 2.0 * r
-            return (cx - r), (cy - r), d, d
-        if t == "ellipse":
-            cx, cy, rx, ry = float(o["cx"]), float(o["cy"]), float(o["rx"]), float(o["ry"])
-            return (cx - rx), (cy - ry), 2.0*rx, 2.0*ry
-        if t in ("polygon", "polyline"):
-            return _parse_points_any(o)
-    except Exception:
-        return None
-
-    # Agent-style: center-based if primitive present
-    if "primitive" in o and all(k in o for k in ("x","y","w","h")):
-        try:
-            return _bbox_from_agent_center(o)
-        except Exception:
-            return None
-
-    # Fallback: top-left bbox if explicitly provided
-    if all(k in o for k in ("x","y","w","h")):
-        try:
-            return float(o["x"]), float(o["y"]), float(o["w"]), float(o["h"])
-        except Exception:
-            return None
-
-    return None
-
-def _bbox_from_agent_center(o):
-    cx, cy = float(o["x"]), float(o["y"])
-    w, h   = float(o["w"]), float(o["h"])
-    return cx - w/2.0, cy - h/2.0, w, h
-
-
-def _extract_height(o):
-    """
-    Preserve any height-like info if present (meters if plan units were meters; else scaled).
-    Checks common keys: height, z, z_height, H, thickness, elevation (as height of object, not base).
-    """
-    for k in ("height","z_height","H","thickness","z","elevation"):
-        if k in o:
-            try:
-                return float(o[k])
-            except:
-                continue
-    return None
-
-def _collect_objects_anywhere(plan: dict):
-    """
-    Returns (structurals, items, details) with key hints preserved.
-    - structurals: things under plan["room"] like outer_wall/inner_area/window/door (used to build wall bands)
-    - items: plan["objects"] (furniture etc.)
-    - details: tiny extras we still want (e.g., door leaf)
-    Each entry is dict: {"node": o, "key": key_hint}
-    """
-    structurals, items, details = [], [], []
-
-    def visit(node, key_hint=None, in_room=False, in_objects=False):
-        if isinstance(node, dict):
-            # Consider as drawable if it looks like a shape
-            looks_like_shape = (node.get("type") or
-                                any(k in node for k in ("x","y","w","h","cx","cy","r","rx","ry","points","x1","y1","x2","y2","bbox")))
-            if looks_like_shape:
-                entry = {"node": node, "key": key_hint}
-                if in_room:
-                    structurals.append(entry)
-                elif in_objects:
-                    items.append(entry)
-                else:
-                    details.append(entry)
-            for k, v in node.items():
-                visit(v, key_hint=k, in_room=in_room or (key_hint=="room"), in_objects=in_objects or (key_hint=="objects"))
-        elif isinstance(node, list):
-            for v in node:
-                visit(v, key_hint=key_hint, in_room=in_room, in_objects=in_objects)
-
-    # Prefer explicit sections
-    if isinstance(plan.get("objects"), list):
-        for o in plan["objects"]:
-            items.append({"node": o, "key": o.get("id") or o.get("label") or "OBJ"})
-    if isinstance(plan.get("room"), dict):
-        visit(plan["room"], key_hint="room", in_room=True)
-
-    # Light sweep for details (but not to duplicate items/room we already got)
-    visit(plan)
-
-    # Dedup by object id
-    def _dedup(lst):
-        seen = set(); out=[]
-        for e in lst:
-            oid = id(e["node"])
-            if oid not in seen:
-                seen.add(oid); out.append(e)
-        return out
-    return _dedup(structurals), _dedup(items), _dedup(details)
-
-def _canvas_size(plan, m_per_unit, is_px_like, scene_bb_m=None, margin_m=1.0):
-    """
-    Decide grid_w/h (meters).
-    - If canvas exists, use it but ensure it is big enough to include scene_bb_m + margins.
-    - If no canvas or too small, auto-fit to scene bounds + margins.
-    - Snap to GRID_CELL.
-    scene_bb_m: (minx, miny, maxx, maxy) in meters (already scaled)
-    """
-    def _snap_up(v):  # snap outward so bounds fit
-        return math.ceil(float(v)/GRID_CELL)*GRID_CELL
-
-    want_w = want_h = None
-    if scene_bb_m:
-        minx, miny, maxx, maxy = scene_bb_m
-        raw_w = max(0.5, (maxx - minx) + 2*margin_m)
-        raw_h = max(0.5, (maxy - miny) + 2*margin_m)
-        want_w, want_h = _snap_up(raw_w), _snap_up(raw_h)
-
-    # Try to read incoming canvas
-    canvas = plan.get("canvas") or {}
-    W = H = None
-    if all(k in canvas for k in ("width","height")):
-        W = float(canvas["width"]); H = float(canvas["height"])
-        if is_px_like:
-            W, H = W * m_per_unit, H * m_per_unit
-        W, H = _snap_up(W), _snap_up(H)
-    else:
-        vb = canvas.get("viewBox") or canvas.get("viewbox")
-        if isinstance(vb, (list, tuple)) and len(vb) == 4:
-            _, _, wv, hv = [float(x) for x in vb]
-            W, H = (wv * m_per_unit if is_px_like else wv), (hv * m_per_unit if is_px_like else hv)
-            W, H = _snap_up(W), _snap_up(H)
-
-    # Decision: prefer provided canvas, but expand if needed; else use want_w/h or defaults
-    if W is not None and H is not None:
-        if want_w is not None and want_h is not None:
-            W = max(W, want_w); H = max(H, want_h)
-        return _snap_up(W), _snap_up(H)
-
-    if want_w is not None and want_h is not None:
-        return want_w, want_h
-
-    # Last resort if we have nothing
-    return 8.0, 8.0
-def _height_m_from_obj(o: dict, m_per_unit: float, is_px_like: bool, default: float = DEFAULT_H) -> float:
-    """
-    Returns height in meters without snapping.
-    Rules:
-      - If the object declares a height unit, use it.
-      - Else, if the overall plan is px-like:
-          * assume heights are already meters unless they look 'pixel-ish' ( > 10 )
-      - Else, pass through.
-      - Clamp to a tiny positive epsilon so rugs etc. survive.
-    """
-    h = _extract_height(o)
-    if h is None:
-        return default
-
-    # explicit per-object height unit hint
-    units_h = (o.get("height_units") or o.get("units_height") or "").strip().lower()
-    if units_h in ("m", "meter", "meters"):
-        pass  # already meters
-    elif units_h in ("cm", "centimeter", "centimeters"):
-        h = float(h) / 100.0
-    elif units_h in ("mm", "millimeter", "millimeters"):
-        h = float(h) / 1000.0
-    elif units_h in ("px", "pixel", "pixels"):
-        h = float(h) * float(m_per_unit)
-    else:
-        # No explicit unit for height:
-        # If geometry is px-like, treat small values as meters (typical furniture < 5 m)
-        # and only scale if it looks like a pixel count (e.g., 30, 60, 120…).
-        if is_px_like and float(h) > 10.0:
-            h = float(h) * float(m_per_unit)
-
-    return max(0.005, float(h))  # tiny epsilon, but *no snapping*
-
-def _resolve_canvas_and_scale(plan):
-    """
-    Decide px vs m canvas. Return (desired_w_m, desired_h_m, m_per_unit, is_px_like, src).
-    """
-    cv = plan.get("canvas") or {}
-    src = "px"
-
-    if "width_m" in cv and "height_m" in cv:
-        W, H = float(cv["width_m"]), float(cv["height_m"])
-        src = "m"
-    else:
-        if "width" in cv and "height" in cv:
-            W, H = float(cv["width"]), float(cv["height"])
-        else:
-            vb = cv.get("viewBox") or cv.get("viewbox")
-            if isinstance(vb, (list, tuple)) and len(vb) == 4:
-                W, H = float(vb[2]), float(vb[3])
-            else:
-                W, H = 800.0, 800.0
-
-    m_per_unit, is_px_like = _resolve_scale(plan)
-    if m_per_unit is None:
-        m_per_unit, is_px_like = _m_per_px_from_meta(plan), True
-
-    if src == "m":
-        desired_w_m, desired_h_m = W, H
-    else:
-        desired_w_m, desired_h_m = W * m_per_unit, H * m_per_unit
-
-    return desired_w_m, desired_h_m, m_per_unit, is_px_like, src
-# === Live state & writer (put near the top of your Python file) ===
-
-# Live state & writer (keep where you already placed it)
-WATCH_PATH = r"C:\GITCLONE\atlas-scene-agent\live_scene.json"
-
-STATE = {
-    "grid_w": 40.0,
-    "grid_h": 30.0,
-    "objects": {}
+# Rarely used parts live in their own modules and load on first access:
+# the universal plan importer, the Blender MCP delta sender and the pydantic
+# plan models.
+_LAZY_ATTRS = {
+    "import_any_topdown_json_and_build": "plan_importer",
+    "any_topdown_json_to_agent_batch": "plan_importer",
+    "update_object_position": "plan_importer",
+    "update_object_size": "plan_importer",
+    "update_object_height": "plan_importer",
+    "WATCH_PATH": "plan_importer",
+    "apply_scene_delta": "blender_mcp",
+    "MCP_HOST": "blender_mcp",
+    "MCP_PORT": "blender_mcp",
+    "STATE_FILE": "blender_mcp",
+    "CommandArgs": "plan_models",
+    "Command": "plan_models",
+    "CommandBatch": "plan_models",
 }
 
-def _write_watch():
-    os.makedirs(os.path.dirname(WATCH_PATH), exist_ok=True)
-    with open(WATCH_PATH, "w", encoding="utf-8") as f:
-        json.dump(STATE, f, ensure_ascii=False, indent=2)
+def __getattr__(name):
+    mod = _LAZY_ATTRS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(mod), name)
 
-def update_object_position(label, x_m, y_m):
-    a = STATE["objects"].get(label)
-    if not a:
-        return
-    a["x"] = _snap(x_m, GRID_CELL)
-    a["y"] = _snap(y_m, GRID_CELL)
-    _write_watch()
 
-def update_object_size(label, w_m, h_m, anchor="center"):
-    a = STATE["objects"].get(label)
-    if not a:
-        return
-    cx, cy = float(a["x"]), float(a["y"])
-    w_old, h_old = float(a.get("w", 1.0)), float(a.get("h", 1.0))
-
-    W = max(_snap(w_m, GRID_CELL), GRID_CELL * 0.5)
-    H = max(_snap(h_m, GRID_CELL), GRID_CELL * 0.5)
-
-    dx = dy = 0.0
-    if anchor in ("nw", "w", "sw"): dx = (W - w_old) / 2.0
-    if anchor in ("ne", "e", "se"): dx = -(W - w_old) / 2.0
-    if anchor in ("nw", "n", "ne"): dy = (H - h_old) / 2.0
-    if anchor in ("sw", "s", "se"): dy = -(H - h_old) / 2.0
-
-    a["w"], a["h"] = W, H
-    a["x"], a["y"] = _snap(cx + dx, GRID_CELL), _snap(cy + dy, GRID_CELL)
-    _write_watch()
-
-def update_object_height(label, h_m):
-    a = STATE["objects"].get(label)
-    if not a:
-        return
-    a["height"] = max(_snap(h_m, GRID_CELL), 0.01)
-    _write_watch()
-
-def any_topdown_json_to_agent_batch(plan: dict,
-                                    label_prefix: str = "",
-                                    fit_to_scene: bool = True,      # ignored here
-                                    margin_m: float = 0.0,
-                                    rebase_to_margin: bool = False) -> dict:
-    """
-    Physical-fidelity importer:
-      - Converts geometry to **meters** via _resolve_canvas_and_scale / _resolve_scale.
-      - Resizes scene canvas to the physical canvas size (AUTO_CANVAS_POLICY='resize_scene').
-      - No anisotropic scaling of geometry.
-      - Positions can snap to GRID_CELL; sizes are NOT snapped by default.
-      - Mirrors all placed objects to STATE for Blender livesync.
-    """
-    desired_w_m, desired_h_m, m_per_unit, is_px_like, src = _resolve_canvas_and_scale(plan)
-
-    # ---- Live state: scene header ----
-    STATE["grid_w"] = float(desired_w_m)
-    STATE["grid_h"] = float(desired_h_m)
-    STATE["objects"].clear()
-
-    # 3) Start commands
-    cmds = [{"tool": "reset_scene", "arguments": {}}]
-
-    # 4) Resize scene to physical canvas (capped)
-    if AUTO_CANVAS_POLICY == "resize_scene":
-        Gw = min(desired_w_m, MAX_GRID_W)
-        Gh = min(desired_h_m, MAX_GRID_H)
-        cmds.append({"tool": "resize_canvas",
-                     "arguments": {"grid_w": float(Gw), "grid_h": float(Gh)}})
-    else:
-        Gw = float(SCENE.get("grid_w", 40))
-        Gh = float(SCENE.get("grid_h", 30))
-
-    # 5) No rebase — keep origin
-    dx = dy = 0.0
-
-    def _center_size_px_to_meters(bb_px):
-        x, y, w, h = [float(v) for v in bb_px]
-        x_m = x * m_per_unit
-        y_m = y * m_per_unit
-        eps = 1e-4
-        w_m = max(w * m_per_unit, eps)
-        h_m = max(h * m_per_unit, eps)
-        cx = x_m + w_m * 0.5 + dx
-        cy = y_m + h_m * 0.5 + dy
-        return _snap_pos(cx), _snap_pos(cy), _snap_size(w_m), _snap_size(h_m)
-
-    # 6) Collect objects
-    structurals, items, details = _collect_objects_anywhere(plan)
-
-    # Optional wall bands: only if it's truly a room (outer/inner rects)
-    ow = next((e["node"] for e in structurals if (e["key"] == "outer_wall" and (e["node"].get("type") == "rect"))), None)
-    ia = next((e["node"] for e in structurals if (e["key"] == "inner_area" and (e["node"].get("type") == "rect"))), None)
-    USE_WALL_BANDS = _looks_like_room(ow, ia)
-
-    # 7) Walls / room import
-    if USE_WALL_BANDS:
-        xO, yO, wO, hO = _bbox_from_rect(ow)
-        xI, yI, wI, hI = _bbox_from_rect(ia)
-
-        def add_band(lbl, x, y, w, h):
-            cx, cy, W, H = _center_size_px_to_meters((x, y, w, h))
-            height_m = 2.7
-            cmds.append({"tool": "add_object", "arguments": {
-                "label": lbl, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": height_m
-            }})
-            # Mirror to livesync state
-            STATE["objects"][lbl] = {"primitive": "cube", "x": float(cx), "y": float(cy),
-                                     "w": float(W), "h": float(H), "height": float(height_m)}
-
-        add_band("WALL_TOP",   xO, yO,        wO, (yI - yO))
-        add_band("WALL_BOT",   xO, yI + hI,   wO, (yO + hO) - (yI + hI))
-        add_band("WALL_LEFT",  xO, yI,        (xI - xO), hI)
-        add_band("WALL_RIGHT", xI + wI, yI,   (xO + wO) - (xI + wI), hI)
-    else:
-        # Import room rects as thin slabs (safe for gardens/site plans)
-        def _add_room_rect(node, label):
-            if not node:
-                return
-            bb = _bbox_from_rect(node)
-            cx, cy, W, H = _center_size_px_to_meters(bb)
-            height_m = 0.1
-            cmds.append({"tool": "add_object", "arguments": {
-                "label": label, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": height_m
-            }})
-            STATE["objects"][label] = {"primitive": "cube", "x": float(cx), "y": float(cy),
-                                       "w": float(W), "h": float(H), "height": float(height_m)}
-        if ow: _add_room_rect(ow, "ROOM_OUTER")
-        if ia: _add_room_rect(ia, "ROOM_INNER")
-
-    # 8) Room details (rects only)
-    for e in structurals:
-        o, k = e["node"], e["key"]
-        if k in ("outer_wall", "inner_area"):
-            continue
-        t = (o.get("type") or "").lower()
-        if t != "rect":
-            continue
-        bb = _bbox_from_generic(o)
-        if not bb:
-            continue
-        cx, cy, W, H = _center_size_px_to_meters(bb)
-        lbl = _label_from(e)
-        height_m = 1.2
-        cmds.append({"tool": "add_object", "arguments": {
-            "label": lbl, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": height_m
-        }})
-        STATE["objects"][lbl] = {"primitive": "cube", "x": float(cx), "y": float(cy),
-                                 "w": float(W), "h": float(H), "height": float(height_m)}
-
-    # 9) Items (furniture etc.)
-    seen = set()
-    for e in items:
-        o = e["node"]
-        bb = _bbox_from_generic(o)
-        if not bb:
-            continue
-        cx, cy, W, H = _center_size_px_to_meters(bb)
-        label = _label_from(e)
-        if label in seen:
-            i = 2
-            while f"{label}_{i}" in seen:
-                i += 1
-            label = f"{label}_{i}"
-        seen.add(label)
-
-        # heights: convert per object; interprets units (m/cm/mm/px)
-        height_m = _apply_height_cap(_height_m_from_obj(o, m_per_unit, is_px_like, default=DEFAULT_H))
-
-        cmds.append({"tool": "add_object", "arguments": {
-            "label": label, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": float(height_m)
-        }})
-        STATE["objects"][label] = {"primitive": "cube", "x": float(cx), "y": float(cy),
-                                   "w": float(W), "h": float(H), "height": float(height_m)}
-
-    # 10) Finish (write watcher once)
-    _write_watch()
-    cmds.append({"tool": "render_svg", "arguments": {"view": "topdown"}})
-    cmds.append({"tool": "export_state", "arguments": {}})
-
-    return {"commands": cmds}
-
-def import_any_topdown_json_and_build(plan_json_str: str, write_to_watch: bool = False, watch_path: str = r"C:\ATLAS\live_scene.json"):
-    """
-    One-call helper:
-      - loads arbitrary plan JSON
-      - converts to agent batch (rects/cubes, snapped 0.5 m)
-      - routes through engine
-      - optionally writes exported state to Blender watcher
-    """
-    plan = json.loads(plan_json_str)
-    batch = any_topdown_json_to_agent_batch(plan)
-    outs = route_and_execute(batch, natural="[universal import]")
-    if write_to_watch and "json" in outs:
-        import shutil
-        os.makedirs(os.path.dirname(watch_path), exist_ok=True)
-        shutil.copyfile(outs["json"], watch_path)
-        print(f"[LiveSync] wrote: {watch_path}")
-    return outs
-# ==== END UNIVERSAL IMPORTER ==================================================
 if __name__ == "__main__":
     print("ATLAS_FINAL_WITH_IMPORTER module ready. Run via server_fixed.py.")
@@ -0,0 +1,93 @@
+"""End-to-end /agent load test with no network.
+
+Runs the real engine behind the Flask test client, with the model replaced
+by a planner backend (planner_backends.py):
+
+  fake    RuleBasedClient: add/remove prompts, no-op for the rest
+  replay  a cassette recorded earlier with ATLAS_PLANNER_BACKEND=record,
+          unseen prompts falling back to the rule-based fake
+
+Prompts come in add, add, remove groups spread over --sessions editor
+sessions and are sent from --clients
+threads; the local planner and plan cache are off so every request goes
+through the backend. Reports request latency percentiles and throughput.
+
+    python benchmarks/bench_agent_offline.py [--backend fake|replay] [--cassette FILE]
+        [--requests 200] [--clients 4] [--sessions 8] [--latency 0.0]
+"""
+import argparse, json, os, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ["ATLAS_LOCAL_PLANNER"] = "0"
+os.environ["ATLAS_PLAN_CACHE"] = "off"
+os.environ["ATLAS_PERSIST_ARTIFACTS"] = "off"
+
+import ai_agent, planner_backends, server  # noqa: E402
+
+
+def prompts(n):
+    out = []
+    for i in range(n):
+        out.append(f"add a cube named T{i} at {2 + i % 30},{2 + (i // 30) % 20}" if i % 3 != 2
+                   else f"remove T{i - 2}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", default="fake", choices=["fake", "replay"])
+    ap.add_argument("--cassette", default=planner_backends.CASSETTE_PATH)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--clients", type=int, default=4)
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.0, help="simulated first-token seconds")
+    args = ap.parse_args()
+
+    fallback = planner_backends.RuleBasedClient(first_token_s=args.latency)
+    ai_agent.client = fallback if args.backend == "fake" else planner_backends.ReplayClient(
+        args.cassette, fallback=fallback, first_token_s=args.latency)
+    server.WATCH_PATH = os.path.join(tempfile.mkdtemp(prefix="atlas_bench_"), "live_scene.json")
+    server.FLUSH_MS = 0
+    client = server.app.test_client()
+
+    work = prompts(args.requests)
+    lat, errors, lock = [], [], threading.Lock()
+    # one worker sends a whole add, add, remove group, so the remove never
+    # overtakes the add it refers to
+    cursor = iter(range(0, len(work), 3))
+
+    def worker():
+        while True:
+            with lock:
+                g = next(cursor, None)
+            if g is None:
+                return
+            for i in range(g, min(g + 3, len(work))):
+                t0 = time.perf_counter()
+                r = client.post("/agent", json={"prompt": work[i], "session": f"bench-{(g // 3) % args.sessions}"})
+                dt = (time.perf_counter() - t0) * 1000.0
+                with lock:
+                    lat.append(dt)
+                    if r.status_code != 200:
+                        errors.append((work[i], r.status_code))
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat.sort()
+    pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))], 2)
+    print(json.dumps({
+        "backend": args.backend, "requests": len(lat), "clients": args.clients,
+        "errors": len(errors), "first_errors": errors[:3],
+        "p50_ms": pct(0.5), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+        "throughput_rps": round(len(lat) / wall, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Serial run_prompt vs. run_prompts for a batch of independent prompts.
+
+Each item is its own small scene plus a prompt the local planner cannot
+handle, so every item goes to the model. The model is a
+FakeStreamingClient with a fixed first-token latency (default 300 ms),
+which is where a real batch spends its time. Plan caching is off. The
+check that every result matches the serial run (same scene, in order)
+comes before the timings.
+
+    python benchmarks/bench_batch.py [--items 32] [--latency 0.3] [--concurrency 1,4,8,16]
+"""
+import argparse, json, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ["ATLAS_PLAN_CACHE"] = "off"
+os.environ["ATLAS_PERSIST_ARTIFACTS"] = "off"
+
+import ai_agent  # noqa: E402
+from planner_backends import FakeStreamingClient  # noqa: E402
+
+
+def planner(prompt):
+    # "place tower N": add object TN at x = N
+    n = int(prompt.rsplit(" ", 1)[-1])
+    return {"commands": [{"tool": "add_object",
+                          "arguments": {"label": f"T{n}", "x": 1.0 + n % 30, "y": 5.0, "w": 1.0, "h": 1.0}}]}
+
+
+def items(n):
+    return [{"prompt": f"place tower {i}",
+             "base_model": {"objects": [{"label": "A", "x": 2.0 + i % 20, "y": 2.0, "w": 1.0, "h": 1.0}]}}
+            for i in range(n)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=32)
+    ap.add_argument("--latency", type=float, default=0.3)
+    ap.add_argument("--concurrency", default="1,4,8,16")
+    args = ap.parse_args()
+
+    ai_agent.client = FakeStreamingClient(planner, first_token_s=args.latency)
+    batch = items(args.items)
+
+    t0 = time.perf_counter()
+    serial = [ai_agent.run_prompt(it["prompt"], base_model=it["base_model"], session=ai_agent.SceneSession())
+              for it in batch]
+    report = {"items": args.items, "latency_s": args.latency,
+              "serial_ms": round((time.perf_counter() - t0) * 1000.0, 1), "run_prompts": {}}
+    for c in [int(x) for x in args.concurrency.split(",") if x]:
+        t0 = time.perf_counter()
+        out = ai_agent.run_prompts(batch, concurrency=c)
+        ms = (time.perf_counter() - t0) * 1000.0
+        assert all(r["ok"] for r in out), [r for r in out if not r["ok"]][:1]
+        assert [r["scene"]["objects"] for r in out] == [r["scene"]["objects"] for r in serial]
+        report["run_prompts"][c] = {"ms": round(ms, 1), "speedup": round(report["serial_ms"] / ms, 2)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
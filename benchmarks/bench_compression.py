@@ -0,0 +1,110 @@
+"""Body size and latency of /publish and /agent with and without compression.
+
+The example plans are scaled up (each object copied `--scale` times with a
+jitter so the copies are not byte-identical). Each one is then sent through
+the Flask test client in four ways:
+
+  * /publish with an identity body, and with Content-Encoding: gzip
+  * /agent (run_prompt stubbed to return the scaled scene + its SVG), with
+    Accept-Encoding identity, gzip and deflate
+
+The report lists bytes on the wire, server time, and transfer time at
+--mbps.
+
+    python benchmarks/bench_compression.py [--scale 1000] [--mbps 100]
+"""
+import argparse, gzip, json, logging, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import ai_agent  # noqa: E402
+import server  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+EXAMPLES = {
+    "room": os.path.join(ROOT, "examples", "room", "plan.json"),
+    "magical_forest": os.path.join(ROOT, "examples", "magical_forest", "plan_forest.json"),
+}
+
+
+def scaled(model: dict, factor: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    objs = model.get("objects") or {}
+    items = list(objs.items()) if isinstance(objs, dict) else [(o.get("id") or o.get("label"), o) for o in objs]
+    out = {}
+    for i in range(factor):
+        for key, o in items:
+            c = dict(o)
+            c["x"] = float(c.get("x", 0)) + rng.uniform(-5, 5)
+            c["y"] = float(c.get("y", 0)) + rng.uniform(-5, 5)
+            if "label" in c:
+                c["label"] = f"{c['label']}_{i}"
+            out[f"{key}_{i}"] = c
+    return {**model, "objects": out}
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        best = dt if best is None else min(best, dt)
+    return res, best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, default=1000)
+    ap.add_argument("--mbps", type=float, default=100.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    tmp = tempfile.mkdtemp(prefix="atlas_bench_")
+    server.WATCH_PATH = os.path.join(tmp, "live_scene.json")
+    server.FLUSH_MS = 0
+    client = server.app.test_client()
+    wire_ms = lambda n: n * 8 / (args.mbps * 1e6) * 1000.0
+
+    report = {"scale": args.scale, "mbps": args.mbps, "scenes": {}}
+    for name, path in EXAMPLES.items():
+        with open(path, "r", encoding="utf-8") as f:
+            model = scaled(json.load(f), args.scale)
+        raw = json.dumps(model).encode("utf-8")
+        t0 = time.perf_counter()
+        gz = gzip.compress(raw, compresslevel=server.COMPRESS_LEVEL)
+        client_gzip_ms = (time.perf_counter() - t0) * 1000.0
+        row = {"objects": len(model["objects"])}
+
+        for label, body, headers in (
+            ("identity", raw, {}),
+            ("gzip", gz, {"Content-Encoding": "gzip"}),
+        ):
+            res, ms = _timed(lambda: client.post("/publish", data=body, headers={
+                "Content-Type": "application/json", **headers}), args.repeat)
+            assert res.status_code == 200, res.get_data(as_text=True)
+            row[f"publish_{label}"] = {"bytes": len(body), "server_ms": round(ms, 2),
+                                       "wire_ms": round(wire_ms(len(body)), 2)}
+        row["publish_gzip"]["client_compress_ms"] = round(client_gzip_ms, 2)
+
+        with ai_agent.SceneSession("bench").bound():
+            ai_agent._load_scene_from_model(server.standardize_for_agent(model))
+            outs = {"scene": ai_agent.export_state_dict(), "svg_text": ai_agent.render_svg_text(),
+                    "svg": None, "json": None}
+        server.run_prompt = lambda *a, **k: {**outs, "scene": dict(outs["scene"])}
+        for enc in ("identity", "gzip", "deflate"):
+            res, ms = _timed(lambda: client.post("/agent", json={"prompt": "bench"},
+                                                 headers={"Accept-Encoding": enc}), args.repeat)
+            assert res.status_code == 200, res.get_data(as_text=True)
+            assert (res.headers.get("Content-Encoding") or "identity") == enc
+            n = len(res.get_data())
+            row[f"agent_{enc}"] = {"bytes": n, "server_ms": round(ms, 2), "wire_ms": round(wire_ms(n), 2)}
+        report["scenes"][name] = row
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start import time of ai_agent and server.
+
+Runs `python -X importtime -c "import <module>"` in fresh processes (after
+one warm-up so bytecode caches exist) and reports the median cumulative
+import time, the slowest imports underneath it, and whether the heavy
+optional dependencies (openai, pydantic, dotenv) were pulled in. Exits
+non-zero when a module's median is above --target-ms.
+
+    python benchmarks/bench_import.py [--modules ai_agent] [--runs 7] [--target-ms 150]
+
+server is dominated by Flask and numpy; pass --modules ai_agent,server
+with a larger target to track it too.
+"""
+import argparse, json, os, statistics, subprocess, sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY = ("openai", "pydantic", "dotenv")
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-bench")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)   # measure with warm .pyc files
+    return env
+
+
+def importtime(module):
+    """{name: (self_us, cumulative_us)} for one cold `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        out.setdefault(name.strip(), (int(self_us), int(cum_us)))
+    return out
+
+
+def heavy_loaded(module):
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(),
+                          capture_output=True, text=True, check=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--modules", default="ai_agent")
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--target-ms", type=float, default=150.0)
+    args = ap.parse_args()
+
+    report, slow = {"target_ms": args.target_ms, "modules": {}}, []
+    for module in [m for m in args.modules.split(",") if m]:
+        importtime(module)   # warm-up: writes .pyc files
+        runs = [importtime(module) for _ in range(args.runs)]
+        total_ms = statistics.median(r[module][1] for r in runs) / 1000.0
+        top = sorted(runs[-1].items(), key=lambda kv: kv[1][0], reverse=True)[:8]
+        report["modules"][module] = {
+            "median_ms": round(total_ms, 1),
+            "self_ms": round(statistics.median(r[module][0] for r in runs) / 1000.0, 1),
+            "heavy_deps_loaded": heavy_loaded(module),
+            "slowest_self_ms": {name: round(s / 1000.0, 1) for name, (s, _) in top},
+        }
+        if total_ms > args.target_ms:
+            slow.append(module)
+    print(json.dumps(report, indent=2))
+    if slow:
+        sys.exit(f"over {args.target_ms} ms: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Encode/decode time and size of scene JSON: stdlib json vs. orjson.
+
+The example plans are scaled up as in bench_compression.py and normalized
+to the watcher payload the server writes. Each backend is then timed on
+pretty (indent=2, the file default) and compact encoding, on decoding, and
+on the clone() round trip the engine uses for undo snapshots.
+
+    python benchmarks/bench_json.py [--scale 1000] [--repeat 5]
+"""
+import argparse, copy, json, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import scene_json  # noqa: E402
+import server  # noqa: E402
+from bench_compression import EXAMPLES, scaled  # noqa: E402
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        best = dt if best is None else min(best, dt)
+    return res, round(best, 2)
+
+
+def _backend(payload, repeat):
+    row = {}
+    for mode, pretty in (("pretty", True), ("compact", False)):
+        data, enc = _best(lambda: scene_json.dumpb(payload, pretty=pretty), repeat)
+        _, dec = _best(lambda: scene_json.loads(data), repeat)
+        row[mode] = {"bytes": len(data), "encode_ms": enc, "decode_ms": dec}
+    _, row["clone_ms"] = _best(lambda: scene_json.clone(payload), repeat)
+    return row
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    accel = scene_json.orjson
+    report = {"scale": args.scale, "orjson": accel is not None, "scenes": {}}
+    for name, path in EXAMPLES.items():
+        with open(path, "r", encoding="utf-8") as f:
+            payload = server.normalize_for_watcher(scaled(json.load(f), args.scale))
+        row = {"objects": len(payload["objects"])}
+        try:
+            scene_json.orjson = None
+            row["json"] = _backend(payload, args.repeat)
+            if accel is not None:
+                scene_json.orjson = accel
+                row["orjson"] = _backend(payload, args.repeat)
+                assert scene_json.loads(scene_json.dumpb(payload)) == json.loads(json.dumps(payload))
+        finally:
+            scene_json.orjson = accel
+        _, row["copy_deepcopy_ms"] = _best(lambda: copy.deepcopy(payload), args.repeat)
+        report["scenes"][name] = row
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Sweep-line _scanline_empty_span_max against the per-scanline scan it replaced.
+
+First checks that both give the same (max_span, where) on randomized
+scenes: snapped and unsnapped coordinates, touching and nested boxes,
+zero and negative sizes, ints, boxes hanging off or outside the canvas,
+and degenerate canvases. Then it times both as the scene grows, on a
+snapped site plan and on scattered unsnapped boxes (one scanline per
+edge). The scan is O(n^2) and is only run up to --reference-max objects.
+
+    python benchmarks/bench_line_of_sight.py [--sizes 100,1000,10000] [--reference-max 2000]
+"""
+import argparse, json, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import ai_agent  # noqa: E402
+
+
+def _scanline_empty_span_max_reference(objs, gw, gh):
+    """The scan-every-rect-per-scanline estimator, as it was before the sweep."""
+    ys = {0.0, gh}
+    xs = {0.0, gw}
+    rects = {}
+    for L, o in objs.items():
+        l, r, t, b = ai_agent._aabb(o)
+        rects[L] = (l, r, t, b)
+        ys.update([t, b, o["y"]])
+        xs.update([l, r, o["x"]])
+
+    max_h = 0.0; where_h = None
+    for y in sorted(ys):
+        occ = [(l, r) for (l, r, t, b) in rects.values() if t <= y <= b]
+        for a, b in ai_agent._empty_spans_1d(occ, 0.0, gw):
+            if b - a > max_h:
+                max_h = b - a
+                where_h = {"y": float(y), "x0": float(a), "x1": float(b)}
+
+    max_v = 0.0; where_v = None
+    for x in sorted(xs):
+        occ = [(t, b) for (l, r, t, b) in rects.values() if l <= x <= r]
+        for a, b in ai_agent._empty_spans_1d(occ, 0.0, gh):
+            if b - a > max_v:
+                max_v = b - a
+                where_v = {"x": float(x), "y0": float(a), "y1": float(b)}
+
+    return max(max_h, max_v), {"max_h": max_h, "where_h": where_h, "max_v": max_v, "where_v": where_v}
+
+
+def random_scene(rng, n, gw, gh, style):
+    objs = {}
+    for i in range(n):
+        if style == "snapped":
+            o = {"x": rng.randint(0, int(gw * 2)) / 2, "y": rng.randint(0, int(gh * 2)) / 2,
+                 "w": rng.randint(1, 8) / 2, "h": rng.randint(1, 8) / 2}
+        elif style == "ints":
+            o = {"x": rng.randint(-2, int(gw) + 2), "y": rng.randint(-2, int(gh) + 2),
+                 "w": rng.randint(0, 6), "h": rng.randint(0, 6)}
+        elif style == "odd":
+            o = {"x": rng.uniform(-5, gw + 5), "y": rng.uniform(-5, gh + 5),
+                 "w": rng.choice([0.0, -1.5, 2.0, rng.uniform(-3, 10)]),
+                 "h": rng.choice([0.0, -1.5, 2.0, rng.uniform(-3, 10)])}
+        else:
+            o = {"x": rng.uniform(0, gw), "y": rng.uniform(0, gh),
+                 "w": rng.uniform(0.1, gw / 4), "h": rng.uniform(0.1, gh / 4)}
+        objs[f"O{i}"] = o
+    return objs
+
+
+def site_plan(n, seed=0):
+    """A snapped street grid of n buildings with a few open corridors."""
+    rng = random.Random(seed)
+    side = int(n ** 0.5) + 1
+    gw = gh = 3.0 * side
+    objs = {}
+    for i in range(n):
+        cx, cy = 3.0 * (i % side) + 1.5, 3.0 * (i // side) + 1.5
+        objs[f"B{i}"] = {"x": cx + rng.choice([-0.5, 0, 0.5]), "y": cy + rng.choice([-0.5, 0, 0.5]),
+                         "w": rng.choice([1.5, 2.0, 2.5, 3.0]), "h": rng.choice([1.5, 2.0, 2.5, 3.0])}
+    return objs, gw, gh
+
+
+def scattered(n, seed=0):
+    """n unsnapped boxes at random on a canvas of the same density: every edge is its own scanline."""
+    rng = random.Random(seed)
+    gw = gh = 3.0 * (int(n ** 0.5) + 1)
+    objs = {f"S{i}": {"x": rng.uniform(0, gw), "y": rng.uniform(0, gh),
+                      "w": rng.uniform(0.5, 4.0), "h": rng.uniform(0.5, 4.0)} for i in range(n)}
+    return objs, gw, gh
+
+
+def check(cases=400):
+    rng = random.Random(11)
+    for case in range(cases):
+        style = rng.choice(["snapped", "ints", "odd", "uniform"])
+        gw, gh = rng.choice([(40.0, 30.0), (10.0, 10.0), (0.0, 5.0), (-8.0, 12.0), (25, 7)])
+        objs = random_scene(rng, rng.randint(0, 120), abs(gw) or 5.0, abs(gh) or 5.0, style)
+        ref = _scanline_empty_span_max_reference(objs, gw, gh)
+        got = ai_agent._scanline_empty_span_max(objs, gw, gh)
+        assert got == ref, f"case {case} ({style}, {gw}x{gh}): {got} != {ref}"
+    return cases
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        best = dt if best is None else min(best, dt)
+    return round(best, 2), out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100,1000,10000")
+    ap.add_argument("--reference-max", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    report = {"equivalence_cases": check(), "results": []}
+    for n in [int(x) for x in args.sizes.split(",") if x]:
+        for scene, make in (("site_plan", site_plan), ("scattered", scattered)):
+            objs, gw, gh = make(n)
+            sweep_ms, got = _best(lambda: ai_agent._scanline_empty_span_max(objs, gw, gh), args.repeat)
+            row = {"scene": scene, "objects": n, "sweep_ms": sweep_ms, "max_span": got[0]}
+            if n <= args.reference_max:
+                ref_ms, ref = _best(lambda: _scanline_empty_span_max_reference(objs, gw, gh), 1)
+                assert got == ref, f"{scene}, {n} objects: sweep and scan disagree"
+                row.update(reference_ms=ref_ms, speedup=round(ref_ms / sweep_ms, 1))
+            report["results"].append(row)
+            print(f"{scene:10s} {n:>6d}  sweep {sweep_ms:>9.1f} ms  scan {row.get('reference_ms', '-'):>10} ms",
+                  file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
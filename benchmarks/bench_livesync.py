@@ -0,0 +1,114 @@
+"""Drag -> consumer latency: /events push feed vs. polling WATCH_PATH.
+
+Runs server.app on a local port, connects a stand-in consumer to /events
+(the same SSE parsing blender_livesync's feed reader does), then simulates a
+drag as a stream of /publish/delta calls moving one object.  For each
+revision it records the time from the POST being sent to the consumer
+having the event in hand.
+
+The polling number is the model the file watcher implies: on average half
+of CHECK_EVERY plus one full json.load of the scene file.
+
+    python benchmarks/bench_livesync.py [--objects 5000] [--moves 100]
+"""
+import argparse, json, logging, os, statistics, sys, tempfile, threading, time, urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import server  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+
+def _scene(n):
+    side = int(n ** 0.5) + 1
+    return {
+        "grid_w": 2.0 * side, "grid_h": 2.0 * side, "_source": "bench",
+        "objects": {f"OBJ_{i}": {"x": 1.0 + 2 * (i % side), "y": 1.0 + 2 * (i // side),
+                                 "w": 1.0, "h": 1.0, "height": 1.0} for i in range(n)},
+    }
+
+
+def _post(url, body):
+    req = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+def _consumer(url, received, ready):
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        ready.set()
+        data = []
+        for raw in resp:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+            elif not line and data:
+                rec = json.loads("\n".join(data))
+                received[rec["seq"]] = time.perf_counter()
+                data = []
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--objects", type=int, default=5000)
+    ap.add_argument("--moves", type=int, default=100)
+    ap.add_argument("--interval-ms", type=float, default=16.0)
+    args = ap.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    tmp = tempfile.mkdtemp(prefix="atlas_bench_")
+    server.WATCH_PATH = os.path.join(tmp, "live_scene.json")
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    scene = _scene(args.objects)
+    rev = _post(base + "/publish", scene)["rev"]
+
+    received, ready = {}, threading.Event()
+    threading.Thread(target=_consumer, args=(base + "/events", received, ready), daemon=True).start()
+    ready.wait(5)
+
+    sent = {}
+    obj = dict(scene["objects"]["OBJ_0"])
+    for i in range(args.moves):
+        obj["x"] += 0.5
+        t0 = time.perf_counter()
+        rev = _post(base + "/publish/delta", {"base_rev": rev, "changed": {"OBJ_0": obj}})["rev"]
+        sent[rev] = t0
+        time.sleep(args.interval_ms / 1000.0)
+    deadline = time.time() + 5
+    while time.time() < deadline and not all(r in received for r in sent):
+        time.sleep(0.01)
+
+    lat = sorted((received[r] - t0) * 1000.0 for r, t0 in sent.items() if r in received)
+
+    server.flush_pending()
+    t0 = time.perf_counter()
+    with open(server.WATCH_PATH, "r", encoding="utf-8") as f:
+        json.load(f)
+    reparse_ms = (time.perf_counter() - t0) * 1000.0
+    check_every_ms = 500.0
+
+    httpd.shutdown()
+    print(json.dumps({
+        "objects": args.objects,
+        "moves": len(sent),
+        "delivered": len(lat),
+        "push_ms": {
+            "p50": statistics.median(lat) if lat else None,
+            "p95": lat[int(0.95 * (len(lat) - 1))] if lat else None,
+            "max": lat[-1] if lat else None,
+        },
+        "poll_model_ms": {
+            "mean": check_every_ms / 2 + reparse_ms,
+            "worst": check_every_ms + reparse_ms,
+            "reparse": reparse_ms,
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
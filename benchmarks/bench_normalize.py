@@ -0,0 +1,142 @@
+"""Bulk (columnar) vs. per-object normalize_for_watcher / standardize_for_agent.
+
+First checks that both paths give byte-identical JSON on a randomized
+scene mixing every shape branch and the awkward inputs _safe_float exists
+for (numeric strings, NaN/inf, None, bools, missing keys, polygons as
+strings and lists). Then it times both paths on a site-plan-sized scene.
+
+    python benchmarks/bench_normalize.py [--objects 50000] [--repeat 3]
+"""
+import argparse, json, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import server  # noqa: E402
+
+AWKWARD = [None, "3.5", "abc", True, float("nan"), float("inf"), -0.0, 0, 1e308, " 2 ", "1_000"]
+
+
+def _num(rng, awkward):
+    if awkward and rng.random() < 0.15:
+        return rng.choice(AWKWARD)
+    return rng.choice([rng.randint(-50, 900), rng.uniform(-50, 900)])
+
+
+KINDS = ["rect", "center", "circle", "ellipse", "polygon", "polyline", "xy", "empty"]
+
+
+def random_object(rng, awkward=True, kinds=KINDS):
+    kind = rng.choice(kinds)
+    o = {}
+    if kind == "rect":
+        o = {"type": "rect", "x": _num(rng, awkward), "y": _num(rng, awkward),
+             "w": _num(rng, awkward), "h": _num(rng, awkward)}
+    elif kind == "center":
+        o = {"x": _num(rng, awkward), "y": _num(rng, awkward), "w": _num(rng, awkward), "h": _num(rng, awkward)}
+    elif kind == "circle":
+        o = {"shape": "Circle", "cx": _num(rng, awkward), "cy": _num(rng, awkward), "r": _num(rng, awkward)}
+    elif kind == "ellipse":
+        o = {"type": "ellipse", "cx": _num(rng, awkward), "cy": _num(rng, awkward),
+             "rx": _num(rng, awkward), "ry": _num(rng, awkward)}
+    elif kind in ("polygon", "polyline"):
+        pts = [[rng.uniform(0, 500), rng.uniform(0, 500)] for _ in range(rng.randint(1, 6))]
+        o = {"type": kind, "points": " ".join(f"{a},{b}" for a, b in pts) if rng.random() < 0.5 else pts}
+        if rng.random() < 0.3:
+            o.update(x=_num(rng, awkward), y=_num(rng, awkward))
+    elif kind == "xy":
+        o = {"type": rng.choice(["circle", "text", ""]), "x": _num(rng, awkward), "y": _num(rng, awkward)}
+        if rng.random() < 0.5:
+            o["w"] = _num(rng, awkward)
+    if rng.random() < 0.7:
+        o["height"] = _num(rng, awkward)
+    if rng.random() < 0.4:
+        o["z_offset"] = _num(rng, awkward)
+    if rng.random() < 0.3:
+        o["rot_deg"] = [0, 0, rng.randint(0, 359)]
+    if rng.random() < 0.5:
+        o["primitive"] = rng.choice(["cube", "plane", "", None])
+    if rng.random() < 0.5:
+        o["label"] = rng.choice([f"L{rng.randint(0, 99)}", ""])
+    if rng.random() < 0.3:
+        o["id"] = f"id{rng.randint(0, 999)}"
+    return o
+
+
+def random_model(n, seed=0, as_list=False, awkward=True, kinds=KINDS):
+    rng = random.Random(seed)
+    objs = [random_object(rng, awkward, kinds) for _ in range(n)]
+    model = {"version": "1.0", "canvas": {"width_m": 120.0, "height_m": 80.0}, "_source": "bench"}
+    model["objects"] = objs if as_list else {f"K{i}": o for i, o in enumerate(objs)}
+    return model
+
+
+def _dump(x):
+    return json.dumps(x, sort_keys=False)
+
+
+def _per_object(fn, model):
+    saved = server.BULK_MIN_OBJECTS
+    server.BULK_MIN_OBJECTS = 1 << 62
+    try:
+        return fn(model)
+    finally:
+        server.BULK_MIN_OBJECTS = saved
+
+
+def _bulk(fn, model):
+    saved = server.BULK_MIN_OBJECTS
+    server.BULK_MIN_OBJECTS = 0
+    try:
+        return fn(model)
+    finally:
+        server.BULK_MIN_OBJECTS = saved
+
+
+def check_equivalence(n=5000, seeds=range(5)):
+    for seed in seeds:
+        for as_list in (False, True):
+            model = random_model(n, seed, as_list)
+            for fn in (server.normalize_for_watcher, server.standardize_for_agent):
+                ref = _dump(_per_object(fn, json.loads(_dump(model))))
+                got = _dump(_bulk(fn, json.loads(_dump(model))))
+                assert ref == got, f"{fn.__name__} differs (seed={seed}, list={as_list})"
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        best = dt if best is None else min(best, dt)
+    return round(best, 2)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--objects", type=int, default=50000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if server.np is None:
+        sys.exit("numpy is not installed; only the per-object path is available")
+    check_equivalence()
+
+    report = {"objects": args.objects, "equivalent": True}
+    scenes = {
+        "mixed_shapes": random_model(args.objects, seed=42, awkward=False),
+        "editor_rects": random_model(args.objects, seed=42, awkward=False, kinds=["center"]),
+        "svg_shapes": random_model(args.objects, seed=42, awkward=False, kinds=["rect", "circle", "ellipse"]),
+    }
+    for name, model in scenes.items():
+        row = report[name] = {}
+        for fn in (server.normalize_for_watcher, server.standardize_for_agent):
+            per = _best(lambda: _per_object(fn, model), args.repeat)
+            bulk = _best(lambda: _bulk(fn, model), args.repeat)
+            row[fn.__name__] = {"per_object_ms": per, "bulk_ms": bulk, "speedup": round(per / bulk, 2)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
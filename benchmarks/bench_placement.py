@@ -0,0 +1,151 @@
+"""random_nonoverlap placement: free-space sampling vs. rejection sampling.
+
+Checks, on random canvases, sizes, margins and seeds, that the free-space
+placer (ai_agent.FAST_PLACEMENT, the default):
+  1. gives the same layout twice for the same seed;
+  2. keeps every pair of objects _nonoverlap-apart (margin honoured) and
+     every center on the grid points the rejection sampler can draw;
+  3. raises E_CANVAS_FULL, leaving the previous scene untouched, when the
+     labels cannot all fit, and places everything when they can.
+Then it times engine_create_scene in both modes as the label count and
+canvas fill grow, with the overlapping pairs in each layout (labels the
+rejection sampler gives up on go to its row layout, which can overlap),
+and on large, sparse canvases (a few labels on kilometres of canvas) with
+the peak memory of each run, which should not grow with the canvas area.
+
+    python benchmarks/bench_placement.py [--counts 100,1000,3000] [--fills 0.35,0.5]
+                                         [--sparse 1000,3000] [--repeat 3]
+"""
+import argparse, json, math, os, random, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import ai_agent  # noqa: E402
+
+
+def _create(labels, size, margin, seed, grid_w, grid_h, fast=True):
+    saved, ai_agent.FAST_PLACEMENT = ai_agent.FAST_PLACEMENT, fast
+    try:
+        ai_agent.engine_create_scene(labels, "cube", None, "random_nonoverlap",
+                                     size, margin, seed, grid_w, grid_h)
+    finally:
+        ai_agent.FAST_PLACEMENT = saved
+    return {k: (o["x"], o["y"]) for k, o in ai_agent.SCENE["objects"].items()}
+
+
+def _overlaps(objs, size, margin):
+    """Pairs closer than _nonoverlap allows, via a cell hash."""
+    reach = size + margin
+    cells = {}
+    for k, (x, y) in objs.items():
+        cells.setdefault((math.floor(x / reach), math.floor(y / reach)), []).append(k)
+    bad = 0
+    for k, (x, y) in objs.items():
+        cx, cy = math.floor(x / reach), math.floor(y / reach)
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for o in cells.get((i, j), ()):
+                    if o > k and not ai_agent._nonoverlap((x, y), size, margin, [{"x": objs[o][0], "y": objs[o][1], "w": size}]):
+                        bad += 1
+    return bad
+
+
+def _on_lattice(objs, size, grid_w, grid_h):
+    snap = ai_agent.snap_to_grid
+    lo_x, hi_x = sorted((snap(size), snap(grid_w - size)))
+    lo_y, hi_y = sorted((snap(size), snap(grid_h - size)))
+    return all(lo_x <= x <= hi_x and lo_y <= y <= hi_y and snap(x) == x and snap(y) == y
+               for x, y in objs.values())
+
+
+def check(cases=200):
+    rng = random.Random(7)
+    full = placed = 0
+    for case in range(cases):
+        grid_w, grid_h = rng.choice([20.0, 40.0, 60.0]), rng.choice([15.0, 30.0, 45.0])
+        size, margin = rng.choice([1.0, 1.5, 2.0, 3.0]), rng.choice([0.0, 0.3, 0.8, 1.7])
+        labels = [f"O{i}" for i in range(rng.randint(1, 400))]
+        seed = rng.randint(0, 10 ** 6)
+        ai_agent.engine_create_scene(["KEEP"], "cube", None, "grid", 1.0, 0.8, 0, 10.0, 10.0)
+        try:
+            a = _create(labels, size, margin, seed, grid_w, grid_h)
+        except ValueError as e:
+            assert str(e).startswith("E_CANVAS_FULL:"), e
+            assert list(ai_agent.SCENE["objects"]) == ["KEEP"], f"case {case}: scene changed on E_CANVAS_FULL"
+            full += 1
+            continue
+        assert a == _create(labels, size, margin, seed, grid_w, grid_h), f"case {case}: not deterministic"
+        assert len(a) == len(labels), f"case {case}: {len(a)} of {len(labels)} placed"
+        assert _overlaps(a, size, margin) == 0, f"case {case}: overlapping objects"
+        assert _on_lattice(a, size, grid_w, grid_h), f"case {case}: center off the candidate grid"
+        placed += 1
+    assert full and placed, "cases should cover both full and non-full canvases"
+    return {"cases": cases, "placed": placed, "canvas_full": full}
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        best = dt if best is None else min(best, dt)
+    return round(best, 2), out
+
+
+def _peak_kib(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", default="100,1000,3000")
+    ap.add_argument("--size", type=float, default=1.0)
+    ap.add_argument("--margin", type=float, default=0.8)
+    ap.add_argument("--fills", default="0.35,0.5",
+                    help="shares of the canvas the objects' size+margin discs cover")
+    ap.add_argument("--sparse", default="1000,3000",
+                    help="canvas sides (m) for 10 labels on a large, mostly empty canvas")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    report = {"checks": check(), "size": args.size, "margin": args.margin, "results": []}
+    runs = [(float(f), int(n)) for f in args.fills.split(",") if f for n in args.counts.split(",") if n]
+    for fill, n in runs:
+        side = math.sqrt(n * math.pi * ((args.size + args.margin) / 2.0) ** 2 / fill)
+        grid_w = grid_h = ai_agent.snap_to_grid(side) + 2 * args.size
+        labels = [f"O{i}" for i in range(n)]
+        fast_ms, fast = _best(lambda: _create(labels, args.size, args.margin, 1, grid_w, grid_h), args.repeat)
+        legacy_ms, legacy = _best(lambda: _create(labels, args.size, args.margin, 1, grid_w, grid_h, fast=False),
+                                  1 if n > 1000 else args.repeat)
+        row = {"fill": fill, "objects": n, "canvas_m": grid_w, "fast_ms": fast_ms, "legacy_ms": legacy_ms,
+               "speedup": round(legacy_ms / fast_ms, 1),
+               "fast_overlaps": _overlaps(fast, args.size, args.margin),
+               "legacy_overlaps": _overlaps(legacy, args.size, args.margin)}
+        report["results"].append(row)
+        print(f"{fill:.2f} {n:>6d}  fast {fast_ms:>9.1f} ms  legacy {legacy_ms:>10.1f} ms  "
+              f"overlaps {row['fast_overlaps']}/{row['legacy_overlaps']}", file=sys.stderr)
+    report["sparse"] = []
+    for side in (float(s) for s in args.sparse.split(",") if s):
+        labels = [f"O{i}" for i in range(10)]
+        row = {"objects": len(labels), "canvas_m": side}
+        for mode, fast in (("fast", True), ("legacy", False)):
+            def run():
+                return _create(labels, args.size, args.margin, 1, side, side, fast=fast)
+            row[f"{mode}_ms"], out = _best(run, args.repeat)
+            row[f"{mode}_peak_kib"] = _peak_kib(run)
+            row[f"{mode}_overlaps"] = _overlaps(out, args.size, args.margin)
+        report["sparse"].append(row)
+        print(f"sparse {side:>7.0f} m  fast {row['fast_ms']:>7.1f} ms {row['fast_peak_kib']:>6d} KiB  "
+              f"legacy {row['legacy_ms']:>7.1f} ms {row['legacy_peak_kib']:>6d} KiB", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Which objects reach the planner: relevance order vs. first-N slice.
+
+Builds a site-plan scene of N objects with multi-word labels (CASTLE_RUIN,
+FOREST_W, TOWER_12, ...) scattered over a large canvas, then for a handful
+of prompts checks that every mentioned object and its nearest neighbours
+make it into build_scene_summary and encode_scene_state, and times the
+selection. Neighbours are checked against a brute-force distance sort.
+
+    python benchmarks/bench_scene_relevance.py [--objects 10000] [--budget 2000]
+"""
+import argparse, json, math, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import ai_agent  # noqa: E402
+
+NAMED = ["CASTLE_RUIN", "FOREST_W", "FOREST_E", "OLD_MILL", "RIVER_BRIDGE", "WATCH_TOWER"]
+PROMPTS = [
+    ("move the castle ruin left 3", ["CASTLE_RUIN"]),
+    ("align FOREST_W and OLD_MILL by their top edges", ["FOREST_W", "OLD_MILL"]),
+    ("put the watch-tower between CASTLE_RUIN and RIVER_BRIDGE", ["WATCH_TOWER", "CASTLE_RUIN", "RIVER_BRIDGE"]),
+    ("move the forest right 2", ["FOREST_W", "FOREST_E"]),
+    ("scale the olde mill up", ["OLD_MILL"]),
+]
+
+
+def synthetic(n, seed=0):
+    rng = random.Random(seed)
+    side = 4.0 * math.sqrt(n)
+    objs = {}
+    for i in range(n):
+        label = NAMED[i] if i < len(NAMED) else f"{rng.choice(['TREE', 'HUT', 'TOWER', 'ROCK'])}_{i}"
+        objs[label] = {"label": label, "primitive": "cube", "height": 1.0,
+                       "x": rng.uniform(1, side - 1), "y": rng.uniform(1, side - 1),
+                       "w": rng.choice([0.5, 1.0, 2.0]), "h": rng.choice([0.5, 1.0, 2.0])}
+    # shuffle so named objects are not simply the first keys
+    keys = list(objs)
+    rng.shuffle(keys)
+    return {"grid_w": side, "grid_h": side, "objects": {k: objs[k] for k in keys},
+            "constraints": [], "anchors": {}}
+
+
+def brute_neighbours(objs, key, k):
+    o = objs[key]
+    d = sorted((math.hypot(v["x"] - o["x"], v["y"] - o["y"]), n) for n, v in objs.items() if n != key)
+    return [n for _, n in d[:k]]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--objects", type=int, default=10000)
+    ap.add_argument("--budget", type=int, default=2000)
+    args = ap.parse_args()
+
+    ai_agent.SCENE = synthetic(args.objects)
+    objs = ai_agent.SCENE["objects"]
+    rows = []
+    for prompt, expected in PROMPTS:
+        t0 = time.perf_counter()
+        mentioned = ai_agent.mentioned_labels(prompt)
+        order = ai_agent._summary_order(prompt)
+        select_ms = (time.perf_counter() - t0) * 1000.0
+        t0 = time.perf_counter()
+        table = ai_agent.encode_scene_state(prompt, budget=args.budget)
+        encode_ms = (time.perf_counter() - t0) * 1000.0
+        summary = ai_agent.build_scene_summary(prompt)
+        shown = {line.split(",", 1)[0] for line in table.splitlines()[2:]}
+        assert sorted(mentioned) == sorted(expected), (prompt, mentioned)
+        assert set(expected) <= set(summary["objects"]), prompt
+        neighbours = {n for k in expected for n in brute_neighbours(objs, k, 4)}
+        assert set(expected) | neighbours <= shown, prompt
+        first = order[:len(expected) + ai_agent._SUMMARY_KNN * len(expected)]
+        rows.append({"prompt": prompt, "mentioned": mentioned,
+                     "neighbours_in_table": len(neighbours & shown), "neighbours": len(neighbours),
+                     "objects_in_table": len(shown), "leading": first[:6],
+                     "select_ms": round(select_ms, 2), "encode_ms": round(encode_ms, 2)})
+    print(json.dumps({"objects": args.objects, "budget": args.budget, "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
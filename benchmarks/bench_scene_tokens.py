@@ -0,0 +1,88 @@
+"""Input tokens of the planner's SCENE_STATE: JSON summary vs. compact table.
+
+For synthetic scenes of growing size it reports, per encoding, how many
+objects reach the model, the tokens that costs and the encode time:
+
+  json_first20  build_scene_summary as it was: 8 floats per object, first 20
+  json_all      the same JSON for every object (what full coverage would cost)
+  compact       encode_scene_state: label,cx,cy,w,h in grid cells, up to
+                ATLAS_SCENE_TOKEN_BUDGET tokens
+
+Tokens are counted with tiktoken (o200k_base) when it is installed,
+otherwise with ai_agent.estimate_tokens.
+
+    python benchmarks/bench_scene_tokens.py [--sizes 10,100,1000,10000] [--budget 2000]
+"""
+import argparse, json, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import ai_agent  # noqa: E402
+
+try:
+    import tiktoken
+    _ENC = tiktoken.get_encoding("o200k_base")
+    count_tokens, COUNTER = (lambda t: len(_ENC.encode(t))), "tiktoken:o200k_base"
+except ImportError:
+    count_tokens, COUNTER = ai_agent.estimate_tokens, "estimate_tokens"
+
+
+def synthetic(n, seed=0):
+    rng = random.Random(seed)
+    side = max(1, int(n ** 0.5))
+    step = ai_agent.GRID_STEP
+    objs = {}
+    for i in range(n):
+        w, h = rng.choice([1.0, 1.5, 2.0]), rng.choice([1.0, 1.5, 2.0])
+        objs[f"OBJ_{i}"] = {"label": f"OBJ_{i}", "primitive": "cube", "height": 1.0,
+                            "x": step * round((3.0 * (i % side) + 2.0) / step),
+                            "y": step * round((3.0 * (i // side) + 2.0) / step), "w": w, "h": h}
+    return {"grid_w": 3.0 * side + 4, "grid_h": 3.0 * (n // side + 1) + 4, "objects": objs}
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, round((time.perf_counter() - t0) * 1000.0, 3)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10,100,1000,10000")
+    ap.add_argument("--budget", type=int, default=ai_agent.SCENE_TOKEN_BUDGET)
+    args = ap.parse_args()
+
+    prompt = "move OBJ_3 left 2"
+    rows = []
+    with ai_agent.SceneSession("bench-tokens").bound():
+        for n in [int(x) for x in args.sizes.split(",") if x]:
+            ai_agent._restore_scene(synthetic(n))
+            first20, t_first = _timed(lambda: json.dumps(ai_agent.build_scene_summary(prompt), ensure_ascii=False))
+            full, t_full = _timed(lambda: json.dumps(_all_json(), ensure_ascii=False))
+            compact, t_compact = _timed(lambda: ai_agent.encode_scene_state(prompt, args.budget))
+            shown = compact.count("\n") - 1 - ("more objects not shown" in compact)
+            row = {"objects": n}
+            for name, text, ms, k in (("json_first20", first20, t_first, len(json.loads(first20)["objects"])),
+                                      ("json_all", full, t_full, n),
+                                      ("compact", compact, t_compact, shown)):
+                tokens = count_tokens(text)
+                row[name] = {"objects_shown": k, "tokens": tokens, "chars": len(text),
+                             "tokens_per_object": round(tokens / max(1, k), 2), "encode_ms": ms}
+            rows.append(row)
+    print(json.dumps({"counter": COUNTER, "budget": args.budget, "results": rows}, indent=2))
+
+
+def _all_json():
+    # build_scene_summary's per-object packing applied to every object
+    objs = ai_agent.SCENE["objects"]
+    return {"grid_w": ai_agent.SCENE["grid_w"], "grid_h": ai_agent.SCENE["grid_h"],
+            "grid_step": ai_agent.GRID_STEP,
+            "objects": {k: {"x": o["x"], "y": o["y"], "w": o["w"], "h": o["h"],
+                            "left": o["x"] - o["w"] / 2, "right": o["x"] + o["w"] / 2,
+                            "top": o["y"] - o["h"] / 2, "bottom": o["y"] + o["h"] / 2}
+                        for k, o in objs.items()}}
+
+
+if __name__ == "__main__":
+    main()
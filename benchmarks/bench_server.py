@@ -0,0 +1,162 @@
+"""In-process benchmark of /publish and /agent as scenes grow.
+
+Drives server.app with the Flask test client. Scenes are synthetic, from
+10 up to 100k objects, in each shape form the server accepts:
+
+  center rect, top-left rect, circle, ellipse, polygon (points string),
+  polygon (points list)
+
+run_prompt is replaced by a deterministic stand-in. It moves the first
+object one metre right and returns the result in memory, so /agent timings
+cover the server's own work rather than the model or the engine.
+Per-stage timings come from the Server-Timing header: parse, standardize,
+agent, normalize, serialize, write and response. The watch-file writer is
+run inline (FLUSH_MS=0) so serialize/write land in the request. Peak
+memory comes from a second, tracemalloc-instrumented pass.
+
+Output is one JSON document (stdout, or --out FILE) for regression tracking:
+
+    python benchmarks/bench_server.py [--sizes 10,1000,10000,100000] [--shapes ...] [--out bench.json]
+"""
+import argparse, json, logging, os, platform, random, sys, tempfile, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import server  # noqa: E402
+
+
+def _obj(shape, i, rng, side):
+    cx, cy = 2.0 * (i % side) + 1.0, 2.0 * (i // side) + 1.0
+    w, h = rng.choice([0.5, 1.0, 1.5]), rng.choice([0.5, 1.0, 1.5])
+    base = {"label": f"O{i}", "primitive": "cube", "height": 1.0}
+    if shape == "center":
+        return {**base, "x": cx, "y": cy, "w": w, "h": h}
+    if shape == "topleft":
+        return {**base, "type": "rect", "x": cx - w / 2, "y": cy - h / 2, "w": w, "h": h}
+    if shape == "circle":
+        return {**base, "type": "circle", "cx": cx, "cy": cy, "r": w / 2}
+    if shape == "ellipse":
+        return {**base, "type": "ellipse", "cx": cx, "cy": cy, "rx": w / 2, "ry": h / 2}
+    pts = [[cx - w / 2, cy - h / 2], [cx + w / 2, cy - h / 2], [cx + w / 2, cy + h / 2], [cx - w / 2, cy + h / 2]]
+    if shape == "polygon_str":
+        return {**base, "type": "polygon", "points": " ".join(f"{x},{y}" for x, y in pts)}
+    return {**base, "type": "polygon", "points": pts}
+
+
+SHAPES = ["center", "topleft", "circle", "ellipse", "polygon_str", "polygon_list"]
+
+
+def synthetic_scene(n, shape, seed=0):
+    rng = random.Random(seed)
+    side = max(1, int(n ** 0.5))
+    return {
+        "version": "1.0", "units": "m",
+        "canvas": {"width_m": 2.0 * side + 2, "height_m": 2.0 * (n // side + 1) + 2},
+        "objects": {f"O{i}": _obj(shape, i, rng, side) for i in range(n)},
+    }
+
+
+def fake_run_prompt(prompt, model=None, base_model=None, **kwargs):
+    """Deterministic plan: move the first object +1 m in x, return the scene in memory."""
+    base = base_model or {}
+    objs = {}
+    for o in base.get("objects") or []:
+        objs[str(o["label"]).upper()] = {
+            "label": str(o["label"]).upper(), "primitive": o.get("primitive") or "cube",
+            "x": o["x"], "y": o["y"], "w": o["w"], "h": o["h"], "height": o.get("height", 0.5),
+        }
+    if objs:
+        first = next(iter(objs.values()))
+        first["x"] += 1.0
+    scene = {"grid_w": server._safe_float((base.get("canvas") or {}).get("width_m"), 40.0),
+             "grid_h": server._safe_float((base.get("canvas") or {}).get("height_m"), 30.0),
+             "objects": objs, "constraints": [], "anchors": {}}
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 800 600"></svg>'
+    return {"scene": scene, "svg_text": svg, "svg": None, "json": None}
+
+
+def _server_timing(header):
+    out = {}
+    for part in (header or "").split(","):
+        name, _, rest = part.strip().partition(";dur=")
+        if name and rest:
+            out[name] = float(rest)
+    return out
+
+
+def _request(client, endpoint, body):
+    t0 = time.perf_counter()
+    resp = client.post(endpoint, data=body, headers={"Content-Type": "application/json"})
+    total = (time.perf_counter() - t0) * 1000.0
+    if resp.status_code != 200:
+        raise RuntimeError(f"{endpoint} -> {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+    return total, _server_timing(resp.headers.get("Server-Timing")), len(resp.get_data())
+
+
+def run_case(client, endpoint, body, repeat):
+    best = None
+    for _ in range(repeat):
+        total, stages, resp_bytes = _request(client, endpoint, body)
+        if best is None or total < best[0]:
+            best = (total, stages, resp_bytes)
+    tracemalloc.start()
+    try:
+        _request(client, endpoint, body)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    total, stages, resp_bytes = best
+    return {
+        "total_ms": round(total, 3),
+        "stages_ms": {k: round(v, 3) for k, v in stages.items()},
+        "request_bytes": len(body), "response_bytes": resp_bytes,
+        "peak_mem_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10,1000,10000,100000")
+    ap.add_argument("--shapes", default=",".join(SHAPES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server.WATCH_PATH = os.path.join(tempfile.mkdtemp(prefix="atlas_bench_"), "live_scene.json")
+    server.FLUSH_MS = 0
+    server.run_prompt = fake_run_prompt
+    client = server.app.test_client()
+
+    results = []
+    for n in [int(x) for x in args.sizes.split(",") if x]:
+        for shape in [s for s in args.shapes.split(",") if s]:
+            scene = synthetic_scene(n, shape)
+            publish_body = json.dumps(scene).encode("utf-8")
+            agent_body = json.dumps({"prompt": "move O0 right 1", "model": scene}).encode("utf-8")
+            repeat = args.repeat if n < 100000 else 1
+            for endpoint, body in (("/publish", publish_body), ("/agent", agent_body)):
+                row = {"endpoint": endpoint, "shape": shape, "objects": n,
+                       **run_case(client, endpoint, body, repeat)}
+                results.append(row)
+                print(f"{endpoint:9s} {shape:13s} {n:>7d}  {row['total_ms']:>10.1f} ms  "
+                      f"{row['peak_mem_mb']:>8.1f} MB", file=sys.stderr)
+
+    doc = {
+        "benchmark": "server_endpoints",
+        "python": platform.python_version(),
+        "numpy": server.np is not None,
+        "bulk_min_objects": server.BULK_MIN_OBJECTS,
+        "results": results,
+    }
+    text = json.dumps(doc, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
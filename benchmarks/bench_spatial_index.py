@@ -0,0 +1,237 @@
+"""Scene spatial index: correctness against brute force, then query cost vs. scene size.
+
+Checks, in order:
+  1. objects_in_rect / objects_overlapping / nearest_objects return what a
+     linear scan of SCENE returns, on random scenes and queries;
+  2. the index the engine keeps up to date matches the scene after random
+     edits, both routed batches and direct engine_* calls (move, add,
+     remove, rename, align, scale, resize, undo, ...);
+  3. engine_create_scene's rejection-sampling random_nonoverlap layout
+     (ATLAS_FAST_PLACEMENT=0) is unchanged from the linear _nonoverlap scan.
+Then, for each size, the time to build the index, a 6 m window range
+query, an overlap query, an 8-nearest query and one incremental update
+after a move, next to the linear scans they replace.
+
+    python benchmarks/bench_spatial_index.py [--sizes 1000,10000,100000] [--queries 200]
+"""
+import argparse, json, math, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ["ATLAS_PERSIST_ARTIFACTS"] = "off"
+
+import ai_agent  # noqa: E402
+
+
+def synthetic(n, seed=0, density=6.0):
+    rng = random.Random(seed)
+    side = math.sqrt(n * density)
+    snap = ai_agent.snap_to_grid
+    objs = {}
+    for i in range(n):
+        w, h = rng.choice([0.5, 1.0, 1.5, 2.0, 4.0]), rng.choice([0.5, 1.0, 1.5, 2.0])
+        objs[f"O{i}"] = {"label": f"O{i}", "primitive": "cube", "height": 1.0,
+                         "x": snap(rng.uniform(1, side - 1)), "y": snap(rng.uniform(1, side - 1)), "w": w, "h": h}
+    return {"grid_w": side, "grid_h": side, "objects": objs, "constraints": [], "anchors": {}}
+
+
+def brute_rect(objs, x0, y0, x1, y1):
+    return {k for k, o in objs.items()
+            if o["x"] + o["w"] / 2 >= x0 and o["x"] - o["w"] / 2 <= x1
+            and o["y"] + o["h"] / 2 >= y0 and o["y"] - o["h"] / 2 <= y1}
+
+
+def brute_overlapping(objs, label, margin):
+    o = objs[label]
+    return {k for k, b in objs.items() if k != label and ai_agent._aabb_overlap(o, b, margin)}
+
+
+def brute_nearest(objs, x, y, k):
+    return sorted(math.hypot(o["x"] - x, o["y"] - y) for o in objs.values())[:k]
+
+
+def _dist(objs, keys, x, y):
+    return [math.hypot(objs[k]["x"] - x, objs[k]["y"] - y) for k in keys]
+
+
+def check_queries(seeds=range(3), n=3000, queries=200):
+    for seed in seeds:
+        ai_agent.SCENE = synthetic(n, seed)
+        objs, side = ai_agent.SCENE["objects"], ai_agent.SCENE["grid_w"]
+        rng = random.Random(seed)
+        for _ in range(queries):
+            x, y, r = rng.uniform(-5, side + 5), rng.uniform(-5, side + 5), rng.uniform(0, 15)
+            assert ai_agent.objects_in_rect(x - r, y - r, x + r, y + r) == brute_rect(objs, x - r, y - r, x + r, y + r)
+            lab, margin = f"O{rng.randrange(n)}", rng.choice([0.0, 0.25, 0.8])
+            assert ai_agent.objects_overlapping(lab, margin) == brute_overlapping(objs, lab, margin)
+            k = rng.choice([1, 8, 30])
+            # ties may order differently; the distances must agree
+            got = _dist(objs, ai_agent.nearest_objects(x, y, k), x, y)
+            assert all(abs(a - b) < 1e-9 for a, b in zip(got, brute_nearest(objs, x, y, k))), (x, y, k)
+
+
+def _random_batch(rng, objs, step):
+    labels = list(objs)
+    L = lambda: rng.choice(labels)
+    tool = rng.choice(["move", "move", "add_object", "remove_object", "rename_object",
+                       "align", "scale", "place_relative", "mirror_object", "undo", "set_height"])
+    args = {"move": lambda: {"target": L(), "dx": rng.choice([-3, -1, 2, 5]), "dy": rng.choice([-2, 0, 4])},
+            "add_object": lambda: {"label": f"N{step}", "x": rng.uniform(2, 30), "y": rng.uniform(2, 30),
+                                   "w": 2.0, "h": 1.0},
+            "remove_object": lambda: {"target": L()},
+            "rename_object": lambda: {"target": L(), "new_label": f"R{step}"},
+            "align": lambda: {"targets": [L(), L(), L()], "axis": rng.choice(["x", "y"]),
+                              "mode": rng.choice(["centers", "lefts", "rights", "tops", "bottoms"])},
+            "scale": lambda: {"target": L(), "factor": rng.choice([0.5, 2.0])},
+            "place_relative": lambda: {"target": L(), "ref": L(), "direction": rng.choice(["left_of", "below"]),
+                                       "distance": 1.0},
+            "mirror_object": lambda: {"target": L(), "axis": rng.choice(["x", "y"])},
+            "undo": lambda: {},
+            "set_height": lambda: {"target": L(), "height": 2.0}}[tool]()
+    return {"commands": [{"tool": tool, "arguments": args}]}
+
+
+def _random_engine_call(rng, objs, step):
+    # the same kinds of edit, straight into the engine as plan_importer and
+    # tool code make them, with no router in between
+    labels = list(objs)
+    L = lambda: rng.choice(labels)
+    calls = [
+        lambda: ai_agent.engine_move(L(), rng.choice([-3, 1, 4]), rng.choice([-2, 0, 3])),
+        lambda: ai_agent.engine_add_object(f"D{step}", "cube", rng.uniform(2, 30), rng.uniform(2, 30), 1.5, 1.0),
+        lambda: ai_agent.engine_remove_object(L()),
+        lambda: ai_agent.engine_rename_object(L(), f"Q{step}"),
+        lambda: ai_agent.engine_batch_rename([[L(), L()], [L(), f"Q{step}"]]),
+        lambda: ai_agent.engine_align([L(), L(), L()], "y", rng.choice(["centers", "tops"])),
+        lambda: ai_agent.engine_distribute([L(), L(), L(), L()], "x", "equal_gaps", None),
+        lambda: ai_agent.engine_scale(L(), rng.choice(["x", "y", "both"]), rng.choice([0.5, 2.0])),
+        lambda: ai_agent.engine_place_relative(L(), L(), rng.choice(["above", "right_of"]), 1.0),
+        lambda: ai_agent.engine_place_left_of(L(), f"P{step}", gap=0.5),
+        lambda: ai_agent.engine_merge_objects(L(), L()),
+        lambda: ai_agent.engine_move_group([L(), L()], 1.0, -1.0, symmetric=rng.random() < 0.5),
+        lambda: ai_agent.engine_move_into_bbox(L(), {"x": 5.0, "y": 5.0, "w": 2.0, "h": 2.0}),
+        lambda: ai_agent.engine_stack_above(L(), L()),
+        lambda: ai_agent.engine_mirror_object(L(), rng.choice(["x", "y"])),
+        lambda: ai_agent.engine_resize_canvas(ai_agent.SCENE["grid_w"] + 2, ai_agent.SCENE["grid_h"], True),
+        lambda: ai_agent.engine_undo(),
+    ]
+    rng.choice(calls)()
+
+
+def check_incremental(steps=400, n=400):
+    ai_agent.SCENE = synthetic(n, 7)
+    ai_agent.invalidate_spatial_index()
+    rng = random.Random(7)
+    kept = 0
+    for step in range(steps):
+        ai_agent.spatial_index()
+        try:
+            if step % 2:
+                _random_engine_call(rng, ai_agent.SCENE["objects"], step)
+            else:
+                ai_agent.route_and_execute(_random_batch(rng, ai_agent.SCENE["objects"], step), "",
+                                           merge_existing=True)
+        except Exception:
+            pass
+        idx = ai_agent.SCENE_INDEX
+        if idx is not None and idx.source is ai_agent.SCENE["objects"]:
+            expected = {k: (o["x"], o["y"], o["w"], o["h"]) for k, o in ai_agent.SCENE["objects"].items()}
+            assert idx.rects == expected, f"index out of date after step {step}"
+            kept += 1
+    return kept / steps
+
+
+def _create_scene_reference(labels, size, margin, seed, grid_w, grid_h):
+    # the pre-index loop: every attempt scans every placed object
+    snap = ai_agent.snap_to_grid
+    rng, size, placed, out = random.Random(seed), snap(float(size)), [], {}
+    for lab in labels:
+        for _ in range(5000):
+            cx, cy = snap(rng.uniform(size, grid_w - size)), snap(rng.uniform(size, grid_h - size))
+            if ai_agent._nonoverlap((cx, cy), size, margin, placed):
+                break
+        else:
+            cx, cy = snap(size + len(placed) * (size + margin)), snap(size * 1.5)
+        out[lab] = (cx, cy)
+        placed.append({"x": cx, "y": cy, "w": size})
+    return out
+
+
+def check_create_scene():
+    saved, ai_agent.FAST_PLACEMENT = ai_agent.FAST_PLACEMENT, False
+    try:
+        _check_create_scene()
+    finally:
+        ai_agent.FAST_PLACEMENT = saved
+
+
+def _check_create_scene():
+    for seed, count, size, margin, gw, gh in [(0, 12, 3, 0.8, 40, 30), (5, 40, 2, 0.5, 40, 30),
+                                              (9, 60, 3, 0.8, 40, 30), (3, 200, 1, 0.5, 60, 60)]:
+        labels = [f"L{i}" for i in range(count)]
+        ai_agent.engine_create_scene(list(labels), "cube", count, "random_nonoverlap", size, margin, seed, gw, gh)
+        got = {k: (o["x"], o["y"]) for k, o in ai_agent.SCENE["objects"].items()}
+        assert got == _create_scene_reference(labels, size, margin, seed, gw, gh), (seed, count)
+
+
+def _best_us(fn, repeat):
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        dt = (time.perf_counter() - t0) / repeat * 1e6
+        best = dt if best is None else min(best, dt)
+    return round(best, 1)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    check_queries()
+    kept = check_incremental()
+    check_create_scene()
+    report = {"equivalent": True, "index_kept_share": round(kept, 3), "cell_m": ai_agent.INDEX_CELL, "sizes": []}
+    for n in [int(x) for x in args.sizes.split(",") if x]:
+        ai_agent.SCENE = synthetic(n, 1)
+        objs, side = ai_agent.SCENE["objects"], ai_agent.SCENE["grid_w"]
+        t0 = time.perf_counter()
+        ai_agent.invalidate_spatial_index()
+        ai_agent.spatial_index()
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        rng = random.Random(n)
+        pts = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(args.queries)]
+        labs = [f"O{rng.randrange(n)}" for _ in range(args.queries)]
+        it = lambda seq: iter(seq * 1000)
+        win = lambda x, y: (x - 3, y - 3, x + 3, y + 3)   # 6 m window
+        p1, p2, l1, l2 = it(pts), it(pts), it(labs), it(labs)
+        slow = max(3, args.queries // 20)
+        row = {
+            "objects": n, "build_ms": round(build_ms, 1),
+            "rect_us": _best_us(lambda: ai_agent.objects_in_rect(*win(*next(p1))), args.queries),
+            "rect_scan_us": _best_us(lambda: brute_rect(objs, *win(*next(p2))), slow),
+            "overlap_us": _best_us(lambda: ai_agent.objects_overlapping(next(l1), 0.5), args.queries),
+            "overlap_scan_us": _best_us(lambda: brute_overlapping(objs, next(l2), 0.5), slow),
+        }
+        p3, p4 = it(pts), it(pts)
+        row["nearest8_us"] = _best_us(lambda: ai_agent.nearest_objects(*next(p3), 8), args.queries)
+        row["nearest8_scan_us"] = _best_us(lambda: brute_nearest(objs, *next(p4), 8), slow)
+
+        def move():
+            # what an engine edit does to keep the index, minus the edit itself
+            lab = next(mv)
+            objs[lab]["x"] += 0.5
+            ai_agent._index_refresh({lab})
+        mv = it(labs)
+        row["update_us"] = _best_us(move, args.queries)
+        report["sizes"].append(row)
+        print(f"{n:>7d}  build {row['build_ms']:>8.1f} ms  rect {row['rect_us']:>7.1f} us  "
+              f"nearest {row['nearest8_us']:>7.1f} us  (scan {row['nearest8_scan_us']:>9.1f} us)", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Time-to-first-change for streamed vs. whole-completion planning.
+
+Both modes run the same plan through run_prompt against FakeStreamingClient,
+which replays it with a fixed first-token delay and per-chunk delay, so the
+numbers are model-independent and reproducible offline.
+
+    python benchmarks/bench_stream_plan.py [--commands 12] [--first-token-ms 400] [--chunk-ms 4]
+"""
+import argparse, json, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import ai_agent  # noqa: E402
+from planner_backends import FakeStreamingClient  # noqa: E402
+
+
+def _plan(n):
+    cmds = [{"tool": "add_object", "arguments": {
+        "label": f"O{i}", "primitive": "cube", "x": 2.0 + 3 * (i % 10), "y": 2.0 + 3 * (i // 10),
+        "w": 1.0, "h": 1.0}} for i in range(n)]
+    cmds += [{"tool": "render_svg", "arguments": {"view": "topdown"}},
+             {"tool": "export_state", "arguments": {}}]
+    return {"commands": cmds}
+
+
+def _run(stream, prompt):
+    t0 = time.perf_counter()
+    marks = []
+    ai_agent.run_prompt(prompt, base_model={"grid_w": 40, "grid_h": 40, "objects": {}},
+                        stream=stream, on_step=lambda cmd: marks.append((cmd["tool"], time.perf_counter())))
+    total = time.perf_counter() - t0
+    first = next((t for tool, t in marks if tool == "add_object"), None)
+    return {
+        "first_change_ms": round((first - t0) * 1000.0, 2) if first else None,
+        "total_ms": round(total * 1000.0, 2),
+        "steps": len(marks),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--commands", type=int, default=12)
+    ap.add_argument("--first-token-ms", type=float, default=400.0)
+    ap.add_argument("--chunk-ms", type=float, default=4.0)
+    ap.add_argument("--chunk-chars", type=int, default=8)
+    args = ap.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="atlas_bench_"))  # artifacts land here
+    plan = _plan(args.commands)
+    ai_agent.client = FakeStreamingClient(
+        plan, chunk_chars=args.chunk_chars,
+        first_token_s=args.first_token_ms / 1000.0, token_delay_s=args.chunk_ms / 1000.0)
+
+    prompt = "add the objects"
+    results = {"commands": args.commands, "plan_chars": len(json.dumps(plan)),
+               "blocking": _run(False, prompt), "streamed": _run(True, prompt)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
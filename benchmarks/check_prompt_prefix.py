@@ -0,0 +1,65 @@
+"""Check that the planner's system prefix is byte-identical across requests.
+
+Builds the planner messages for a set of prompts against different scenes
+and sessions. The first message must be the same bytes every time and
+must not contain the per-request seed. Then it runs the prompts through
+ask_agent_multi with the offline FakeStreamingClient, which reports cached
+tokens the way the API does (a shared prefix of 1024+ tokens, in 128-token
+blocks), and prints the PLANNER_USAGE counters.
+
+    python benchmarks/check_prompt_prefix.py
+"""
+import json, os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ["ATLAS_PLAN_CACHE"] = "off"
+os.environ["ATLAS_LOCAL_PLANNER"] = "0"
+os.environ["ATLAS_PERSIST_ARTIFACTS"] = "off"
+
+import ai_agent  # noqa: E402
+from planner_backends import FakeStreamingClient  # noqa: E402
+
+PROMPTS = ["add a cube A at the center", "move A left 2", "align A B C lefts",
+           "put Z between A and B", "Add a tree called T near the north edge", "undo"]
+
+
+def scene(n):
+    return {"grid_w": 40.0, "grid_h": 30.0, "objects": {
+        f"O{i}": {"label": f"O{i}", "primitive": "cube", "x": 2.0 + i, "y": 3.0, "w": 1.0, "h": 1.0,
+                  "height": 1.0} for i in range(n)}}
+
+
+def main():
+    prefixes = set()
+    for i, prompt in enumerate(PROMPTS):
+        with ai_agent.SceneSession(f"prefix-{i}").bound():
+            ai_agent._restore_scene(scene(i * 3))
+            seed = ai_agent.prompt_seed(prompt)
+            messages = ai_agent._plan_messages(prompt, seed)
+        first = messages[0]["content"].encode("utf-8")
+        assert str(seed) not in messages[0]["content"], "seed leaked into the static prefix"
+        prefixes.add(first)
+    assert len(prefixes) == 1, f"{len(prefixes)} different system prefixes"
+    prefix = prefixes.pop()
+
+    plan = {"commands": [{"tool": "report_error", "arguments": {"code": "E_NOOP", "message": "noop"}}]}
+    ai_agent.client = FakeStreamingClient(plan)
+    sess = ai_agent.SceneSession("prefix-run")
+    for i, prompt in enumerate(PROMPTS):
+        with sess.bound():
+            ai_agent._restore_scene(scene(i))
+            ai_agent.ask_agent_multi(prompt)
+    usage = dict(ai_agent.PLANNER_USAGE)
+    print(json.dumps({
+        "identical_prefix": True,
+        "prefix_bytes": len(prefix),
+        "prefix_sha256": ai_agent.hashlib.sha256(prefix).hexdigest()[:16],
+        "usage": usage,
+        "cached_share": round(usage["cached_tokens"] / max(1, usage["prompt_tokens"]), 3),
+    }, indent=2))
+    assert usage["cached_tokens"] > 0, "no cached tokens reported after the first call"
+
+
+if __name__ == "__main__":
+    main()
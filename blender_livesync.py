@@ -1,10 +1,25 @@
 # blender_livesync.py — drop this into Blender's Text Editor and "Run Script" once
-import bpy, json, os, time, math
+import bpy, json, os, time, math, queue, threading, urllib.request
+try:
+    import orjson                          # optional: faster parsing if installed in Blender's Python
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+def _read_json(path):
+    with open(path, "rb") as f:
+        return _loads(f.read())
 
 WATCH_PATH = r"C:\GITCLONE\atlas-scene-agent\live_scene.json"# <- change if you prefer a different path
 CHECK_EVERY = 0.5                          # seconds
 _last_mtime = None
 _last_sig = None 
+JOURNAL_MODE = False                       # tail server.py's journal (ATLAS_JOURNAL=1) instead of re-reading WATCH_PATH
+JOURNAL_PATH = os.path.splitext(WATCH_PATH)[0] + ".journal.jsonl"
+_journal = {"gen": None, "seq": 0, "offset": 0, "spec": None}
+FEED_MODE = False                          # subscribe to server.py's /events push feed instead of polling files
+FEED_URL = "http://127.0.0.1:5544/events"
+FEED_POLL = 0.05                           # seconds between main-thread drains of received events
 GRID_NAME = "RefGrid"   # put this near your CONFIG block
 CREATE_RAMP_ARROW = False   # ignore ramp_arrow objects coming from JSON
 # --- Label display settings ---
@@ -501,9 +516,127 @@ def _apply_commands(spec: dict):
             else:               _add_cube(label, x, y, cz, w, d, H)
 
 
+def _apply_journal_record(spec: dict, rec: dict):
+    """Fold one journal delta record into the cached spec."""
+    objs = spec.setdefault("objects", {})
+    objs.update(rec.get("upsert") or {})
+    for label in rec.get("removed") or []:
+        objs.pop(label, None)
+    for k in ("grid_w", "grid_h", "_source"):
+        if rec.get(k) is not None:
+            spec[k] = rec[k]
+    spec["_seq"] = rec["seq"]
+
+
+def _tick_journal():
+    """Read only the journal bytes appended since the last tick."""
+    global _journal
+    if not os.path.exists(JOURNAL_PATH):
+        return False
+    with open(JOURNAL_PATH, "rb") as fb:
+        try:
+            header = _loads(fb.readline() or b"null")
+        except ValueError:
+            header = None
+        if not isinstance(header, dict):
+            return False   # server is mid-rotation; retry next tick
+        changed = False
+        if header.get("gen") != _journal["gen"]:
+            # new generation: reload the compacted checkpoint, tail from the top
+            spec = _read_json(WATCH_PATH)
+            _journal = {"gen": header.get("gen"), "seq": int(spec.get("_seq", 0)),
+                        "offset": fb.tell(), "spec": spec}
+            changed = True
+        fb.seek(_journal["offset"])
+        chunk = fb.read()
+    end = chunk.rfind(b"\n") + 1          # ignore a partially written last line
+    for line in chunk[:end].splitlines():
+        if not line.strip():
+            continue
+        rec = _loads(line)
+        if int(rec.get("seq", 0)) <= _journal["seq"]:
+            continue
+        _apply_journal_record(_journal["spec"], rec)
+        _journal["seq"] = int(rec["seq"])
+        changed = True
+    _journal["offset"] += end
+    if changed:
+        spec = _journal["spec"]
+        print(f"[LiveSync] Journal seq={_journal['seq']} (src={spec.get('_source', '?')})")
+        _apply_commands(spec)
+    return changed
+
+
+# --- push feed (SSE) client: a reader thread queues events, the timer applies them ---
+_feed_events = queue.Queue()
+_feed_stop = threading.Event()
+_feed_thread = None
+_feed_spec = None
+
+
+def _feed_reader():
+    """Background thread: parse server-sent events from FEED_URL into _feed_events."""
+    backoff = 0.5
+    while not _feed_stop.is_set():
+        try:
+            with urllib.request.urlopen(FEED_URL, timeout=60) as resp:
+                backoff = 0.5
+                data = []
+                for raw in resp:
+                    if _feed_stop.is_set():
+                        return
+                    line = raw.decode("utf-8").rstrip("\r\n")
+                    if line.startswith("data:"):
+                        data.append(line[5:].lstrip())
+                    elif not line and data:
+                        _feed_events.put(_loads("\n".join(data)))
+                        data = []
+        except Exception as e:
+            print("[LiveSync][Feed] reconnecting:", e)
+            _feed_stop.wait(backoff)
+            backoff = min(backoff * 2.0, 5.0)
+
+
+def _start_feed():
+    global _feed_thread
+    if _feed_thread is None or not _feed_thread.is_alive():
+        _feed_stop.clear()
+        _feed_thread = threading.Thread(target=_feed_reader, name="LiveSyncFeed", daemon=True)
+        _feed_thread.start()
+
+
+def _tick_feed():
+    """Apply every event received since the last tick (main thread only)."""
+    global _feed_spec
+    changed = False
+    while True:
+        try:
+            rec = _feed_events.get_nowait()
+        except queue.Empty:
+            break
+        if rec.get("op") == "full":
+            _feed_spec = rec.get("scene") or {}
+            _feed_spec["_seq"] = rec.get("seq", 0)
+            changed = True
+        elif _feed_spec is not None and rec.get("seq", 0) > _feed_spec.get("_seq", 0):
+            _apply_journal_record(_feed_spec, rec)
+            changed = True
+    if changed:
+        print(f"[LiveSync] Feed seq={_feed_spec.get('_seq')} (src={_feed_spec.get('_source', '?')})")
+        _apply_commands(_feed_spec)
+    return changed
+
+
 def _tick():
     global _last_mtime, _last_sig
     try:
+        if FEED_MODE:
+            _start_feed()
+            _tick_feed()
+            return FEED_POLL
+        if JOURNAL_MODE:
+            _tick_journal()
+            return CHECK_EVERY
         if os.path.exists(WATCH_PATH):
             mtime = os.path.getmtime(WATCH_PATH)
             size = os.path.getsize(WATCH_PATH)
@@ -520,8 +653,7 @@ def _tick():
             if _last_sig != sig:
                 _last_mtime = mtime
                 _last_sig = sig
-                with open(WATCH_PATH, "r", encoding="utf-8") as f:
-                    spec = json.load(f)
+                spec = _read_json(WATCH_PATH)
                 src = spec.get("_source", "?")
                 print(f"[LiveSync] Detected change (src={src}); applying {WATCH_PATH}")
                 _apply_commands(spec)
@@ -541,9 +673,10 @@ print(f"[LiveSync] Watching: {WATCH_PATH}")
 import bpy
 
 def enable_livesync():
-    global _last_mtime, _last_sig
+    global _last_mtime, _last_sig, _journal
     _last_mtime = None
     _last_sig = None
+    _journal = {"gen": None, "seq": 0, "offset": 0, "spec": None}
     print(f"[LiveSync] ENABLED. Watching: {WATCH_PATH}")
     # avoid duplicate timers
     try:
@@ -553,6 +686,7 @@ def enable_livesync():
     bpy.app.timers.register(_tick, first_interval=0.2, persistent=True)
 
 def disable_livesync():
+    _feed_stop.set()
     try:
         bpy.app.timers.unregister(_tick)
         print("[LiveSync] DISABLED.")
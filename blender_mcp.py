@@ -0,0 +1,158 @@
+"""Blender MCP socket sender + delta applier for the "objects" JSON schema.
+
+Pushes only what changed since the last call to an already-open Blender
+MCP add-on. Loaded on first use through ai_agent (ai_agent.apply_scene_delta).
+"""
+import copy, socket
+from pathlib import Path
+
+import scene_json
+
+MCP_HOST = "localhost"
+MCP_PORT = 9876
+STATE_FILE = Path(".atlas_last_scene_state.json")  # persists across cells
+
+def _send_to_blender_mcp(payload: dict, host=MCP_HOST, port=MCP_PORT, timeout=5):
+    """Send a JSON command batch to the already-open Blender MCP add-on."""
+    data = scene_json.dumpb(payload) + b"\n"  # newline-terminated
+    with socket.create_connection((host, port), timeout=timeout) as s:
+        s.sendall(data)
+        # (Optional) read a short reply if the add-on responds
+        try:
+            s.shutdown(socket.SHUT_WR)
+            reply = s.recv(65536)
+            if reply:
+                print("MCP reply:", reply.decode("utf-8", errors="ignore")[:500])
+        except Exception:
+            pass
+
+def _load_objects_from_json(json_path: str) -> dict:
+    """Return the 'objects' dict; if file has 'commands' only, synthesize objects from add_object commands."""
+    spec = scene_json.read(json_path)
+    if "objects" in spec and isinstance(spec["objects"], dict):
+        return copy.deepcopy(spec["objects"])
+    # fallback: build objects from add_object commands (best-effort)
+    objs = {}
+    for c in spec.get("commands", []):
+        if c.get("tool") == "add_object":
+            a = c.get("arguments", {}) or {}
+            label = a.get("label") or a.get("name") or f"Obj{len(objs)+1}"
+            objs[label] = {
+                "primitive": a.get("primitive", "cube"),
+                "x": a.get("x", 0.0), "y": a.get("y", 0.0), "z": a.get("z", 0.0),
+                "w": a.get("w") or a.get("width") or a.get("size") or 1.0,
+                "h": a.get("h") or a.get("depth") or a.get("size") or 1.0,
+                "height": a.get("height") or a.get("size") or 1.0,
+            }
+    return objs
+
+def _norm(obj: dict):
+    """Normalize numeric fields to floats and provide defaults."""
+    return {
+        "primitive": obj.get("primitive", "cube"),
+        "x": float(obj.get("x", 0.0)),
+        "y": float(obj.get("y", 0.0)),
+        "z": float(obj.get("z", 0.0)),
+        "w": float(obj.get("w") or obj.get("width") or obj.get("size") or 1.0),
+        "h": float(obj.get("h") or obj.get("depth") or obj.get("size") or 1.0),
+        "height": float(obj.get("height") or obj.get("size") or 1.0),
+    }
+
+def _build_delta_commands(prev_objs: dict, curr_objs: dict):
+    """
+    Compare prev vs curr 'objects' dicts. Emit:
+      - add_object for new labels
+      - move for position deltas
+      - resize (via scale-by-dimension) for dimension deltas
+    """
+    commands = []
+
+    # 1) Adds for new objects
+    for label, o in curr_objs.items():
+        if label not in prev_objs:
+            oN = _norm(o)
+            commands.append({
+                "tool": "add_object",
+                "arguments": {
+                    "label": label,
+                    "primitive": oN["primitive"],
+                    "x": oN["x"], "y": oN["y"], "z": oN["z"],
+                    "w": oN["w"], "h": oN["h"], "height": oN["height"],
+                }
+            })
+
+    # 2) Moves & resizes for existing objects
+    def _ne(a,b,eps=1e-6): return abs(a-b) > eps
+
+    for label, oCurr in curr_objs.items():
+        if label not in prev_objs:
+            continue
+        a = _norm(prev_objs[label]); b = _norm(oCurr)
+
+        # position delta
+        dx, dy, dz = b["x"]-a["x"], b["y"]-a["y"], b["z"]-a["z"]
+        if _ne(dx,0.0) or _ne(dy,0.0) or _ne(dz,0.0):
+            commands.append({
+                "tool": "move",
+                "arguments": {"label": label, "dx": dx, "dy": dy, "dz": dz}
+            })
+
+        # size delta (emit a "resize_to" custom op that your MCP add-on should understand; if not, we can fall back to delete+add)
+        if _ne(a["w"], b["w"]) or _ne(a["h"], b["h"]) or _ne(a["height"], b["height"]):
+            commands.append({
+                "tool": "resize_to",
+                "arguments": {"label": label, "w": b["w"], "h": b["h"], "height": b["height"]}
+            })
+
+    # 3) (Optional) Deletes for removed objects
+    for label in prev_objs.keys() - curr_objs.keys():
+        commands.append({"tool": "delete", "arguments": {"label": label}})
+
+    return commands
+
+def _load_prev_state():
+    if STATE_FILE.exists():
+        try:
+            return scene_json.read(STATE_FILE)
+        except Exception:
+            pass
+    return {}
+
+def _save_state(objs: dict):
+    scene_json.write(STATE_FILE, objs)
+
+def apply_scene_delta(json_path: str, reset_if_empty=True):
+    """Compute delta from last state and push only the edits to Blender via MCP."""
+    curr = _load_objects_from_json(json_path)
+
+    # Normalize all
+    currN = {k:_norm(v) for k,v in curr.items()}
+    prevN = _load_prev_state()
+
+    # First run? Do a reset + full add to ensure clean slate.
+    if not prevN and reset_if_empty:
+        cmds = []
+        cmds.append({"tool": "reset_scene", "arguments": {}})  # let add-on clear the scene, set meters, etc.
+        for label, o in currN.items():
+            cmds.append({
+                "tool":"add_object",
+                "arguments":{"label":label,"primitive":o["primitive"],
+                             "x":o["x"],"y":o["y"],"z":o["z"],
+                             "w":o["w"],"h":o["h"],"height":o["height"]}
+            })
+        payload = {"commands": cmds}
+        _send_to_blender_mcp(payload)
+        _save_state(currN)
+        print(f"Applied initial scene: {len(cmds)-1} objects.")
+        return
+
+    # Subsequent runs: compute delta
+    cmds = _build_delta_commands(prevN, currN)
+    if not cmds:
+        print("No changes detected.")
+        return
+
+    payload = {"commands": cmds}
+    _send_to_blender_mcp(payload)
+    _save_state(currN)
+    print(f"Applied {len(cmds)} change(s).")
@@ -0,0 +1,624 @@
+"""Universal plan JSON importer.
+
+Converts ANY reasonable top-down plan JSON into your agent's command batch:
+- Auto-detects units & scale; supports px/cm/m (+ optional scale bar in meta)
+- Finds "objects" anywhere; supports rect/circle/ellipse/polygon/polyline/line
+- Everything -> axis-aligned rectangle footprint; preserves label & height if present
+- Snaps all dimensions/positions to your 0.5 m grid
+- Finishes with render_svg + export_state
+
+Usage:
+  outs = import_any_topdown_json_and_build(plan_json_str, write_to_watch=True)
+  print(outs.get("svg"), outs.get("json"))
+
+Loaded on first use through ai_agent (ai_agent.import_any_topdown_json_and_build).
+The engine scene and the STATE mirror are ai_agent's (per session).
+"""
+import math, json, os
+
+import ai_agent
+import scene_json
+
+GRID_CELL = 0.5     # your system's snap size (meters)
+DEFAULT_H = 0.5     # fallback height if none is given (meters)
+# ---- Pixel-faithful profile toggles ----
+SNAP_POSITIONS = True     # snap centers to grid
+SNAP_SIZES = False             # do NOT snap sizes
+REBASE_TO_MARGIN = False    # no re-base; keep original px origin
+MARGIN_M = 0.0
+AUTO_CANVAS_POLICY = "resize_scene"  # critical
+MAX_GRID_W = 400.0
+MAX_GRID_H = 400.0
+# Keep real heights; no plan cap by default (set to e.g. 0.20 if you want)
+PLAN_MAX_H = None
+
+# Accept only these shapes (unknowns skipped unless they provide x,y,w,h)
+ACCEPTED_TYPES = {"rect", "circle", "ellipse", "polygon", "polyline"}
+def _snap_pos(v, step=GRID_CELL):
+    return round(float(v)/step)*step if SNAP_POSITIONS else float(v)
+
+def _snap_size(v, step=GRID_CELL):
+    return round(float(v)/step)*step if SNAP_SIZES else float(v)
+
+def _canvas_px(plan, default=(800, 800)):
+    cv = plan.get("canvas") or {}
+    if "width" in cv and "height" in cv:
+        return float(cv["width"]), float(cv["height"])
+    vb = cv.get("viewBox") or cv.get("viewbox")
+    if isinstance(vb, (list, tuple)) and len(vb) == 4:
+        return float(vb[2]), float(vb[3])
+    return default
+def _label_from(entry):
+    o, k = entry["node"], entry["key"]
+    # preserve verbatim (no uppercasing)
+    return str(o.get("label") or o.get("id") or k or "OBJ")
+
+def _apply_height_cap(h):
+    return min(h, PLAN_MAX_H) if PLAN_MAX_H else h
+
+
+def _looks_like_room(ow, ia):
+    if not (ow and ia): 
+        return False
+    try:
+        xO,yO,wO,hO = float(ow["x"]), float(ow["y"]), float(ow["w"]), float(ow["h"])
+        xI,yI,wI,hI = float(ia["x"]), float(ia["y"]), float(ia["w"]), float(ia["h"])
+    except Exception:
+        return False
+    inside = (xO < xI) and (yO < yI) and (xO+wO > xI+wI) and (yO+hO > yI+hI)
+    min_thick = max(1e-6, min(wO, hO) * 0.02)  # 2% thickness floor
+    thick_ok  = (wO - wI) > min_thick and (hO - hI) > min_thick
+    return inside and thick_ok
+
+def _snap(v, step=GRID_CELL): 
+    return round(float(v)/step)*step
+
+def _units_to_m_per_px(units: str) -> float:
+    """
+    Returns meters per "pixel-like" unit. If units are physical, returns scale accordingly.
+    - 'm'   -> 1.0 (already meters)
+    - 'cm'  -> 0.01
+    - 'mm'  -> 0.001
+    - 'px'  -> derived separately from scale bar, else default 100 px ≈ 1 m
+    - unknown -> assume px (100 px ≈ 1 m)
+    """
+    if not units: 
+        # treat as px; m/px resolved later
+        return None
+    u = str(units).strip().lower()
+    if u in ("m", "meter", "meters"):
+        return 1.0
+    if u in ("cm", "centimeter", "centimeters"):
+        return 0.01
+    if u in ("mm", "millimeter", "millimeters"):
+        return 0.001
+    if u in ("px", "pixel", "pixels"):
+        return None  # defer to scale bar/default
+    # unknown → treat as px
+    return None
+
+def _m_per_px_from_meta(plan: dict) -> float:
+    """Use meta.approx_scale_bar.length_px ≈ 1 m if present, else default 100 px/m."""
+    meta = (plan.get("meta") or {})
+    sb = (meta.get("approx_scale_bar") or {})
+    if isinstance(sb, dict) and "length_px" in sb:
+        try:
+            px = float(sb["length_px"])
+            if px > 0:
+                return 1.0 / px
+        except:
+            pass
+    # default: 100 px ≈ 1 m
+    return 1.0 / 100.0
+
+def _resolve_scale(plan: dict):
+    """
+    Returns (m_per_unit, is_px_like).
+
+    Heuristic:
+    - If many nodes look like agent objects (have 'primitive' and 'height' and x,y,w,h),
+      assume meters (1.0) and not px-like.
+    - Else use explicit units if present, else fall back to px-like via meta/defaults.
+    """
+    # quick probe for agent-style objects
+    def _probe_agentish(nodes):
+        hits = 0; total = 0
+        for n in nodes:
+            if isinstance(n, dict):
+                total += 1
+                if all(k in n for k in ("x","y","w","h")) and ("primitive" in n) and ("height" in n):
+                    hits += 1
+        return hits, total
+
+    # collect a shallow sample of dict values from plan
+    sample_vals = []
+    if isinstance(plan, dict):
+        sample_vals.extend(v for v in plan.values() if isinstance(v, dict))
+        obj = plan.get("objects")
+        if isinstance(obj, dict):
+            sample_vals.extend(list(obj.values())[:20])
+        elif isinstance(obj, list):
+            sample_vals.extend([v for v in obj if isinstance(v, dict)][:20])
+
+    hits, total = _probe_agentish(sample_vals)
+    if total and hits/total >= 0.4:   # 40% look agent-style → assume meters
+        return 1.0, False
+
+    # else use declared units / px-like path
+    units = (plan.get("units") or plan.get("unit") or "").strip().lower()
+    m_per_unit = _units_to_m_per_px(units)
+    if m_per_unit is not None:
+        return m_per_unit, False
+    return _m_per_px_from_meta(plan), True
+
+def _bbox_from_rect(o):
+    # rect with top-left x,y and w,h
+    return float(o["x"]), float(o["y"]), float(o["w"]), float(o["h"])
+
+def _bbox_from_circle(o):
+    cx, cy, r = float(o["cx"]), float(o["cy"]), float(o["r"])
+    x = cx - r; y = cy - r; w = 2*r; h = 2*r
+    return x, y, w, h
+
+def _bbox_from_ellipse(o):
+    cx, cy, rx, ry = float(o["cx"]), float(o["cy"]), float(o["rx"]), float(o["ry"])
+    x = cx - rx; y = cy - ry; w = 2*rx; h = 2*ry
+    return x, y, w, h
+
+def _bbox_from_points(points):
+    xs = [p[0] for p in points]; ys = [p[1] for p in points]
+    x0, y0 = min(xs), min(ys); x1, y1 = max(xs), max(ys)
+    return x0, y0, (x1 - x0), (y1 - y0)
+
+def _parse_points_any(o):
+    """
+    Accepts:
+      - list of [x,y] pairs in o["points"]
+      - SVG-like "points" string "x1,y1 x2,y2 ..."
+      - explicit bbox dict in o["bbox"] = {x,y,w,h}
+    """
+    if "bbox" in o and isinstance(o["bbox"], dict):
+        b = o["bbox"]; 
+        if all(k in b for k in ("x","y","w","h")):
+            return float(b["x"]), float(b["y"]), float(b["w"]), float(b["h"])
+    pts = o.get("points")
+    if isinstance(pts, str):
+        try:
+            arr = []
+            for token in pts.strip().split():
+                xy = token.split(",")
+                if len(xy) == 2:
+                    arr.append((float(xy[0]), float(xy[1])))
+            if arr:
+                return _bbox_from_points(arr)
+        except:
+            return None
+    if isinstance(pts, list) and pts and isinstance(pts[0], (list, tuple)):
+        try:
+            return _bbox_from_points([(float(a), float(b)) for a,b in pts])
+        except:
+            return None
+    return None
+
+def _bbox_from_line(o):
+    # line: (x1,y1)→(x2,y2). thickness from strokeWidth if any (else small).
+    x1, y1, x2, y2 = float(o["x1"]), float(o["y1"]), float(o["x2"]), float(o["y2"])
+    stroke = float(o.get("strokeWidth", o.get("stroke_width", 0.0)) or 0.0)
+    x0, x1m = min(x1,x2), max(x1,x2)
+    y0, y1m = min(y1,y2), max(y1,y2)
+    w = max(1e-6, x1m - x0); h = max(1e-6, y1m - y0)
+    # inflate minimally by stroke to avoid zero-height rectangles
+    w = max(w, stroke); h = max(h, stroke)
+    return x0, y0, w, h
+def _bbox_from_generic(o):
+    t = (o.get("type") or o.get("shape") or "").strip().lower()
+
+    try:
+        if t == "rect":
+            return float(o["x"]), float(o["y"]), float(o["w"]), float(o["h"])
+        if t == "circle":
+            cx, cy, r = float(o["cx"]), float(o["cy"]), float(o["r"])
+            d = 2.0 * r
+            return (cx - r), (cy - r), d, d
+        if t == "ellipse":
+            cx, cy, rx, ry = float(o["cx"]), float(o["cy"]), float(o["rx"]), float(o["ry"])
+            return (cx - rx), (cy - ry), 2.0*rx, 2.0*ry
+        if t in ("polygon", "polyline"):
+            return _parse_points_any(o)
+    except Exception:
+        return None
+
+    # Agent-style: center-based if primitive present
+    if "primitive" in o and all(k in o for k in ("x","y","w","h")):
+        try:
+            return _bbox_from_agent_center(o)
+        except Exception:
+            return None
+
+    # Fallback: top-left bbox if explicitly provided
+    if all(k in o for k in ("x","y","w","h")):
+        try:
+            return float(o["x"]), float(o["y"]), float(o["w"]), float(o["h"])
+        except Exception:
+            return None
+
+    return None
+
+def _bbox_from_agent_center(o):
+    cx, cy = float(o["x"]), float(o["y"])
+    w, h   = float(o["w"]), float(o["h"])
+    return cx - w/2.0, cy - h/2.0, w, h
+
+
+def _extract_height(o):
+    """
+    Preserve any height-like info if present (meters if plan units were meters; else scaled).
+    Checks common keys: height, z, z_height, H, thickness, elevation (as height of object, not base).
+    """
+    for k in ("height","z_height","H","thickness","z","elevation"):
+        if k in o:
+            try:
+                return float(o[k])
+            except:
+                continue
+    return None
+
+def _collect_objects_anywhere(plan: dict):
+    """
+    Returns (structurals, items, details) with key hints preserved.
+    - structurals: things under plan["room"] like outer_wall/inner_area/window/door (used to build wall bands)
+    - items: plan["objects"] (furniture etc.)
+    - details: tiny extras we still want (e.g., door leaf)
+    Each entry is dict: {"node": o, "key": key_hint}
+    """
+    structurals, items, details = [], [], []
+
+    def visit(node, key_hint=None, in_room=False, in_objects=False):
+        if isinstance(node, dict):
+            # Consider as drawable if it looks like a shape
+            looks_like_shape = (node.get("type") or
+                                any(k in node for k in ("x","y","w","h","cx","cy","r","rx","ry","points","x1","y1","x2","y2","bbox")))
+            if looks_like_shape:
+                entry = {"node": node, "key": key_hint}
+                if in_room:
+                    structurals.append(entry)
+                elif in_objects:
+                    items.append(entry)
+                else:
+                    details.append(entry)
+            for k, v in node.items():
+                visit(v, key_hint=k, in_room=in_room or (key_hint=="room"), in_objects=in_objects or (key_hint=="objects"))
+        elif isinstance(node, list):
+            for v in node:
+                visit(v, key_hint=key_hint, in_room=in_room, in_objects=in_objects)
+
+    # Prefer explicit sections
+    if isinstance(plan.get("objects"), list):
+        for o in plan["objects"]:
+            items.append({"node": o, "key": o.get("id") or o.get("label") or "OBJ"})
+    if isinstance(plan.get("room"), dict):
+        visit(plan["room"], key_hint="room", in_room=True)
+
+    # Light sweep for details (but not to duplicate items/room we already got)
+    visit(plan)
+
+    # Dedup by object id
+    def _dedup(lst):
+        seen = set(); out=[]
+        for e in lst:
+            oid = id(e["node"])
+            if oid not in seen:
+                seen.add(oid); out.append(e)
+        return out
+    return _dedup(structurals), _dedup(items), _dedup(details)
+
+def _canvas_size(plan, m_per_unit, is_px_like, scene_bb_m=None, margin_m=1.0):
+    """
+    Decide grid_w/h (meters).
+    - If canvas exists, use it but ensure it is big enough to include scene_bb_m + margins.
+    - If no canvas or too small, auto-fit to scene bounds + margins.
+    - Snap to GRID_CELL.
+    scene_bb_m: (minx, miny, maxx, maxy) in meters (already scaled)
+    """
+    def _snap_up(v):  # snap outward so bounds fit
+        return math.ceil(float(v)/GRID_CELL)*GRID_CELL
+
+    want_w = want_h = None
+    if scene_bb_m:
+        minx, miny, maxx, maxy = scene_bb_m
+        raw_w = max(0.5, (maxx - minx) + 2*margin_m)
+        raw_h = max(0.5, (maxy - miny) + 2*margin_m)
+        want_w, want_h = _snap_up(raw_w), _snap_up(raw_h)
+
+    # Try to read incoming canvas
+    canvas = plan.get("canvas") or {}
+    W = H = None
+    if all(k in canvas for k in ("width","height")):
+        W = float(canvas["width"]); H = float(canvas["height"])
+        if is_px_like:
+            W, H = W * m_per_unit, H * m_per_unit
+        W, H = _snap_up(W), _snap_up(H)
+    else:
+        vb = canvas.get("viewBox") or canvas.get("viewbox")
+        if isinstance(vb, (list, tuple)) and len(vb) == 4:
+            _, _, wv, hv = [float(x) for x in vb]
+            W, H = (wv * m_per_unit if is_px_like else wv), (hv * m_per_unit if is_px_like else hv)
+            W, H = _snap_up(W), _snap_up(H)
+
+    # Decision: prefer provided canvas, but expand if needed; else use want_w/h or defaults
+    if W is not None and H is not None:
+        if want_w is not None and want_h is not None:
+            W = max(W, want_w); H = max(H, want_h)
+        return _snap_up(W), _snap_up(H)
+
+    if want_w is not None and want_h is not None:
+        return want_w, want_h
+
+    # Last resort if we have nothing
+    return 8.0, 8.0
+def _height_m_from_obj(o: dict, m_per_unit: float, is_px_like: bool, default: float = DEFAULT_H) -> float:
+    """
+    Returns height in meters without snapping.
+    Rules:
+      - If the object declares a height unit, use it.
+      - Else, if the overall plan is px-like:
+          * assume heights are already meters unless they look 'pixel-ish' ( > 10 )
+      - Else, pass through.
+      - Clamp to a tiny positive epsilon so rugs etc. survive.
+    """
+    h = _extract_height(o)
+    if h is None:
+        return default
+
+    # explicit per-object height unit hint
+    units_h = (o.get("height_units") or o.get("units_height") or "").strip().lower()
+    if units_h in ("m", "meter", "meters"):
+        pass  # already meters
+    elif units_h in ("cm", "centimeter", "centimeters"):
+        h = float(h) / 100.0
+    elif units_h in ("mm", "millimeter", "millimeters"):
+        h = float(h) / 1000.0
+    elif units_h in ("px", "pixel", "pixels"):
+        h = float(h) * float(m_per_unit)
+    else:
+        # No explicit unit for height:
+        # If geometry is px-like, treat small values as meters (typical furniture < 5 m)
+        # and only scale if it looks like a pixel count (e.g., 30, 60, 120…).
+        if is_px_like and float(h) > 10.0:
+            h = float(h) * float(m_per_unit)
+
+    return max(0.005, float(h))  # tiny epsilon, but *no snapping*
+
+def _resolve_canvas_and_scale(plan):
+    """
+    Decide px vs m canvas. Return (desired_w_m, desired_h_m, m_per_unit, is_px_like, src).
+    """
+    cv = plan.get("canvas") or {}
+    src = "px"
+
+    if "width_m" in cv and "height_m" in cv:
+        W, H = float(cv["width_m"]), float(cv["height_m"])
+        src = "m"
+    else:
+        if "width" in cv and "height" in cv:
+            W, H = float(cv["width"]), float(cv["height"])
+        else:
+            vb = cv.get("viewBox") or cv.get("viewbox")
+            if isinstance(vb, (list, tuple)) and len(vb) == 4:
+                W, H = float(vb[2]), float(vb[3])
+            else:
+                W, H = 800.0, 800.0
+
+    m_per_unit, is_px_like = _resolve_scale(plan)
+    if m_per_unit is None:
+        m_per_unit, is_px_like = _m_per_px_from_meta(plan), True
+
+    if src == "m":
+        desired_w_m, desired_h_m = W, H
+    else:
+        desired_w_m, desired_h_m = W * m_per_unit, H * m_per_unit
+
+    return desired_w_m, desired_h_m, m_per_unit, is_px_like, src
+# === Live state & writer (put near the top of your Python file) ===
+
+# Live state & writer (keep where you already placed it)
+WATCH_PATH = r"C:\GITCLONE\atlas-scene-agent\live_scene.json"
+
+def _write_watch():
+    os.makedirs(os.path.dirname(WATCH_PATH), exist_ok=True)
+    scene_json.write(WATCH_PATH, ai_agent.STATE)
+
+def update_object_position(label, x_m, y_m):
+    a = ai_agent.STATE["objects"].get(label)
+    if not a:
+        return
+    a["x"] = _snap(x_m, GRID_CELL)
+    a["y"] = _snap(y_m, GRID_CELL)
+    _write_watch()
+
+def update_object_size(label, w_m, h_m, anchor="center"):
+    a = ai_agent.STATE["objects"].get(label)
+    if not a:
+        return
+    cx, cy = float(a["x"]), float(a["y"])
+    w_old, h_old = float(a.get("w", 1.0)), float(a.get("h", 1.0))
+
+    W = max(_snap(w_m, GRID_CELL), GRID_CELL * 0.5)
+    H = max(_snap(h_m, GRID_CELL), GRID_CELL * 0.5)
+
+    dx = dy = 0.0
+    if anchor in ("nw", "w", "sw"): dx = (W - w_old) / 2.0
+    if anchor in ("ne", "e", "se"): dx = -(W - w_old) / 2.0
+    if anchor in ("nw", "n", "ne"): dy = (H - h_old) / 2.0
+    if anchor in ("sw", "s", "se"): dy = -(H - h_old) / 2.0
+
+    a["w"], a["h"] = W, H
+    a["x"], a["y"] = _snap(cx + dx, GRID_CELL), _snap(cy + dy, GRID_CELL)
+    _write_watch()
+
+def update_object_height(label, h_m):
+    a = ai_agent.STATE["objects"].get(label)
+    if not a:
+        return
+    a["height"] = max(_snap(h_m, GRID_CELL), 0.01)
+    _write_watch()
+
+def any_topdown_json_to_agent_batch(plan: dict,
+                                    label_prefix: str = "",
+                                    fit_to_scene: bool = True,      # ignored here
+                                    margin_m: float = 0.0,
+                                    rebase_to_margin: bool = False) -> dict:
+    """
+    Physical-fidelity importer:
+      - Converts geometry to **meters** via _resolve_canvas_and_scale / _resolve_scale.
+      - Resizes scene canvas to the physical canvas size (AUTO_CANVAS_POLICY='resize_scene').
+      - No anisotropic scaling of geometry.
+      - Positions can snap to GRID_CELL; sizes are NOT snapped by default.
+      - Mirrors all placed objects to STATE for Blender livesync.
+    """
+    desired_w_m, desired_h_m, m_per_unit, is_px_like, src = _resolve_canvas_and_scale(plan)
+
+    # ---- Live state: scene header ----
+    ai_agent.STATE["grid_w"] = float(desired_w_m)
+    ai_agent.STATE["grid_h"] = float(desired_h_m)
+    ai_agent.STATE["objects"].clear()
+
+    # 3) Start commands
+    cmds = [{"tool": "reset_scene", "arguments": {}}]
+
+    # 4) Resize scene to physical canvas (capped)
+    if AUTO_CANVAS_POLICY == "resize_scene":
+        Gw = min(desired_w_m, MAX_GRID_W)
+        Gh = min(desired_h_m, MAX_GRID_H)
+        cmds.append({"tool": "resize_canvas",
+                     "arguments": {"grid_w": float(Gw), "grid_h": float(Gh)}})
+    else:
+        Gw = float(ai_agent.SCENE.get("grid_w", 40))
+        Gh = float(ai_agent.SCENE.get("grid_h", 30))
+
+    # 5) No rebase — keep origin
+    dx = dy = 0.0
+
+    def _center_size_px_to_meters(bb_px):
+        x, y, w, h = [float(v) for v in bb_px]
+        x_m = x * m_per_unit
+        y_m = y * m_per_unit
+        eps = 1e-4
+        w_m = max(w * m_per_unit, eps)
+        h_m = max(h * m_per_unit, eps)
+        cx = x_m + w_m * 0.5 + dx
+        cy = y_m + h_m * 0.5 + dy
+        return _snap_pos(cx), _snap_pos(cy), _snap_size(w_m), _snap_size(h_m)
+
+    # 6) Collect objects
+    structurals, items, details = _collect_objects_anywhere(plan)
+
+    # Optional wall bands: only if it's truly a room (outer/inner rects)
+    ow = next((e["node"] for e in structurals if (e["key"] == "outer_wall" and (e["node"].get("type") == "rect"))), None)
+    ia = next((e["node"] for e in structurals if (e["key"] == "inner_area" and (e["node"].get("type") == "rect"))), None)
+    USE_WALL_BANDS = _looks_like_room(ow, ia)
+
+    # 7) Walls / room import
+    if USE_WALL_BANDS:
+        xO, yO, wO, hO = _bbox_from_rect(ow)
+        xI, yI, wI, hI = _bbox_from_rect(ia)
+
+        def add_band(lbl, x, y, w, h):
+            cx, cy, W, H = _center_size_px_to_meters((x, y, w, h))
+            height_m = 2.7
+            cmds.append({"tool": "add_object", "arguments": {
+                "label": lbl, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": height_m
+            }})
+            # Mirror to livesync state
+            ai_agent.STATE["objects"][lbl] = {"primitive": "cube", "x": float(cx), "y": float(cy),
+                                     "w": float(W), "h": float(H), "height": float(height_m)}
+
+        add_band("WALL_TOP",   xO, yO,        wO, (yI - yO))
+        add_band("WALL_BOT",   xO, yI + hI,   wO, (yO + hO) - (yI + hI))
+        add_band("WALL_LEFT",  xO, yI,        (xI - xO), hI)
+        add_band("WALL_RIGHT", xI + wI, yI,   (xO + wO) - (xI + wI), hI)
+    else:
+        # Import room rects as thin slabs (safe for gardens/site plans)
+        def _add_room_rect(node, label):
+            if not node:
+                return
+            bb = _bbox_from_rect(node)
+            cx, cy, W, H = _center_size_px_to_meters(bb)
+            height_m = 0.1
+            cmds.append({"tool": "add_object", "arguments": {
+                "label": label, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": height_m
+            }})
+            ai_agent.STATE["objects"][label] = {"primitive": "cube", "x": float(cx), "y": float(cy),
+                                       "w": float(W), "h": float(H), "height": float(height_m)}
+        if ow: _add_room_rect(ow, "ROOM_OUTER")
+        if ia: _add_room_rect(ia, "ROOM_INNER")
+
+    # 8) Room details (rects only)
+    for e in structurals:
+        o, k = e["node"], e["key"]
+        if k in ("outer_wall", "inner_area"):
+            continue
+        t = (o.get("type") or "").lower()
+        if t != "rect":
+            continue
+        bb = _bbox_from_generic(o)
+        if not bb:
+            continue
+        cx, cy, W, H = _center_size_px_to_meters(bb)
+        lbl = _label_from(e)
+        height_m = 1.2
+        cmds.append({"tool": "add_object", "arguments": {
+            "label": lbl, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": height_m
+        }})
+        ai_agent.STATE["objects"][lbl] = {"primitive": "cube", "x": float(cx), "y": float(cy),
+                                 "w": float(W), "h": float(H), "height": float(height_m)}
+
+    # 9) Items (furniture etc.)
+    seen = set()
+    for e in items:
+        o = e["node"]
+        bb = _bbox_from_generic(o)
+        if not bb:
+            continue
+        cx, cy, W, H = _center_size_px_to_meters(bb)
+        label = _label_from(e)
+        if label in seen:
+            i = 2
+            while f"{label}_{i}" in seen:
+                i += 1
+            label = f"{label}_{i}"
+        seen.add(label)
+
+        # heights: convert per object; interprets units (m/cm/mm/px)
+        height_m = _apply_height_cap(_height_m_from_obj(o, m_per_unit, is_px_like, default=DEFAULT_H))
+
+        cmds.append({"tool": "add_object", "arguments": {
+            "label": label, "primitive": "cube", "x": cx, "y": cy, "w": W, "h": H, "height": float(height_m)
+        }})
+        ai_agent.STATE["objects"][label] = {"primitive": "cube", "x": float(cx), "y": float(cy),
+                                   "w": float(W), "h": float(H), "height": float(height_m)}
+
+    # 10) Finish (write watcher once)
+    _write_watch()
+    cmds.append({"tool": "render_svg", "arguments": {"view": "topdown"}})
+    cmds.append({"tool": "export_state", "arguments": {}})
+
+    return {"commands": cmds}
+
+def import_any_topdown_json_and_build(plan_json_str: str, write_to_watch: bool = False, watch_path: str = r"C:\ATLAS\live_scene.json"):
+    """
+    One-call helper:
+      - loads arbitrary plan JSON
+      - converts to agent batch (rects/cubes, snapped 0.5 m)
+      - routes through engine
+      - optionally writes exported state to Blender watcher
+    """
+    plan = json.loads(plan_json_str)
+    batch = any_topdown_json_to_agent_batch(plan)
+    outs = ai_agent.route_and_execute(batch, natural="[universal import]")
+    if write_to_watch and "json" in outs:
+        import shutil
+        os.makedirs(os.path.dirname(watch_path), exist_ok=True)
+        shutil.copyfile(outs["json"], watch_path)
+        print(f"[LiveSync] wrote: {watch_path}")
+    return outs
@@ -0,0 +1,97 @@
+"""Pydantic models of the planner's command batch (mirror TOOL_PLAN_SCHEMA).
+
+Kept out of ai_agent so importing the engine does not import pydantic;
+ai_agent.CommandBatch etc. load this module on first access.
+"""
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CommandArgs(BaseModel):
+    # creation / scene
+    labels: Optional[List[str]] = None
+    primitive: Optional[Literal["cube","square","rect"]] = None
+    count: Optional[int] = None
+    placement: Optional[Literal["random_nonoverlap","grid","row","cluster"]] = None
+    size: Optional[float] = None
+    grid_w: Optional[int] = None
+    grid_h: Optional[int] = None
+    scale_sizes: Optional[bool] = None  # for resize_canvas
+    margin: Optional[float] = None
+    seed: Optional[int] = None
+    # movement / options
+    symmetric: Optional[bool] = None
+    pivot: Optional[Literal["grid_center","selection_center"]] = None
+
+    # place_above
+    new_label: Optional[str] = None
+    gap: Optional[float] = None
+
+    # merge / rename
+    keep: Optional[str] = None
+    remove: Optional[str] = None
+
+    # single / multi targets
+    label: Optional[str] = None         # NEW: used by add_object / ensure_object
+    target: Optional[str] = None
+    targets: Optional[List[str]] = None
+    a: Optional[str] = None
+    b: Optional[str] = None
+
+    # geometry / movement
+    x: Optional[float] = None           # NEW
+    y: Optional[float] = None           # NEW
+    w: Optional[float] = None           # NEW
+    h: Optional[float] = None           # NEW
+    dx: Optional[float] = None
+    dy: Optional[float] = None
+    axis: Optional[Literal["x","y","both"]] = None   # include "both" for scale
+    mode: Optional[Literal["centers","tops","bottoms","lefts","rights","equal_gaps","fixed_spacing","between","side"]] = None
+    spacing: Optional[float] = None
+    factor: Optional[float] = None      # NEW for scale
+
+    # render
+    view: Optional[Literal["topdown"]] = None
+    grid: Optional[bool] = None
+
+    # messages
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+    # constraints / anchors
+    kind: Optional[str] = None          # e.g., "align_left","between_x", etc.
+    index: Optional[int] = None
+    gap: Optional[float] = None
+    x_pct: Optional[float] = None
+    y_pct: Optional[float] = None
+
+    # new alignment/relative tools
+    side: Optional[Literal["left","right","top","bottom","center_x","center_y","front","back"]] = None
+    ref: Optional[str] = None
+    edge: Optional[Literal[
+        "left_to_left","right_to_right","left_to_right","right_to_left",
+        "top_to_top","bottom_to_bottom","top_to_bottom","bottom_to_top",
+        "center_x","center_y"
+    ]] = None
+    direction: Optional[Literal["north","south","east","west","left","right","front","back"]] = None
+
+    distance: Optional[float] = None
+
+    # 3D (ignored by 2D)
+    height: Optional[float] = None
+    # ---- RAMP tool args (works for both modes) ----
+    # JSON accepts "from" / "to" — map to Python-safe names via aliases
+    from_: Optional[str] = Field(default=None, alias="from")   # ADD
+    to_:   Optional[str] = Field(default=None, alias="to")     # ADD
+    of: Optional[str] = None                                   # ADD  (for mode="side")
+    length: Optional[float] = None                             # ADD  (meters; default handled by tool)
+    slope_ratio: Optional[float] = None                        # ADD  (default 12.0; 1:12)
+
+
+class Command(BaseModel):
+    tool: str
+    arguments: Optional[CommandArgs] = None
+
+class CommandBatch(BaseModel):
+    commands: List[Command]
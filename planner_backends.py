@@ -0,0 +1,234 @@
+"""Planner backends: where ai_agent's chat completions come from.
+
+ai_agent talks to `client.chat.completions.create(...)` only, so anything
+with that shape can stand in for the OpenAI client:
+
+  openai   the real API (default)
+  record   the real API, with every (messages, reply) pair appended to a
+           cassette file
+  replay   replies served from a cassette with simulated latency; prompts
+           not in it go to the rule-based fake (or fail, if strict)
+  fake     RuleBasedClient only: add/remove prompts, no-op for the rest
+
+Chosen by ATLAS_PLANNER_BACKEND. The cassette is ATLAS_CASSETTE (default
+planner_cassette.jsonl); replay latency is ATLAS_REPLAY_FIRST_TOKEN_S and
+ATLAS_REPLAY_TOKEN_DELAY_S, and ATLAS_REPLAY_STRICT=1 makes unseen prompts
+an error instead of falling back.
+"""
+import hashlib, json, os, re, threading, time
+
+import scene_json
+
+BACKEND = os.getenv("ATLAS_PLANNER_BACKEND", "openai").lower()
+CASSETTE_PATH = os.getenv("ATLAS_CASSETTE", "planner_cassette.jsonl")
+
+
+def request_key(model, messages) -> str:
+    """Cassette key: the model plus the exact messages sent."""
+    blob = json.dumps([model, [[m["role"], m["content"]] for m in messages]], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class FakeStreamingClient:
+    """
+    Offline stand-in for the OpenAI client, for tests and benchmarks.
+    Serves a fixed plan (or planner(natural) -> plan) through
+    chat.completions.create, streamed in chunk_chars pieces with simulated
+    first-token and per-chunk latency. Non-streamed calls wait for the
+    whole "generation" and return the full message, like the real API.
+
+        ai_agent.client = FakeStreamingClient(plan, token_delay_s=0.02)
+    """
+    def __init__(self, plan, chunk_chars: int = 8, first_token_s: float = 0.0, token_delay_s: float = 0.0):
+        from types import SimpleNamespace
+        self._ns = SimpleNamespace
+        self.plan = plan
+        self.chunk_chars = max(1, int(chunk_chars))
+        self.first_token_s = first_token_s
+        self.token_delay_s = token_delay_s
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _raw(self, messages) -> str:
+        plan = self.plan
+        if callable(plan):
+            user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+            plan = plan(user)
+        return json.dumps(plan)
+
+    def _chunks(self, raw: str):
+        time.sleep(self.first_token_s)
+        for i in range(0, len(raw), self.chunk_chars):
+            if i:
+                time.sleep(self.token_delay_s)
+            yield self._ns(choices=[self._ns(delta=self._ns(content=raw[i:i + self.chunk_chars]))])
+
+    def _usage(self, messages, raw):
+        # ~4 chars per token; like the real API, a prompt prefix of 1024+
+        # tokens shared with the previous call counts as cached, in 128s
+        prompt = "".join(m["content"] for m in messages)
+        prev, self._last_prompt = getattr(self, "_last_prompt", ""), prompt
+        shared = len(os.path.commonprefix([prev, prompt])) // 4
+        cached = shared - shared % 128 if shared >= 1024 else 0
+        return self._ns(prompt_tokens=len(prompt) // 4, completion_tokens=len(raw) // 4,
+                        prompt_tokens_details=self._ns(cached_tokens=cached))
+
+    def _stream(self, raw, usage):
+        yield from self._chunks(raw)
+        if usage is not None:
+            yield self._ns(choices=[], usage=usage)
+
+    def create(self, model=None, messages=(), stream=False, stream_options=None, **kwargs):
+        return self._respond(self._raw(messages), messages, stream, stream_options)
+
+    def _respond(self, raw, messages, stream, stream_options):
+        usage = self._usage(messages, raw)
+        if stream:
+            return self._stream(raw, usage if (stream_options or {}).get("include_usage") else None)
+        for _ in self._chunks(raw):
+            pass
+        return self._ns(choices=[self._ns(message=self._ns(content=raw))], usage=usage)
+
+
+_ADD_RX = re.compile(r"\b(?:add|place|create|put|insert)\s+(?:(?:a|an|the|new|another|big|small|large|tiny|tall|short|wide)\s+)*"
+                     r"(?:(?:cube|square|rect|box|object)\s+)?(?:(?:named|called|labelled|labeled)\s+)?"
+                     r"([A-Za-z][A-Za-z0-9_]*)"
+                     r"(?:.*?\bat\s+\(?\s*(-?\d+(?:\.\d+)?)\s*[, ]\s*(-?\d+(?:\.\d+)?))?", re.I)
+_REMOVE_RX = re.compile(r"\b(?:remove|delete)\s+(?:(?:the|cube|square|rect|box|object)\s+)*([A-Za-z][A-Za-z0-9_]*)\b", re.I)
+_SIZE_RX = re.compile(r"\b(\d+(?:\.\d+)?)\s*[x×]\s*(\d+(?:\.\d+)?)\b")
+
+
+def rule_plan(prompt: str) -> dict:
+    """
+    Plan a prompt without a model: "add|place|create X [WxH] [at x,y]" adds a
+    cube, "remove|delete X" removes one, anything else only re-renders and
+    exports. Positions not given come from a hash of the label, so the same
+    prompt always produces the same plan.
+    """
+    view = [{"tool": "render_svg", "arguments": {"view": "topdown"}},
+            {"tool": "export_state", "arguments": {}}]
+    m = _REMOVE_RX.search(prompt)
+    if m:
+        return {"commands": [{"tool": "remove_object", "arguments": {"target": m.group(1).upper()}}] + view}
+    m = _ADD_RX.search(prompt)
+    if m:
+        label = m.group(1).upper()
+        h = int(hashlib.sha256(label.encode("utf-8")).hexdigest()[:8], 16)
+        x = float(m.group(2)) if m.group(2) else 2.0 + h % 30
+        y = float(m.group(3)) if m.group(3) else 2.0 + (h >> 8) % 20
+        size = _SIZE_RX.search(prompt)
+        w, d = (float(size.group(1)), float(size.group(2))) if size else (1.0, 1.0)
+        args = {"label": label, "primitive": "cube", "x": x, "y": y, "w": w, "h": d}
+        return {"commands": [{"tool": "add_object", "arguments": args}] + view}
+    return {"commands": view}
+
+
+class RuleBasedClient(FakeStreamingClient):
+    """FakeStreamingClient planning every prompt with rule_plan."""
+    def __init__(self, **kwargs):
+        super().__init__(rule_plan, **kwargs)
+
+
+class ReplayClient(FakeStreamingClient):
+    """
+    Serves recorded replies by request_key(model, messages), streamed with
+    the same simulated latency knobs as FakeStreamingClient. Unseen
+    requests go to `fallback` (a client), or raise KeyError when it is None.
+    """
+    def __init__(self, path: str = CASSETTE_PATH, fallback=None, **kwargs):
+        super().__init__(None, **kwargs)
+        self.path = path
+        self.fallback = fallback
+        self.replies = {}
+        self.hits = self.misses = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        rec = scene_json.loads(line)
+                        self.replies[rec["key"]] = rec["reply"]
+
+    def create(self, model=None, messages=(), stream=False, stream_options=None, **kwargs):
+        key = request_key(model, messages)
+        if key not in self.replies:
+            self.misses += 1
+            if self.fallback is None:
+                raise KeyError(f"no recorded reply for request {key[:12]} in {self.path}")
+            return self.fallback.chat.completions.create(model=model, messages=messages, stream=stream,
+                                                         stream_options=stream_options, **kwargs)
+        self.hits += 1
+        return self._respond(self.replies[key], messages, stream, stream_options)
+
+
+class RecordingClient:
+    """
+    Wraps a client and appends every completed request to a cassette, one
+    JSON line {"key", "model", "messages", "reply"} each. Streamed replies
+    are recorded once the stream has been read to the end.
+    """
+    def __init__(self, inner, path: str = CASSETTE_PATH):
+        from types import SimpleNamespace
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _save(self, model, messages, reply) -> None:
+        rec = {"key": request_key(model, messages), "model": model,
+               "messages": list(messages), "reply": reply}
+        with self._lock, open(self.path, "ab") as f:
+            f.write(scene_json.dumpb(rec) + b"\n")
+
+    def _tee(self, stream, model, messages):
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            yield chunk
+        self._save(model, messages, "".join(parts))
+
+    def create(self, model=None, messages=(), stream=False, **kwargs):
+        resp = self.inner.chat.completions.create(model=model, messages=messages, stream=stream, **kwargs)
+        if stream:
+            return self._tee(resp, model, messages)
+        self._save(model, messages, resp.choices[0].message.content)
+        return resp
+
+
+class LazyClient:
+    """Builds the real client on first attribute access (openai is slow to import)."""
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+                client = self._client
+        return getattr(client, name)
+
+
+def _openai_client(api_key=None):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def make_client(backend: str | None = None, api_key: str | None = None, path: str | None = None):
+    """Build the client for `backend` (default ATLAS_PLANNER_BACKEND)."""
+    backend = (backend or BACKEND).lower()
+    path = path or CASSETTE_PATH
+    if backend == "openai":
+        return LazyClient(lambda: _openai_client(api_key))
+    if backend == "record":
+        return RecordingClient(LazyClient(lambda: _openai_client(api_key)), path)
+    if backend == "fake":
+        return RuleBasedClient()
+    if backend == "replay":
+        strict = os.getenv("ATLAS_REPLAY_STRICT", "0") == "1"
+        return ReplayClient(path, fallback=None if strict else RuleBasedClient(),
+                            first_token_s=float(os.getenv("ATLAS_REPLAY_FIRST_TOKEN_S", "0")),
+                            token_delay_s=float(os.getenv("ATLAS_REPLAY_TOKEN_DELAY_S", "0")))
+    raise ValueError(f"unknown ATLAS_PLANNER_BACKEND: {backend!r}")
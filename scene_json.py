@@ -0,0 +1,95 @@
+"""Scene JSON encoding shared by server.py and ai_agent.py.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise (ATLAS_JSON=stdlib forces the fallback). Both backends produce
+the same data; only float spelling may differ (1e-05 vs 1e-5), and orjson
+writes NaN/Infinity as null. Anything orjson refuses to encode or decode,
+such as integers beyond 64 bits, is retried with the standard library.
+
+Files are written with a 2-space indent, as before. ATLAS_JSON_PRETTY=0
+writes them compact instead.
+"""
+import json, os, tempfile
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+if os.getenv("ATLAS_JSON", "auto").lower() == "stdlib":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+PRETTY = os.getenv("ATLAS_JSON_PRETTY", "1") != "0"
+
+if orjson is not None:
+    _OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    _OPTS_PRETTY = _OPTS | orjson.OPT_INDENT_2
+
+
+def dumpb(obj, pretty: bool = False, default=None) -> bytes:
+    """Encode to UTF-8 bytes; compact unless pretty (2-space indent)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=_OPTS_PRETTY if pretty else _OPTS)
+        except TypeError:
+            pass
+    return _std_dumps(obj, pretty, default).encode("utf-8")
+
+
+def dumps(obj, pretty: bool = False, default=None) -> str:
+    """Encode to str; compact unless pretty (2-space indent)."""
+    if orjson is not None:
+        return dumpb(obj, pretty, default).decode("utf-8")
+    return _std_dumps(obj, pretty, default)
+
+
+def _std_dumps(obj, pretty, default):
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def loads(data):
+    """Decode str or bytes."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib raises on real syntax errors
+    return json.loads(data)
+
+
+def read(path):
+    """Decode the JSON file at path."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write(path, obj, pretty: bool | None = None) -> int:
+    """Encode obj to path (PRETTY by default); returns the bytes written."""
+    data = dumpb(obj, PRETTY if pretty is None else pretty)
+    replace_bytes(path, data)
+    return len(data)
+
+
+def replace_bytes(path, data: bytes) -> None:
+    """Write data to a temp file next to path and rename it over path, so
+    readers see either the old file or the new one, never a partial write."""
+    folder, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def clone(obj):
+    """Deep copy through an encode/decode round trip (JSON-shaped data only)."""
+    return loads(dumpb(obj))
@@ -1,6 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from contextlib import contextmanager
 from pathlib import Path
-import json, os, sys, traceback, time
+import os, traceback, time, threading, queue, uuid, atexit, gzip, zlib, io
+from concurrent.futures import ThreadPoolExecutor
+import ai_agent
+import scene_json
 from ai_agent import run_prompt
 
 
@@ -8,11 +13,110 @@ WATCH_PATH = r"C:\GITCLONE\atlas-scene-agent\live_scene.json"
 
 APP_PORT = 5544
 
+class _SceneJSONProvider(DefaultJSONProvider):
+    """jsonify / request.get_json through scene_json (orjson when installed)."""
+    def dumps(self, obj, **kwargs):
+        return scene_json.dumps(obj, pretty=bool(kwargs.get("indent")), default=self.default)
+
+    def loads(self, s, **kwargs):
+        return scene_json.loads(s)
+
 app = Flask(__name__)
+app.json = _SceneJSONProvider(app)
+
+# ---------- stage timing ----------
+# Request handlers and the helpers they call wrap their expensive steps in
+# _stage("name"); the per-request totals go out as a Server-Timing header.
+_STAGE_TLS = threading.local()
+
+@contextmanager
+def collect_stages():
+    """Collect _stage() durations (seconds) on this thread into the yielded dict."""
+    prev = getattr(_STAGE_TLS, "timings", None)
+    timings = _STAGE_TLS.timings = {}
+    try:
+        yield timings
+    finally:
+        _STAGE_TLS.timings = prev
+
+@contextmanager
+def _stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe(name, time.perf_counter() - t0)
+
+def _observe(stage: str, seconds: float, tool: str | None = None) -> None:
+    """Record one stage duration for Server-Timing and /metrics.
+
+    Also installed as ai_agent.STAGE_HOOK, so engine stages (llm, repair,
+    tool, render_svg, export_state, artifact_write) land here too.
+    """
+    name = f"tool.{tool}" if stage == "tool" else stage
+    timings = getattr(_STAGE_TLS, "timings", None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+    with _METRICS_LOCK:
+        if stage == "tool":
+            TOOL_SECONDS.observe(tool, seconds)
+        else:
+            STAGE_SECONDS.observe(stage, seconds)
+
+# ---------- metrics ----------
+# Prometheus text exposition, served from GET /metrics. Hand-rolled so the
+# server keeps no extra dependency; every update happens under _METRICS_LOCK.
+_METRICS_LOCK = threading.Lock()
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_value(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_float(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+class _Histogram:
+    def __init__(self, name: str, help_text: str, label: str, buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.label, self.buckets = name, help_text, label, buckets
+        self.series = {}        # label value -> [bucket counts..., sum, count]
+
+    def observe(self, value_label, seconds: float) -> None:
+        row = self.series.get(value_label)
+        if row is None:
+            row = self.series[value_label] = [0] * len(self.buckets) + [0.0, 0]
+        for i, le in enumerate(self.buckets):
+            if seconds <= le:
+                row[i] += 1
+        row[-2] += seconds
+        row[-1] += 1
+
+    def render(self, out: list) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} histogram")
+        for key in sorted(self.series, key=str):
+            row, lv = self.series[key], _label_value(key)
+            for le, n in zip(self.buckets, row):
+                out.append(f'{self.name}_bucket{{{self.label}="{lv}",le="{_fmt_float(le)}"}} {n}')
+            out.append(f'{self.name}_bucket{{{self.label}="{lv}",le="+Inf"}} {row[-1]}')
+            out.append(f'{self.name}_sum{{{self.label}="{lv}"}} {_fmt_float(row[-2])}')
+            out.append(f'{self.name}_count{{{self.label}="{lv}"}} {row[-1]}')
+
+STAGE_SECONDS = _Histogram("atlas_stage_duration_seconds",
+                           "Time spent in each request stage.", "stage")
+TOOL_SECONDS = _Histogram("atlas_tool_duration_seconds",
+                          "Time spent executing each agent tool.", "tool")
+REQUEST_SECONDS = _Histogram("atlas_request_duration_seconds",
+                             "End-to-end handler time per endpoint.", "endpoint")
+REQUESTS_TOTAL = {}             # (endpoint, method, status) -> count
+
+ai_agent.STAGE_HOOK = _observe
 
 # ---------- utils ----------
 def ensure_dir(path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    folder = os.path.dirname(path)
+    if folder:  # a bare file name lives in the working directory
+        os.makedirs(folder, exist_ok=True)
 
 def _safe_float(v, default=0.0):
     try:
@@ -89,62 +193,471 @@ def _object_to_rect(o):
     # Nothing usable
     return {"x": 0.0, "y": 0.0, "w": 1.0, "h": 1.0}
 
-def normalize_for_watcher(model: dict):
-    """Normalize model to the Blender watcher schema."""
-    cv = model.get("canvas") or {}
-    grid_w = _safe_float(cv.get("width_m", model.get("grid_w", 40.0)), 40.0)
-    grid_h = _safe_float(cv.get("height_m", model.get("grid_h", 30.0)), 30.0)
-
-    objs = model.get("objects") or {}
-    payload_extra = {}
-    if isinstance(model, dict) and "_source" in model:
-        payload_extra["_source"] = str(model["_source"])
-    out = {}
+def _normalize_object(a: dict) -> dict:
+    """Normalize one object to the Blender watcher item schema."""
+    rect = _object_to_rect(a)
+    item = {
+        "primitive": str(a.get("primitive") or "cube"),
+        "x": _safe_float(rect["x"]),
+        "y": _safe_float(rect["y"]),
+        "w": _safe_float(rect["w"], 1.0),
+        "h": _safe_float(rect["h"], 1.0),
+        "height": _safe_float(a.get("height", 0.5), 0.5),
+    }
+    if "z_offset" in a:
+        item["z_offset"] = _safe_float(a["z_offset"])
+    if "rot_deg" in a:
+        item["rot_deg"] = a["rot_deg"]
+    return item
 
+def _object_items(objs):
+    """Return (label, object) pairs from a dict or list of objects."""
     if isinstance(objs, dict):
-        items = objs.items()
-    elif isinstance(objs, list):
+        return list(objs.items())
+    if isinstance(objs, list):
         # convert list to label->object dict using id/label or OBJ_i
         items = []
         for i, o in enumerate(objs):
+            if not isinstance(o, dict):
+                continue
             key = str(o.get("label") or o.get("id") or f"OBJ_{i+1}")
             items.append((key, o))
-    else:
-        items = []
+        return items
+    return []
 
-    for key, a in items:
-        if not isinstance(a, dict):
-            continue
-        rect = _object_to_rect(a)
-        item = {
-            "primitive": str(a.get("primitive") or "cube"),
-            "x": _safe_float(rect["x"]),
-            "y": _safe_float(rect["y"]),
-            "w": _safe_float(rect["w"], 1.0),
-            "h": _safe_float(rect["h"], 1.0),
-            "height": _safe_float(a.get("height", 0.5), 0.5),
-        }
+def _grid_from_model(model: dict, default_w=40.0, default_h=30.0):
+    cv = model.get("canvas") or {}
+    grid_w = _safe_float(cv.get("width_m", model.get("grid_w", default_w)), default_w)
+    grid_h = _safe_float(cv.get("height_m", model.get("grid_h", default_h)), default_h)
+    return grid_w, grid_h
+
+# ---------- bulk normalization ----------
+# Large scenes go through a columnar path: objects are grouped by the branch
+# _object_to_rect would take, and each group's numbers are converted and
+# combined as NumPy arrays.  Results are identical to the per-object path
+# (see benchmarks/bench_normalize.py); numpy is optional.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BULK_MIN_OBJECTS = int(os.getenv("ATLAS_BULK_MIN_OBJECTS", "256"))
+
+def _use_bulk(n: int) -> bool:
+    return np is not None and n >= BULK_MIN_OBJECTS
+
+def _float_column(vals: list, default: float):
+    """_safe_float over a list, as a float64 array."""
+    arr = None
+    if set(map(type, vals)) <= {int, float}:
+        try:
+            arr = np.array(vals, dtype=np.float64)
+        except OverflowError:
+            arr = None
+    if arr is None:
+        return np.array([_safe_float(v, default) for v in vals], dtype=np.float64)
+    bad = ~np.isfinite(arr)
+    if bad.any():
+        arr[bad] = default
+    return arr
+
+def _finite_column(arr, default: float):
+    bad = ~np.isfinite(arr)
+    if bad.any():
+        arr = arr.copy()
+        arr[bad] = default
+    return arr
+
+def _bulk_rects(objs: list):
+    """_object_to_rect for a list of objects; returns x, y, w, h float64 arrays."""
+    n = len(objs)
+    X = np.zeros(n); Y = np.zeros(n); W = np.ones(n); H = np.ones(n)
+    rect, center, circle, ellipse = [], [], [], []
+    for i, o in enumerate(objs):
+        t = str(o.get("type") or o.get("shape") or "").lower()
+        if "x" in o and "y" in o and "w" in o and "h" in o:
+            (rect if t == "rect" else center).append(i)
+        elif t == "circle" and "cx" in o and "cy" in o and "r" in o:
+            circle.append(i)
+        elif t == "ellipse" and "cx" in o and "cy" in o and "rx" in o and "ry" in o:
+            ellipse.append(i)
+        elif t in ("polygon", "polyline") and o.get("points"):
+            r = _object_to_rect(o)
+            X[i], Y[i], W[i], H[i] = r["x"], r["y"], r["w"], r["h"]
+        elif "x" in o and "y" in o:
+            center.append(i)
+        # else: nothing usable -> the 0, 0, 1, 1 the arrays start with
+
+    def col(idx, key, default):
+        return _float_column([objs[i].get(key, default) for i in idx], default)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        _combine_groups(col, X, Y, W, H, rect, center, circle, ellipse)
+    return X, Y, W, H
+
+def _combine_groups(col, X, Y, W, H, rect, center, circle, ellipse):
+    if rect:
+        x, y, w, h = col(rect, "x", 0.0), col(rect, "y", 0.0), col(rect, "w", 1.0), col(rect, "h", 1.0)
+        X[rect] = x + w / 2.0; Y[rect] = y + h / 2.0
+        W[rect] = np.maximum(w, 0.001); H[rect] = np.maximum(h, 0.001)
+    if center:
+        X[center] = col(center, "x", 0.0); Y[center] = col(center, "y", 0.0)
+        W[center] = np.maximum(col(center, "w", 1.0), 0.001)
+        H[center] = np.maximum(col(center, "h", 1.0), 0.001)
+    if circle:
+        X[circle] = col(circle, "cx", 0.0); Y[circle] = col(circle, "cy", 0.0)
+        d = np.maximum(2 * col(circle, "r", 0.5), 0.001)
+        W[circle] = d; H[circle] = d
+    if ellipse:
+        X[ellipse] = col(ellipse, "cx", 0.0); Y[ellipse] = col(ellipse, "cy", 0.0)
+        W[ellipse] = np.maximum(2 * col(ellipse, "rx", 0.5), 0.001)
+        H[ellipse] = np.maximum(2 * col(ellipse, "ry", 0.5), 0.001)
+
+def _normalize_objects_bulk(items: list) -> dict:
+    """_normalize_object over (label, object) pairs, columnar."""
+    objs = [a for _, a in items]
+    X, Y, W, H = _bulk_rects(objs)
+    xs = _finite_column(X, 0.0).tolist(); ys = _finite_column(Y, 0.0).tolist()
+    ws = _finite_column(W, 1.0).tolist(); hs = _finite_column(H, 1.0).tolist()
+    heights = _float_column([a.get("height", 0.5) for a in objs], 0.5).tolist()
+    zs = _float_column([a.get("z_offset", 0.0) for a in objs], 0.0).tolist()
+    out = {}
+    for (key, a), x, y, w, h, ht, z in zip(items, xs, ys, ws, hs, heights, zs):
+        item = {"primitive": str(a.get("primitive") or "cube"),
+                "x": x, "y": y, "w": w, "h": h, "height": ht}
         if "z_offset" in a:
-            item["z_offset"] = _safe_float(a["z_offset"])
+            item["z_offset"] = z
         if "rot_deg" in a:
             item["rot_deg"] = a["rot_deg"]
-        out[str(key)] = item
+        out[key] = item
+    return out
+
+def normalize_for_watcher(model: dict):
+    """Normalize model to the Blender watcher schema."""
+    grid_w, grid_h = _grid_from_model(model)
+
+    payload_extra = {}
+    if isinstance(model, dict) and "_source" in model:
+        payload_extra["_source"] = str(model["_source"])
+    out = {}
+
+    items = [(str(key), a) for key, a in _object_items(model.get("objects") or {})
+             if isinstance(a, dict)]
+    if _use_bulk(len(items)):
+        out = _normalize_objects_bulk(items)
+    else:
+        for key, a in items:
+            out[key] = _normalize_object(a)
 
     return {"grid_w": grid_w, "grid_h": grid_h, "objects": out, **payload_extra}
 
-def write_spec_to_watch(spec: dict) -> int:
-    payload = normalize_for_watcher(spec)
+# ---------- live scene (delta publish) ----------
+# Last published watcher payload, so /publish/delta only re-normalizes the
+# objects a client actually touched.
+LIVE = {"rev": 0, "scene": None}
+_LIVE_LOCK = threading.Lock()
+
+# Per-object revisions for GET /scene?since=<rev>: the revision each live
+# object last changed at, and the revision each removed label went away at.
+# Only the newest TOMBSTONE_MAX removals are kept; a client asking from
+# before TOMBS["floor"] gets the full scene instead.
+TOMBSTONE_MAX = int(os.getenv("ATLAS_TOMBSTONE_MAX", "10000"))
+OBJ_REVS = {}
+TOMBS = {"removed": {}, "floor": 0}
+
+def _track_revs(rev: int, upserted, removed) -> None:
+    """Caller holds _LIVE_LOCK."""
+    tombs = TOMBS["removed"]
+    for key in upserted:
+        OBJ_REVS[key] = rev
+        tombs.pop(key, None)
+    for key in removed:
+        OBJ_REVS.pop(key, None)
+        tombs.pop(key, None)
+        tombs[key] = rev
+    while len(tombs) > TOMBSTONE_MAX:
+        key = next(iter(tombs))
+        TOMBS["floor"] = tombs.pop(key)
+
+def _watch_bytes(payload: dict) -> bytes:
     payload["_t"] = time.time()  # force content change for watcher
-    ensure_dir(WATCH_PATH)
-    with open(WATCH_PATH, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    with _stage("serialize"):
+        return scene_json.dumpb(payload, pretty=scene_json.PRETTY)
+
+def _write_bytes(path: str, data: bytes, mode: str = "wb") -> None:
+    """Append for "ab"; otherwise replace path atomically (temp file + rename)."""
+    with _stage("write"):
+        ensure_dir(path)
+        if mode == "ab":
+            with open(path, mode) as f:
+                f.write(data)
+        else:
+            scene_json.replace_bytes(path, data)
+
+def write_payload_to_watch(payload: dict) -> int:
+    """Write an already-normalized watcher payload."""
+    _write_bytes(WATCH_PATH, _watch_bytes(payload))
+    return len(payload.get("objects", {}))
+
+# ---------- journal mode ----------
+# Opt-in alternative to rewriting WATCH_PATH on every edit: deltas are
+# appended to a newline-delimited journal next to it, and WATCH_PATH becomes
+# the compacted checkpoint (rewritten on full publishes and every
+# CHECKPOINT_EVERY records).  The journal's first line is a header
+# {"gen", "base_seq"}; a new generation tells consumers to reload the
+# checkpoint and tail from the top again.
+JOURNAL_MODE = os.getenv("ATLAS_JOURNAL", "0") == "1"
+CHECKPOINT_EVERY = int(os.getenv("ATLAS_CHECKPOINT_EVERY", "200"))
+JOURNAL = {"gen": None, "records": 0}
+
+def journal_path() -> str:
+    return os.path.splitext(WATCH_PATH)[0] + ".journal.jsonl"
+
+# ---------- coalescing writer ----------
+# Publishes only update LIVE and mark it dirty; one background thread writes
+# WATCH_PATH (or the journal) at most once per FLUSH_MS, always with the
+# latest state.  Deltas that land between flushes are merged into a single
+# journal record, last writer wins per label.  FLUSH_MS=0 writes inline.
+FLUSH_MS = float(os.getenv("ATLAS_FLUSH_MS", "50"))
+WRITER = {"full": False, "delta": None, "last_flush": 0.0, "thread": None}
+WRITER_STATS = {"requests": 0, "flushes": 0, "merged": 0, "bytes": 0, "flushed_rev": 0}
+_WRITER_COND = threading.Condition(_LIVE_LOCK)
+_FLUSH_LOCK = threading.Lock()
+
+def _merge_delta(pending, record: dict) -> dict:
+    if pending is None:
+        return {**record, "upsert": dict(record["upsert"]), "removed": list(record["removed"])}
+    for k, v in record["upsert"].items():
+        pending["upsert"][k] = v
+        if k in pending["removed"]:
+            pending["removed"].remove(k)
+    for k in record["removed"]:
+        pending["upsert"].pop(k, None)
+        if k not in pending["removed"]:
+            pending["removed"].append(k)
+    for k in ("seq", "grid_w", "grid_h", "_source", "_t"):
+        pending[k] = record[k]
+    return pending
+
+def _mark_dirty(record: dict | None) -> None:
+    """Queue the current revision for writing. Caller holds _LIVE_LOCK.
+
+    record is the delta record for /publish/delta, None for a full publish.
+    """
+    WRITER_STATS["requests"] += 1
+    if WRITER["full"] or WRITER["delta"] is not None:
+        WRITER_STATS["merged"] += 1
+    if record is None:
+        WRITER["full"], WRITER["delta"] = True, None
+    elif not WRITER["full"]:
+        WRITER["delta"] = _merge_delta(WRITER["delta"], record)
+    if FLUSH_MS > 0:
+        if WRITER["thread"] is None:
+            WRITER["thread"] = threading.Thread(target=_writer_loop, name="watch-writer", daemon=True)
+            WRITER["thread"].start()
+        _WRITER_COND.notify()
+
+def _take_pending() -> list:
+    """Turn the dirty state into file writes. Caller holds _LIVE_LOCK."""
+    full, delta = WRITER["full"], WRITER["delta"]
+    WRITER["full"], WRITER["delta"] = False, None
+    scene, rev = LIVE["scene"], LIVE["rev"]
+    if not (full or delta is not None) or scene is None:
+        return []
+    if JOURNAL_MODE and not full and JOURNAL["records"] < CHECKPOINT_EVERY:
+        JOURNAL["records"] += 1
+        return [(journal_path(), "ab", scene_json.dumpb(delta) + b"\n")]
+    if JOURNAL_MODE:
+        scene["_seq"] = rev
+        JOURNAL["gen"] = time.time_ns()  # unique across server restarts
+        JOURNAL["records"] = 0
+        return [(WATCH_PATH, "wb", _watch_bytes(scene)),
+                (journal_path(), "wb", scene_json.dumpb({"gen": JOURNAL["gen"], "base_seq": rev}) + b"\n")]
+    return [(WATCH_PATH, "wb", _watch_bytes(scene))]
+
+def flush_pending() -> int:
+    """Write whatever is dirty now; returns the revision on disk afterwards."""
+    with _FLUSH_LOCK:
+        with _LIVE_LOCK:
+            ops = _take_pending()
+            rev = LIVE["rev"]
+        for path, mode, data in ops:
+            _write_bytes(path, data, mode)
+        with _LIVE_LOCK:
+            WRITER["last_flush"] = time.time()
+            if ops:
+                WRITER_STATS["flushes"] += 1
+                WRITER_STATS["bytes"] += sum(len(d) for _, _, d in ops)
+                WRITER_STATS["flushed_rev"] = rev
+            return WRITER_STATS["flushed_rev"]
+
+def _writer_loop() -> None:
+    while True:
+        with _WRITER_COND:
+            while not (WRITER["full"] or WRITER["delta"] is not None):
+                _WRITER_COND.wait()
+            wait = WRITER["last_flush"] + FLUSH_MS / 1000.0 - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            flush_pending()
+        except Exception as e:
+            print("WRITER ERROR:", e)
+            traceback.print_exc()
+            time.sleep(FLUSH_MS / 1000.0)
+
+def _flush_if_sync() -> None:
+    if FLUSH_MS <= 0:
+        flush_pending()
+
+atexit.register(flush_pending)
+
+# ---------- change feed (server-sent events) ----------
+# Every revision is pushed to /events subscribers as the same record the
+# journal stores: {"seq", "op": "full", "scene"} or {"seq", "op": "delta",
+# "upsert", "removed", ...}.  Slow subscribers are dropped and resync on
+# reconnect (the first event of a stream is always a full snapshot).
+FEED_QUEUE_MAX = 256
+FEED_KEEPALIVE_S = 15.0
+_SUBSCRIBERS = set()
+_SUB_LOCK = threading.Lock()
+
+def broadcast(record: dict) -> None:
+    # callers hold _LIVE_LOCK, which /events also takes to subscribe, so no
+    # subscriber can appear between this check and the put below
+    if not _SUBSCRIBERS:
+        return
+    data = scene_json.dumps(record)
+    with _SUB_LOCK:
+        for q in list(_SUBSCRIBERS):
+            try:
+                q.put_nowait((record["seq"], data))
+            except queue.Full:
+                _SUBSCRIBERS.discard(q)
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait(None)
+
+def _sse(seq, data: str) -> str:
+    return f"id: {seq}\ndata: {data}\n\n"
+
+def _commit_full(payload: dict) -> int:
+    """Install payload as the next revision and queue it for writing. Caller holds _LIVE_LOCK."""
+    prev = (LIVE["scene"] or {}).get("objects") or {}
+    objs = payload.get("objects", {})
+    LIVE["rev"] += 1
+    LIVE["scene"] = payload
+    _track_revs(LIVE["rev"], [k for k, o in objs.items() if prev.get(k) != o],
+                [k for k in prev if k not in objs])
+    _mark_dirty(None)
+    broadcast({"seq": LIVE["rev"], "op": "full", "scene": payload})
     return len(payload.get("objects", {}))
 
+def publish_spec(spec: dict) -> tuple[int, int]:
+    """Replace the live scene with a full model; return (rev, object count)."""
+    with _stage("normalize"):
+        payload = normalize_for_watcher(spec)
+    with _LIVE_LOCK:
+        count = _commit_full(payload)
+        rev = LIVE["rev"]
+    _flush_if_sync()
+    return rev, count
+
+def write_spec_to_watch(spec: dict) -> int:
+    return publish_spec(spec)[1]
+
+class RevisionConflict(Exception):
+    pass
+
+def _parse_rev(value) -> int | None:
+    """A client-sent revision: an int or a string of one; None if absent. ValueError otherwise."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Bad revision: {value!r}")
+    return int(value)
+
+def apply_publish_delta(delta: dict) -> dict:
+    """Apply {base_rev, added, changed, removed} to the live scene and queue the write.
+
+    added/changed carry whole objects (dict keyed by label or a list with
+    label/id); removed is a list of labels.  Raises RevisionConflict when the
+    client's base_rev is not the current revision.
+    """
+    with _LIVE_LOCK:
+        scene = LIVE["scene"]
+        base_rev = _parse_rev(delta.get("base_rev"))
+        if scene is None or base_rev is None or base_rev != LIVE["rev"]:
+            raise RevisionConflict(LIVE["rev"])
+
+        objs = scene["objects"]
+        touched = {"added": [], "changed": [], "removed": []}
+        for kind in ("added", "changed"):
+            for key, a in _object_items(delta.get(kind) or {}):
+                if not isinstance(a, dict):
+                    continue
+                objs[str(key)] = _normalize_object(a)
+                touched[kind].append(str(key))
+        for key in delta.get("removed") or []:
+            if objs.pop(str(key), None) is not None:
+                touched["removed"].append(str(key))
+
+        if "canvas" in delta or "grid_w" in delta or "grid_h" in delta:
+            scene["grid_w"], scene["grid_h"] = _grid_from_model(
+                delta, scene["grid_w"], scene["grid_h"])
+        if "_source" in delta:
+            scene["_source"] = str(delta["_source"])
+
+        LIVE["rev"] += 1
+        _track_revs(LIVE["rev"], touched["added"] + touched["changed"], touched["removed"])
+        record = {
+            "seq": LIVE["rev"], "op": "delta",
+            "grid_w": scene["grid_w"], "grid_h": scene["grid_h"],
+            "upsert": {k: objs[k] for k in touched["added"] + touched["changed"]},
+            "removed": touched["removed"],
+            "_source": scene.get("_source"), "_t": time.time(),
+        }
+        _mark_dirty(record)
+        broadcast(record)
+        res = {"rev": LIVE["rev"], "objects": len(objs), **touched}
+    _flush_if_sync()
+    return res
+
+def _standardize_bulk(model: dict, objs) -> dict:
+    """standardize_for_agent for large scenes: columnar, and no deep copy of the model."""
+    if isinstance(objs, dict):
+        labels, it = [], []
+        for k, v in objs.items():
+            v = v if isinstance(v, dict) else {}
+            labels.append(v["label"] if "label" in v else k)
+            it.append(v)
+    else:
+        it = list(objs)
+        labels = [o.get("label") for o in it]
+    X, Y, W, H = _bulk_rects(it)
+    heights = _float_column([o.get("height", 0.5) for o in it], 0.5).tolist()
+    zs = _float_column([o.get("z_offset", 0.0) for o in it], 0.0).tolist()
+    arr = []
+    for i, (o, lab, x, y, w, h, ht, z) in enumerate(
+            zip(it, labels, X.tolist(), Y.tolist(), W.tolist(), H.tolist(), heights, zs)):
+        arr.append({
+            "label": lab or o.get("id") or f"OBJ_{i+1}",
+            "primitive": o.get("primitive", "cube"),
+            "x": x, "y": y, "w": w, "h": h,
+            "height": ht,
+            "z_offset": z,
+            "rot_deg": o.get("rot_deg")
+        })
+    return {**model, "objects": arr}
+
 def standardize_for_agent(model: dict) -> dict:
     """Convert any shapes to x/y/w/h so the agent never KeyErrors on 'x'."""
     if not isinstance(model, dict):
         return {}
-    spec = json.loads(json.dumps(model))  # deep copy
+    objs = model.get("objects") or []
+    if isinstance(objs, (dict, list)) and _use_bulk(len(objs)):
+        return _standardize_bulk(model, objs)
+    spec = scene_json.clone(model)  # deep copy
     objs = spec.get("objects") or []
     arr = []
     if isinstance(objs, dict):
@@ -167,8 +680,99 @@ def standardize_for_agent(model: dict) -> dict:
 @app.after_request
 def add_cors_headers(resp):
     resp.headers["Access-Control-Allow-Origin"] = "*"
-    resp.headers["Access-Control-Allow-Headers"] = "Content-Type"
-    resp.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
+    resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Content-Encoding, X-Session-Id"
+    resp.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    return resp
+
+@app.before_request
+def _start_stage_timing():
+    _STAGE_TLS.timings = {}
+    _STAGE_TLS.started = time.perf_counter()
+
+@app.after_request
+def add_server_timing(resp):
+    started = getattr(_STAGE_TLS, "started", None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        key = (endpoint, request.method, resp.status_code)
+        with _METRICS_LOCK:
+            REQUEST_SECONDS.observe(endpoint, time.perf_counter() - started)
+            REQUESTS_TOTAL[key] = REQUESTS_TOTAL.get(key, 0) + 1
+        _STAGE_TLS.started = None
+    timings = getattr(_STAGE_TLS, "timings", None)
+    if timings:
+        resp.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={dt * 1000.0:.3f}" for name, dt in timings.items())
+    _STAGE_TLS.timings = None
+    return resp
+
+# ---------- compression ----------
+# Responses are gzip/deflate-encoded when the client's Accept-Encoding allows
+# it and the body is big enough to be worth it; request bodies sent with
+# Content-Encoding: gzip/deflate are inflated before the routes see them.
+COMPRESS_MIN_BYTES = int(os.getenv("ATLAS_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.getenv("ATLAS_COMPRESS_LEVEL", "5"))
+MAX_INFLATED_BYTES = int(os.getenv("ATLAS_MAX_INFLATED_BYTES", str(512 * 1024 * 1024)))
+_COMPRESSIBLE = ("application/json", "image/svg+xml", "text/plain", "text/html")
+
+def _inflate(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif data[:1] == b"\x78":      # zlib-wrapped deflate (RFC 1950)
+        d = zlib.decompressobj()
+    else:                          # raw deflate, as some clients send it
+        d = zlib.decompressobj(-zlib.MAX_WBITS)
+    out = d.decompress(data, MAX_INFLATED_BYTES)
+    if d.unconsumed_tail:
+        raise ValueError("inflated body too large")
+    return out + d.flush()
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+    return zlib.compress(data, COMPRESS_LEVEL)
+
+class _InflateRequests:
+    """WSGI middleware: decode Content-Encoding: gzip/deflate request bodies."""
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        enc = (environ.get("HTTP_CONTENT_ENCODING") or "").strip().lower()
+        if enc in ("gzip", "x-gzip", "deflate"):
+            try:
+                length = int(environ.get("CONTENT_LENGTH") or 0)
+                raw = environ["wsgi.input"].read(length) if length else environ["wsgi.input"].read()
+                body = _inflate(raw, "deflate" if enc == "deflate" else "gzip")
+            except Exception as e:
+                msg = scene_json.dumpb({"ok": False, "error": f"Bad {enc} body: {e}"})
+                start_response("400 Bad Request", [("Content-Type", "application/json"),
+                                                   ("Content-Length", str(len(msg))),
+                                                   ("Access-Control-Allow-Origin", "*")])
+                return [msg]
+            environ["wsgi.input"] = io.BytesIO(body)
+            environ["CONTENT_LENGTH"] = str(len(body))
+            del environ["HTTP_CONTENT_ENCODING"]
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = _InflateRequests(app.wsgi_app)
+
+@app.after_request
+def compress_response(resp):
+    if (resp.direct_passthrough or resp.is_streamed or resp.status_code < 200
+            or resp.status_code in (204, 304) or "Content-Encoding" in resp.headers
+            or resp.mimetype not in _COMPRESSIBLE):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    enc = request.accept_encodings.best_match(["gzip", "deflate"])
+    if not enc:
+        return resp
+    data = resp.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return resp
+    with _stage("compress"):
+        resp.set_data(_compress(data, enc))
+    resp.headers["Content-Encoding"] = enc
     return resp
 
 # ---------- routes ----------
@@ -177,68 +781,436 @@ def publish():
     if request.method == "OPTIONS":
         return ("", 204)
     try:
-        model = request.get_json(force=True, silent=False) or {}
-        count = write_spec_to_watch(model)
-        return jsonify({"ok": True, "written": WATCH_PATH, "objects": count})
+        with _stage("parse"):
+            model = request.get_json(force=True, silent=False) or {}
+        rev, count = publish_spec(model)
+        return jsonify({"ok": True, "written": WATCH_PATH, "objects": count, "rev": rev})
     except Exception as e:
         print("PUBLISH ERROR:", e)
         traceback.print_exc()
         return jsonify({"ok": False, "error": f"{type(e).__name__}: {e}"}), 500
 
-@app.route("/agent", methods=["POST", "OPTIONS"])
-def agent():
+@app.route("/publish/delta", methods=["POST", "OPTIONS"])
+def publish_delta():
     if request.method == "OPTIONS":
         return ("", 204)
     try:
-        data = request.get_json(force=True, silent=True) or {}
-        prompt = (data.get("prompt") or "").strip()
-        if not prompt:
-            return jsonify({"ok": False, "error": "Missing 'prompt'"}), 400
+        with _stage("parse"):
+            delta = request.get_json(force=True, silent=False)
+        if not isinstance(delta, dict):
+            return jsonify({"ok": False, "error": f"Delta must be a JSON object, got {type(delta).__name__}"}), 400
+        try:
+            _parse_rev(delta.get("base_rev"))
+        except ValueError:
+            return jsonify({"ok": False, "error": f"Bad 'base_rev': {delta.get('base_rev')!r}"}), 400
+        res = apply_publish_delta(delta)
+        return jsonify({"ok": True, "written": WATCH_PATH, **res})
+    except RevisionConflict as e:
+        # client is out of date: it must re-send the full model via /publish
+        return jsonify({"ok": False, "error": "E_REV_MISMATCH", "rev": e.args[0]}), 409
+    except Exception as e:
+        print("PUBLISH DELTA ERROR:", e)
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": f"{type(e).__name__}: {e}"}), 500
 
-        base_model = data.get("model")
-        base_model_std = standardize_for_agent(base_model or {})
+@app.route("/publish/status", methods=["GET"])
+def publish_status():
+    with _LIVE_LOCK:
+        return jsonify({
+            "ok": True, "rev": LIVE["rev"], "flush_ms": FLUSH_MS,
+            "pending": WRITER["full"] or WRITER["delta"] is not None,
+            **WRITER_STATS,
+        })
 
-        outs = run_prompt(prompt, base_model=base_model_std)
+def _client_scene(scene: dict) -> dict:
+    """scene without the keys that only the watcher file needs (_t, _seq)."""
+    return {k: v for k, v in scene.items() if k not in ("_t", "_seq")}
 
-        json_path = outs.get("json")
-        if not json_path:
-            return jsonify({"ok": False, "error": "Agent did not provide 'json' path"}), 500
+def scene_since(since: int | None) -> dict:
+    """The live scene, or only what changed after revision `since`. Caller holds _LIVE_LOCK."""
+    scene, rev = LIVE["scene"], LIVE["rev"]
+    if since is None or since < TOMBS["floor"] or since > rev:
+        return {"rev": rev, "full": True, "scene": _client_scene(scene)}
+    objs = scene["objects"]
+    return {
+        "rev": rev, "since": since, "full": False,
+        "grid_w": scene["grid_w"], "grid_h": scene["grid_h"],
+        "upsert": {k: objs[k] for k, r in OBJ_REVS.items() if r > since},
+        "removed": [k for k, r in TOMBS["removed"].items() if r > since],
+    }
+
+@app.route("/scene", methods=["GET"])
+def get_scene():
+    """Current live scene; ETag is the revision, ?since=<rev> returns only changes."""
+    since = request.args.get("since")
+    try:
+        since = int(since) if since not in (None, "") else None
+    except ValueError:
+        return jsonify({"ok": False, "error": f"Bad 'since': {since!r}"}), 400
+    with _LIVE_LOCK:
+        if LIVE["scene"] is None:
+            return jsonify({"ok": False, "error": "No scene published yet"}), 404
+        etag = str(LIVE["rev"])
+        if request.if_none_match.contains(etag):
+            resp = Response(status=304)
+        else:
+            with _stage("serialize"):
+                body = scene_json.dumpb({"ok": True, **scene_since(since)})
+            resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of stage/tool/request latencies and counters."""
+    with _LIVE_LOCK:
+        live = {"rev": LIVE["rev"], "subscribers": len(_SUBSCRIBERS), **WRITER_STATS}
+    with _JOBS_COND:
+        pending = _pending_jobs()
+    cache = dict(ai_agent.PLAN_CACHE.stats)
+    with ai_agent._USAGE_LOCK:
+        usage = dict(ai_agent.PLANNER_USAGE)
+    out = []
+    with _METRICS_LOCK:
+        for hist in (STAGE_SECONDS, TOOL_SECONDS, REQUEST_SECONDS):
+            hist.render(out)
+        out.append("# HELP atlas_requests_total HTTP requests handled.")
+        out.append("# TYPE atlas_requests_total counter")
+        for (endpoint, method, status), n in sorted(REQUESTS_TOTAL.items()):
+            out.append(f'atlas_requests_total{{endpoint="{_label_value(endpoint)}",'
+                       f'method="{method}",status="{status}"}} {n}')
+    for name, kind, help_text, value in (
+        ("atlas_live_rev", "gauge", "Current live scene revision.", live["rev"]),
+        ("atlas_flushed_rev", "gauge", "Last revision written to disk.", live["flushed_rev"]),
+        ("atlas_feed_subscribers", "gauge", "Connected /events subscribers.", live["subscribers"]),
+        ("atlas_agent_jobs_pending", "gauge", "Queued plus running agent jobs.", pending),
+        ("atlas_writer_requests_total", "counter", "Writes requested by publishes.", live["requests"]),
+        ("atlas_writer_flushes_total", "counter", "Writes performed by the writer.", live["flushes"]),
+        ("atlas_writer_merged_total", "counter", "Writes merged into a later flush.", live["merged"]),
+        ("atlas_writer_bytes_total", "counter", "Bytes written by the writer.", live["bytes"]),
+        ("atlas_plan_cache_hits_total", "counter", "Plans served from the plan cache.", cache["hits"]),
+        ("atlas_plan_cache_disk_hits_total", "counter", "Plan cache hits read from disk.", cache["disk_hits"]),
+        ("atlas_plan_cache_misses_total", "counter", "Plans that needed a model call.", cache["misses"]),
+        ("atlas_plan_cache_evictions_total", "counter", "Plan cache entries evicted for size.", cache["evictions"]),
+        ("atlas_llm_calls_total", "counter", "Planner model calls.", usage["calls"]),
+        ("atlas_llm_prompt_tokens_total", "counter", "Prompt tokens sent to the planner model.", usage["prompt_tokens"]),
+        ("atlas_llm_cached_tokens_total", "counter", "Prompt tokens served from the provider's prefix cache.", usage["cached_tokens"]),
+        ("atlas_llm_completion_tokens_total", "counter", "Completion tokens from the planner model.", usage["completion_tokens"]),
+    ):
+        out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return Response("\n".join(out) + "\n",
+                    content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route("/events", methods=["GET"])
+def events():
+    """Server-sent change feed: a full snapshot, then one event per revision."""
+    q = queue.Queue(FEED_QUEUE_MAX)
+    with _LIVE_LOCK:
+        # snapshot and subscribe atomically so no revision is missed or doubled
+        snapshot = None
+        if LIVE["scene"] is not None:
+            snapshot = (LIVE["rev"], scene_json.dumps(
+                {"seq": LIVE["rev"], "op": "full", "scene": _client_scene(LIVE["scene"])}))
+        with _SUB_LOCK:
+            _SUBSCRIBERS.add(q)
+
+    def stream():
+        try:
+            yield "retry: 1000\n\n"
+            if snapshot:
+                yield _sse(*snapshot)
+            while True:
+                try:
+                    item = q.get(timeout=FEED_KEEPALIVE_S)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:   # dropped for falling behind
+                    return
+                yield _sse(*item)
+        finally:
+            with _SUB_LOCK:
+                _SUBSCRIBERS.discard(q)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ---------- agent ----------
+class AgentError(Exception):
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+def run_agent(data: dict) -> dict:
+    """Run one /agent request body through the engine and publish the result."""
+    prompt = (data.get("prompt") or "").strip()
+    if not prompt:
+        raise AgentError("Missing 'prompt'", 400)
 
+    base_model = data.get("model")
+    # no model in the body: keep editing the session's current scene
+    with _stage("standardize"):
+        base_model_std = standardize_for_agent(base_model) if base_model else None
+
+    def publish_step(cmd):
+        # publish each applied command so the viewport updates before the plan is done
+        if cmd.get("tool") not in ("render_svg", "export_state"):
+            publish_spec({**ai_agent.SCENE, "_source": "agent"})
+
+    # each editor gets its own scene/undo history; model calls for different
+    # sessions overlap, their engine work runs one at a time
+    with _stage("agent"):
+        outs = run_prompt(prompt, base_model=base_model_std,
+                          stream=bool(data.get("stream")),
+                          on_step=publish_step if data.get("stream") else None,
+                          session=data.get("session"))
+
+    spec = outs.get("scene")
+    json_path = outs.get("json")
+    if spec is None:
+        # older engines only hand back the exported file
+        if not json_path:
+            raise AgentError("Agent did not provide 'json' path")
         jp = Path(json_path)
         if not jp.exists():
             alt = Path(__file__).resolve().parent / jp.name
             if alt.exists():
                 jp = alt
             else:
-                return jsonify({"ok": False, "error": f"JSON not found: {jp}"}), 500
-
-        with open(jp, "r", encoding="utf-8") as f:
-            spec = json.load(f)
-        # tag source so Blender log shows src=agent
-        if isinstance(spec, dict):
-            spec["_source"] = "agent"
+                raise AgentError(f"JSON not found: {jp}")
+        spec = scene_json.read(jp)
+        json_path = str(jp)
+    # tag source so Blender log shows src=agent
+    if isinstance(spec, dict):
+        spec["_source"] = "agent"
 
+    with _stage("write_spec"):
         obj_count = write_spec_to_watch(spec)
 
-        svg_text = None
-        svg_path = outs.get("svg")
-        if svg_path and os.path.exists(svg_path):
-            with open(svg_path, "r", encoding="utf-8") as fh:
-                svg_text = fh.read()
+    svg_path = outs.get("svg")
+    svg_text = outs.get("svg_text")
+    if svg_text is None and svg_path and os.path.exists(svg_path):
+        with open(svg_path, "r", encoding="utf-8") as fh:
+            svg_text = fh.read()
 
-        return jsonify({
-            "ok": True,
-            "written": WATCH_PATH,
-            "objects": obj_count,
-            "svg": svg_path,
-            "svg_text": svg_text,
-            "json": str(jp),
-            "spec": spec
-        })
+    return {
+        "ok": True,
+        "written": WATCH_PATH,
+        "objects": obj_count,
+        "svg": svg_path,
+        "svg_text": svg_text,
+        "json": json_path,
+        "spec": spec,
+        "planner": outs.get("planner"),
+    }
+
+def _agent_body() -> dict:
+    with _stage("parse"):
+        data = request.get_json(force=True, silent=True) or {}
+    if not data.get("session") and request.headers.get("X-Session-Id"):
+        data["session"] = request.headers["X-Session-Id"]
+    return data
+
+@app.route("/agent", methods=["POST", "OPTIONS"])
+def agent():
+    if request.method == "OPTIONS":
+        return ("", 204)
+    try:
+        data = _agent_body()
+        result = run_agent(data)
+        with _stage("response"):
+            return jsonify(result)
+    except AgentError as e:
+        return jsonify({"ok": False, "error": str(e)}), e.status
     except Exception as e:
         print("AGENT ERROR:", e)
         traceback.print_exc()
         return jsonify({"ok": False, "error": f"{type(e).__name__}: {e}"}), 500
 
+# ---------- agent batch ----------
+BATCH_MAX_ITEMS = int(os.getenv("ATLAS_BATCH_MAX_ITEMS", "500"))
+
+def run_agent_batch(data: dict) -> dict:
+    """Plan and run every {"prompt", "model"} item in its own scene; nothing is published."""
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        raise AgentError("Missing 'items'", 400)
+    if len(items) > BATCH_MAX_ITEMS:
+        raise AgentError(f"Too many items ({len(items)} > {BATCH_MAX_ITEMS})", 413)
+    concurrency = None
+    if data.get("concurrency") is not None:
+        # a client may lower the worker count, never raise it past the server's
+        n = _safe_float(data["concurrency"], 0.0)
+        if isinstance(data["concurrency"], bool) or n < 1 or n != int(n):
+            raise AgentError("'concurrency' must be a positive integer", 400)
+        concurrency = min(int(n), ai_agent.BATCH_CONCURRENCY)
+    jobs, bad = [], {}
+    with _stage("standardize"):
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                bad[i] = "Item must be an object"
+                jobs.append({})
+                continue
+            base = item.get("model")
+            jobs.append({"prompt": item.get("prompt"),
+                         "base_model": standardize_for_agent(base) if base else None})
+    with _stage("agent"):
+        outs = ai_agent.run_prompts(jobs, concurrency=concurrency)
+    results = []
+    for i, out in enumerate(outs):
+        if i in bad:
+            results.append({"ok": False, "error": bad[i]})
+        elif not out["ok"]:
+            results.append(out)
+        else:
+            spec = out.get("scene")
+            if isinstance(spec, dict):
+                spec["_source"] = "agent"
+            results.append({"ok": True, "spec": spec, "svg": out.get("svg"),
+                            "svg_text": out.get("svg_text"), "json": out.get("json"),
+                            "planner": out.get("planner")})
+    return {"ok": True, "count": len(results),
+            "failed": sum(1 for r in results if not r["ok"]), "results": results}
+
+@app.route("/agent/batch", methods=["POST", "OPTIONS"])
+def agent_batch():
+    if request.method == "OPTIONS":
+        return ("", 204)
+    try:
+        with _stage("parse"):
+            data = request.get_json(force=True, silent=True) or {}
+        result = run_agent_batch(data)
+        with _stage("response"):
+            return jsonify(result)
+    except AgentError as e:
+        return jsonify({"ok": False, "error": str(e)}), e.status
+    except Exception as e:
+        print("AGENT BATCH ERROR:", e)
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": f"{type(e).__name__}: {e}"}), 500
+
+# ---------- agent jobs ----------
+AGENT_WORKERS = int(os.getenv("ATLAS_AGENT_WORKERS", "2"))
+AGENT_MAX_PENDING = int(os.getenv("ATLAS_AGENT_MAX_PENDING", "16"))
+JOB_TTL_S = float(os.getenv("ATLAS_JOB_TTL_S", "600"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=AGENT_WORKERS, thread_name_prefix="agent")
+_JOBS = {}
+_JOBS_COND = threading.Condition()
+
+def _job_view(job: dict) -> dict:
+    out = {k: job[k] for k in ("id", "status", "timing")}
+    if job["status"] == "done":
+        out["result"] = job["result"]
+    elif job["status"] == "error":
+        out["error"] = job["error"]
+    return out
+
+def _prune_jobs(now: float) -> None:
+    # caller holds _JOBS_COND
+    for jid in [j for j, job in _JOBS.items()
+                if job["finished"] and now - job["finished"] > JOB_TTL_S]:
+        del _JOBS[jid]
+
+def _pending_jobs() -> int:
+    return sum(1 for job in _JOBS.values() if job["status"] in ("queued", "running"))
+
+def _run_job(jid: str, data: dict) -> None:
+    with _JOBS_COND:
+        job = _JOBS[jid]
+        job["status"] = "running"
+        job["started"] = time.time()
+        job["timing"]["queue_ms"] = round((job["started"] - job["created"]) * 1000.0, 2)
+        _JOBS_COND.notify_all()
+    stages = {}
+    try:
+        with collect_stages() as stages:
+            result, error = run_agent(data), None
+    except AgentError as e:
+        result, error = None, {"error": str(e), "status": e.status}
+    except Exception as e:
+        print("AGENT JOB ERROR:", e)
+        traceback.print_exc()
+        result, error = None, {"error": f"{type(e).__name__}: {e}", "status": 500}
+    with _JOBS_COND:
+        job["finished"] = time.time()
+        job["timing"]["run_ms"] = round((job["finished"] - job["started"]) * 1000.0, 2)
+        job["timing"]["total_ms"] = round((job["finished"] - job["created"]) * 1000.0, 2)
+        job["timing"]["stages_ms"] = {k: round(v * 1000.0, 3) for k, v in stages.items()}
+        job["status"] = "done" if error is None else "error"
+        job["result"], job["error"] = result, error
+        _JOBS_COND.notify_all()
+
+def submit_job(data: dict) -> dict:
+    """Queue an /agent request body; raises AgentError(429) when the queue is full."""
+    now = time.time()
+    with _JOBS_COND:
+        _prune_jobs(now)
+        if _pending_jobs() >= AGENT_MAX_PENDING:
+            raise AgentError("Too many pending agent jobs", 429)
+        jid = uuid.uuid4().hex
+        _JOBS[jid] = {"id": jid, "status": "queued", "created": now,
+                      "started": None, "finished": None,
+                      "result": None, "error": None, "timing": {}}
+    _EXECUTOR.submit(_run_job, jid, data)
+    return {"id": jid, "status": "queued"}
+
+@app.route("/agent/jobs", methods=["POST", "OPTIONS"])
+def agent_jobs():
+    if request.method == "OPTIONS":
+        return ("", 204)
+    data = _agent_body()
+    if not (data.get("prompt") or "").strip():
+        return jsonify({"ok": False, "error": "Missing 'prompt'"}), 400
+    try:
+        job = submit_job(data)
+    except AgentError as e:
+        return jsonify({"ok": False, "error": str(e)}), e.status
+    return jsonify({"ok": True, **job, "url": f"/agent/jobs/{job['id']}"}), 202
+
+@app.route("/agent/jobs/<jid>", methods=["GET"])
+def agent_job(jid):
+    # ?wait=<seconds> long-polls until the job finishes or the wait runs out
+    wait = min(max(_safe_float(request.args.get("wait"), 0.0), 0.0), 60.0)
+    deadline = time.time() + wait
+    with _JOBS_COND:
+        job = _JOBS.get(jid)
+        if job is None:
+            return jsonify({"ok": False, "error": f"Unknown job: {jid}"}), 404
+        while job["status"] in ("queued", "running") and time.time() < deadline:
+            _JOBS_COND.wait(deadline - time.time())
+        return jsonify({"ok": True, **_job_view(job)})
+
+@app.route("/agent/jobs/<jid>/events", methods=["GET"])
+def agent_job_events(jid):
+    with _JOBS_COND:
+        if jid not in _JOBS:
+            return jsonify({"ok": False, "error": f"Unknown job: {jid}"}), 404
+
+    def stream():
+        seen = None
+        while True:
+            with _JOBS_COND:
+                job = _JOBS.get(jid)
+                if job is None:
+                    return
+                if job["status"] == seen:
+                    _JOBS_COND.wait(FEED_KEEPALIVE_S)
+                    job = _JOBS.get(jid)
+                    if job is None:
+                        return
+                status, view = job["status"], _job_view(job)
+            if status == seen:
+                yield ": keepalive\n\n"
+                continue
+            seen = status
+            yield f"event: {status}\ndata: {scene_json.dumps(view)}\n\n"
+            if status in ("done", "error"):
+                return
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 if __name__ == "__main__":
     app.run(host="127.0.0.1", port=APP_PORT, debug=True)
@@ -0,0 +1,11 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# helper modules shared by the tests (scene generators, reference implementations)
+sys.path.insert(0, os.path.dirname(__file__))
+
+# no network, API key or files in the working directory
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("ATLAS_PLANNER_BACKEND", "fake")
+os.environ.setdefault("ATLAS_PERSIST_ARTIFACTS", "off")
+os.environ.setdefault("ATLAS_PLAN_CACHE", "memory")
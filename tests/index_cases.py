@@ -0,0 +1,71 @@
+"""Scenes and random edits for the spatial index tests, with a linear-scan oracle."""
+import math
+import random
+
+import ai_agent
+
+
+def synthetic(n, seed=0, density=6.0):
+    rng = random.Random(seed)
+    side = math.sqrt(n * density)
+    snap = ai_agent.snap_to_grid
+    objs = {}
+    for i in range(n):
+        w, h = rng.choice([0.5, 1.0, 1.5, 2.0, 4.0]), rng.choice([0.5, 1.0, 1.5, 2.0])
+        objs[f"O{i}"] = {"label": f"O{i}", "primitive": "cube", "height": 1.0,
+                         "x": snap(rng.uniform(1, side - 1)), "y": snap(rng.uniform(1, side - 1)), "w": w, "h": h}
+    return {"grid_w": side, "grid_h": side, "objects": objs, "constraints": [], "anchors": {}}
+
+
+def brute_rect(objs, x0, y0, x1, y1):
+    return {k for k, o in objs.items()
+            if o["x"] + o["w"] / 2 >= x0 and o["x"] - o["w"] / 2 <= x1
+            and o["y"] + o["h"] / 2 >= y0 and o["y"] - o["h"] / 2 <= y1}
+
+
+def random_batch(rng, objs, step):
+    labels = list(objs)
+    L = lambda: rng.choice(labels)
+    tool = rng.choice(["move", "move", "add_object", "remove_object", "rename_object",
+                       "align", "scale", "place_relative", "mirror_object", "undo", "set_height"])
+    args = {"move": lambda: {"target": L(), "dx": rng.choice([-3, -1, 2, 5]), "dy": rng.choice([-2, 0, 4])},
+            "add_object": lambda: {"label": f"N{step}", "x": rng.uniform(2, 30), "y": rng.uniform(2, 30),
+                                   "w": 2.0, "h": 1.0},
+            "remove_object": lambda: {"target": L()},
+            "rename_object": lambda: {"target": L(), "new_label": f"R{step}"},
+            "align": lambda: {"targets": [L(), L(), L()], "axis": rng.choice(["x", "y"]),
+                              "mode": rng.choice(["centers", "lefts", "rights", "tops", "bottoms"])},
+            "scale": lambda: {"target": L(), "factor": rng.choice([0.5, 2.0])},
+            "place_relative": lambda: {"target": L(), "ref": L(), "direction": rng.choice(["left_of", "below"]),
+                                       "distance": 1.0},
+            "mirror_object": lambda: {"target": L(), "axis": rng.choice(["x", "y"])},
+            "undo": lambda: {},
+            "set_height": lambda: {"target": L(), "height": 2.0}}[tool]()
+    return {"commands": [{"tool": tool, "arguments": args}]}
+
+
+def random_engine_call(rng, objs, step):
+    # the same kinds of edit, straight into the engine as plan_importer and
+    # tool code make them, with no router in between
+    labels = list(objs)
+    L = lambda: rng.choice(labels)
+    calls = [
+        lambda: ai_agent.engine_move(L(), rng.choice([-3, 1, 4]), rng.choice([-2, 0, 3])),
+        lambda: ai_agent.engine_add_object(f"D{step}", "cube", rng.uniform(2, 30), rng.uniform(2, 30), 1.5, 1.0),
+        lambda: ai_agent.engine_remove_object(L()),
+        lambda: ai_agent.engine_rename_object(L(), f"Q{step}"),
+        lambda: ai_agent.engine_batch_rename([[L(), L()], [L(), f"Q{step}"]]),
+        lambda: ai_agent.engine_align([L(), L(), L()], "y", rng.choice(["centers", "tops"])),
+        lambda: ai_agent.engine_distribute([L(), L(), L(), L()], "x", "equal_gaps", None),
+        lambda: ai_agent.engine_scale(L(), rng.choice(["x", "y", "both"]), rng.choice([0.5, 2.0])),
+        lambda: ai_agent.engine_place_relative(L(), L(), rng.choice(["above", "right_of"]), 1.0),
+        lambda: ai_agent.engine_place_left_of(L(), f"P{step}", gap=0.5),
+        lambda: ai_agent.engine_merge_objects(L(), L()),
+        lambda: ai_agent.engine_move_group([L(), L()], 1.0, -1.0, symmetric=rng.random() < 0.5),
+        lambda: ai_agent.engine_move_into_bbox(L(), {"x": 5.0, "y": 5.0, "w": 2.0, "h": 2.0}),
+        lambda: ai_agent.engine_stack_above(L(), L()),
+        lambda: ai_agent.engine_mirror_object(L(), rng.choice(["x", "y"])),
+        lambda: ai_agent.engine_resize_canvas(ai_agent.SCENE["grid_w"] + 2, ai_agent.SCENE["grid_h"], True),
+        lambda: ai_agent.engine_undo(),
+    ]
+    rng.choice(calls)()
@@ -0,0 +1,79 @@
+"""
+Line-of-sight test scenes, and the per-scanline estimator the sweep in
+ai_agent._scanline_empty_span_max replaced, kept here as the oracle.
+"""
+import random
+
+import ai_agent
+
+
+def scanline_empty_span_max_reference(objs, gw, gh):
+    """The scan-every-rect-per-scanline estimator, as it was before the sweep."""
+    ys = {0.0, gh}
+    xs = {0.0, gw}
+    rects = {}
+    for L, o in objs.items():
+        l, r, t, b = ai_agent._aabb(o)
+        rects[L] = (l, r, t, b)
+        ys.update([t, b, o["y"]])
+        xs.update([l, r, o["x"]])
+
+    max_h = 0.0; where_h = None
+    for y in sorted(ys):
+        occ = [(l, r) for (l, r, t, b) in rects.values() if t <= y <= b]
+        for a, b in ai_agent._empty_spans_1d(occ, 0.0, gw):
+            if b - a > max_h:
+                max_h = b - a
+                where_h = {"y": float(y), "x0": float(a), "x1": float(b)}
+
+    max_v = 0.0; where_v = None
+    for x in sorted(xs):
+        occ = [(t, b) for (l, r, t, b) in rects.values() if l <= x <= r]
+        for a, b in ai_agent._empty_spans_1d(occ, 0.0, gh):
+            if b - a > max_v:
+                max_v = b - a
+                where_v = {"x": float(x), "y0": float(a), "y1": float(b)}
+
+    return max(max_h, max_v), {"max_h": max_h, "where_h": where_h, "max_v": max_v, "where_v": where_v}
+
+
+def random_scene(rng, n, gw, gh, style):
+    objs = {}
+    for i in range(n):
+        if style == "snapped":
+            o = {"x": rng.randint(0, int(gw * 2)) / 2, "y": rng.randint(0, int(gh * 2)) / 2,
+                 "w": rng.randint(1, 8) / 2, "h": rng.randint(1, 8) / 2}
+        elif style == "ints":
+            o = {"x": rng.randint(-2, int(gw) + 2), "y": rng.randint(-2, int(gh) + 2),
+                 "w": rng.randint(0, 6), "h": rng.randint(0, 6)}
+        elif style == "odd":
+            o = {"x": rng.uniform(-5, gw + 5), "y": rng.uniform(-5, gh + 5),
+                 "w": rng.choice([0.0, -1.5, 2.0, rng.uniform(-3, 10)]),
+                 "h": rng.choice([0.0, -1.5, 2.0, rng.uniform(-3, 10)])}
+        else:
+            o = {"x": rng.uniform(0, gw), "y": rng.uniform(0, gh),
+                 "w": rng.uniform(0.1, gw / 4), "h": rng.uniform(0.1, gh / 4)}
+        objs[f"O{i}"] = o
+    return objs
+
+
+def site_plan(n, seed=0):
+    """A snapped street grid of n buildings with a few open corridors."""
+    rng = random.Random(seed)
+    side = int(n ** 0.5) + 1
+    gw = gh = 3.0 * side
+    objs = {}
+    for i in range(n):
+        cx, cy = 3.0 * (i % side) + 1.5, 3.0 * (i // side) + 1.5
+        objs[f"B{i}"] = {"x": cx + rng.choice([-0.5, 0, 0.5]), "y": cy + rng.choice([-0.5, 0, 0.5]),
+                         "w": rng.choice([1.5, 2.0, 2.5, 3.0]), "h": rng.choice([1.5, 2.0, 2.5, 3.0])}
+    return objs, gw, gh
+
+
+def scattered(n, seed=0):
+    """n unsnapped boxes at random on a canvas of the same density: every edge is its own scanline."""
+    rng = random.Random(seed)
+    gw = gh = 3.0 * (int(n ** 0.5) + 1)
+    objs = {f"S{i}": {"x": rng.uniform(0, gw), "y": rng.uniform(0, gh),
+                      "w": rng.uniform(0.5, 4.0), "h": rng.uniform(0.5, 4.0)} for i in range(n)}
+    return objs, gw, gh
@@ -0,0 +1,58 @@
+"""Random editor/SVG scenes for the normalization tests, awkward values included."""
+import random
+
+AWKWARD = [None, "3.5", "abc", True, float("nan"), float("inf"), -0.0, 0, 1e308, " 2 ", "1_000"]
+
+
+def _num(rng, awkward):
+    if awkward and rng.random() < 0.15:
+        return rng.choice(AWKWARD)
+    return rng.choice([rng.randint(-50, 900), rng.uniform(-50, 900)])
+
+
+KINDS = ["rect", "center", "circle", "ellipse", "polygon", "polyline", "xy", "empty"]
+
+
+def random_object(rng, awkward=True, kinds=KINDS):
+    kind = rng.choice(kinds)
+    o = {}
+    if kind == "rect":
+        o = {"type": "rect", "x": _num(rng, awkward), "y": _num(rng, awkward),
+             "w": _num(rng, awkward), "h": _num(rng, awkward)}
+    elif kind == "center":
+        o = {"x": _num(rng, awkward), "y": _num(rng, awkward), "w": _num(rng, awkward), "h": _num(rng, awkward)}
+    elif kind == "circle":
+        o = {"shape": "Circle", "cx": _num(rng, awkward), "cy": _num(rng, awkward), "r": _num(rng, awkward)}
+    elif kind == "ellipse":
+        o = {"type": "ellipse", "cx": _num(rng, awkward), "cy": _num(rng, awkward),
+             "rx": _num(rng, awkward), "ry": _num(rng, awkward)}
+    elif kind in ("polygon", "polyline"):
+        pts = [[rng.uniform(0, 500), rng.uniform(0, 500)] for _ in range(rng.randint(1, 6))]
+        o = {"type": kind, "points": " ".join(f"{a},{b}" for a, b in pts) if rng.random() < 0.5 else pts}
+        if rng.random() < 0.3:
+            o.update(x=_num(rng, awkward), y=_num(rng, awkward))
+    elif kind == "xy":
+        o = {"type": rng.choice(["circle", "text", ""]), "x": _num(rng, awkward), "y": _num(rng, awkward)}
+        if rng.random() < 0.5:
+            o["w"] = _num(rng, awkward)
+    if rng.random() < 0.7:
+        o["height"] = _num(rng, awkward)
+    if rng.random() < 0.4:
+        o["z_offset"] = _num(rng, awkward)
+    if rng.random() < 0.3:
+        o["rot_deg"] = [0, 0, rng.randint(0, 359)]
+    if rng.random() < 0.5:
+        o["primitive"] = rng.choice(["cube", "plane", "", None])
+    if rng.random() < 0.5:
+        o["label"] = rng.choice([f"L{rng.randint(0, 99)}", ""])
+    if rng.random() < 0.3:
+        o["id"] = f"id{rng.randint(0, 999)}"
+    return o
+
+
+def random_model(n, seed=0, as_list=False, awkward=True, kinds=KINDS):
+    rng = random.Random(seed)
+    objs = [random_object(rng, awkward, kinds) for _ in range(n)]
+    model = {"version": "1.0", "canvas": {"width_m": 120.0, "height_m": 80.0}, "_source": "tests"}
+    model["objects"] = objs if as_list else {f"K{i}": o for i, o in enumerate(objs)}
+    return model
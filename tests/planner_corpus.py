@@ -0,0 +1,110 @@
+"""
+Prompts the local planner must answer, each with the commands it must
+produce minus the trailing render_svg/export_state and the seeds. None
+means the prompt has to go to the model.
+"""
+import json
+
+import ai_agent
+
+SCENE = {"grid_w": 40.0, "grid_h": 30.0, "objects": {
+    L: {"label": L, "primitive": "cube", "x": 4.0 + 5 * i, "y": 6.0 + 3 * i, "w": 2.0, "h": 2.0, "height": 1.0}
+    for i, L in enumerate(["A", "B", "C", "D", "E", "Z", "TREE_1"])}}
+
+
+def mv(t, dx, dy):
+    return [{"tool": "move", "arguments": {"target": t, "dx": dx, "dy": dy}}]
+
+
+def align(ts, axis, mode):
+    return [{"tool": "align", "arguments": {"targets": ts, "axis": axis, "mode": mode}}]
+
+
+def between(t, a, b, axis="x"):
+    return [{"tool": "add_constraint", "arguments": {"kind": f"between_{axis}", "target": t, "a": a, "b": b}},
+            {"tool": "solve_constraints", "arguments": {}}]
+
+
+def height(t, h):
+    return [{"tool": "set_height", "arguments": {"target": t, "height": h}}]
+
+
+CORPUS = [
+    ("undo", [{"tool": "undo", "arguments": {}}]),
+    ("Undo.", [{"tool": "undo", "arguments": {}}]),
+    ("undo the last change", [{"tool": "undo", "arguments": {}}]),
+    ("redo", [{"tool": "redo", "arguments": {}}]),
+    ("move A left 2", mv("A", -2.0, 0.0)),
+    ("Move a right 3.5m", mv("A", 3.5, 0.0)),
+    ("move cube B up 1 meter", mv("B", 0.0, -1.0)),
+    ("move the square C down by 4", mv("C", 0.0, 4.0)),
+    ("move tree_1 left 2", mv("TREE_1", -2.0, 0.0)),
+    ("move A by 2, -1", mv("A", 2.0, -1.0)),
+    ("move A by 2,-1", mv("A", 2.0, -1.0)),
+    ("move A by 2 ,-1", mv("A", 2.0, -1.0)),
+    ("move B by 3 1", mv("B", 3.0, 1.0)),
+    ("move A by (1.5, 2)", mv("A", 1.5, 2.0)),
+    ("align A B C lefts", align(["A", "B", "C"], "x", "lefts")),
+    ("align A, B and C tops", align(["A", "B", "C"], "y", "tops")),
+    ("align A and D by their bottom edges", align(["A", "D"], "y", "bottoms")),
+    ("align A C E vertically centers", align(["A", "C", "E"], "x", "centers")),
+    ("align A C E horizontally centers", align(["A", "C", "E"], "y", "centers")),
+    ("distribute A B C horizontally equal gaps",
+     [{"tool": "distribute", "arguments": {"targets": ["A", "B", "C"], "axis": "x", "mode": "equal_gaps"}}]),
+    ("distribute A B C D vertically with spacing 2",
+     [{"tool": "distribute", "arguments": {"targets": ["A", "B", "C", "D"], "axis": "y",
+                                          "mode": "fixed_spacing", "spacing": 2.0}}]),
+    ("put Z between A and B", between("Z", "A", "B")),
+    ("place cube Z between A & B vertically", between("Z", "A", "B", "y")),
+    ("set height of B to 3", height("B", 3.0)),
+    ("set the height of B to 0.2", height("B", ai_agent.GRID_STEP)),
+    ("set B height to 2.5 m", height("B", 2.5)),
+    ("make C 4 m tall", height("C", 4.0)),
+    ("remove E", [{"tool": "remove_object", "arguments": {"target": "E"}}]),
+    ("delete the cube D", [{"tool": "remove_object", "arguments": {"target": "D"}}]),
+    ("rename A to Q", [{"tool": "rename_object", "arguments": {"target": "A", "new_label": "Q"}}]),
+    # out of scope or ambiguous: the model decides
+    ("move Q left 2", None),                          # no such object
+    ("move A left", None),                            # no distance
+    ("move A back 2", None),                          # not a direction we know
+    ("move A left 2 and B right 1", None),            # two edits
+    ("align A B centers", None),                      # axis unknown
+    ("align A lefts", None),                          # needs two targets
+    ("align A A lefts", None),                        # duplicate target
+    ("distribute A B horizontally equal gaps", None),  # needs three
+    ("put Q between A and B", None),                  # Q would have to be created
+    ("put A between A and B", None),
+    ("make C 4", None),
+    ("rename A to B", None),                          # B exists
+    ("add a cube X at the center", None),
+    ("undo twice", None),
+    ("go back to how it was before I moved A", None),
+    ("keep A at the center and move B left 2", None),
+    ("mirror A", None),
+    ("", None),
+]
+
+
+def strip_plan(plan):
+    cmds = [c for c in plan["commands"] if c["tool"] not in ("render_svg", "export_state")]
+    return [{"tool": c["tool"], "arguments": {k: v for k, v in c["arguments"].items() if k != "seed"}}
+            for c in cmds]
+
+
+def check_case(sess, prompt, expected):
+    """Plan prompt on a fresh copy of SCENE; None if it plans and runs as expected, else the failure."""
+    with sess.bound():
+        ai_agent._restore_scene(json.loads(json.dumps(SCENE)))
+        plan = ai_agent.plan_locally(prompt)
+        got = None if plan is None else strip_plan(plan)
+        if got != expected:
+            return {"prompt": prompt, "expected": expected, "got": got}
+        if plan is None:
+            return None
+        assert plan["commands"][-2]["tool"] == "render_svg" and plan["commands"][-1]["tool"] == "export_state"
+        if plan["commands"][0]["tool"] in ("undo", "redo"):
+            return None    # nothing to undo on a fresh scene
+        out = ai_agent.route_and_execute(plan, prompt, merge_existing=True)
+        if "error" in out:
+            return {"prompt": prompt, "error": out["error"]}
+    return None
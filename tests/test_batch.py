@@ -0,0 +1,38 @@
+"""POST /agent/batch request validation."""
+import pytest
+
+import ai_agent
+import server
+
+
+@pytest.fixture
+def seen(monkeypatch):
+    calls = []
+
+    def fake_run_prompts(items, model=None, concurrency=None):
+        calls.append(concurrency)
+        return [{"ok": True, "scene": {"objects": {}}, "planner": "local"} for _ in items]
+
+    monkeypatch.setattr(ai_agent, "run_prompts", fake_run_prompts)
+    return calls
+
+
+def _post(body):
+    return server.app.test_client().post("/agent/batch", json=body)
+
+
+@pytest.mark.parametrize("asked, used", [(None, None), (1, 1), (3, 3), (10000, "max")])
+def test_concurrency_is_clamped_to_the_server_limit(seen, asked, used):
+    body = {"items": [{"prompt": "undo"}]}
+    if asked is not None:
+        body["concurrency"] = asked
+    r = _post(body)
+    assert r.status_code == 200
+    assert seen == [ai_agent.BATCH_CONCURRENCY if used == "max" else used]
+
+
+@pytest.mark.parametrize("bad", [0, -4, 1.5, "many", True])
+def test_non_positive_or_non_integer_concurrency_is_rejected(seen, bad):
+    r = _post({"items": [{"prompt": "undo"}], "concurrency": bad})
+    assert r.status_code == 400
+    assert seen == []
@@ -0,0 +1,50 @@
+"""_scanline_empty_span_max gives what the per-scanline scan gives."""
+import random
+
+import pytest
+
+import ai_agent
+import los_cases
+
+
+# 0: always the segment-tree sweep; huge: always the direct scan of the
+# lines left after pruning; None: the default split between the two
+@pytest.fixture(params=[0, None, 10 ** 9], ids=["sweep", "default", "direct"])
+def direct_lines(request, monkeypatch):
+    if request.param is not None:
+        monkeypatch.setattr(ai_agent, "_LOS_DIRECT_LINES", request.param)
+
+
+def test_random_scenes_match_the_scanline_scan(direct_lines):
+    rng = random.Random(25)
+    for case in range(150):
+        style = rng.choice(["snapped", "ints", "odd", "uniform"])
+        gw, gh = rng.choice([(40.0, 30.0), (10.0, 10.0), (0.0, 5.0), (-8.0, 12.0), (25, 7)])
+        objs = los_cases.random_scene(rng, rng.randint(0, 120), abs(gw) or 5.0, abs(gh) or 5.0, style)
+        expected = los_cases.scanline_empty_span_max_reference(objs, gw, gh)
+        assert ai_agent._scanline_empty_span_max(objs, gw, gh) == expected, (case, style, gw, gh)
+
+
+@pytest.mark.parametrize("make", [los_cases.site_plan, los_cases.scattered])
+def test_large_scenes_match_the_scanline_scan(direct_lines, make):
+    objs, gw, gh = make(600, seed=4)
+    expected = los_cases.scanline_empty_span_max_reference(objs, gw, gh)
+    assert ai_agent._scanline_empty_span_max(objs, gw, gh) == expected
+
+
+def _longest(ivs, line, gw):
+    occ = [(a, b) for enter, leave, a, b in ivs if enter <= line <= leave]
+    return max((b - a for a, b in ai_agent._empty_spans_1d(occ, 0.0, gw)), default=0.0)
+
+
+def test_pruning_keeps_every_line_that_can_win():
+    rng = random.Random(5)
+    for _ in range(40):
+        objs, gw, gh = los_cases.scattered(rng.randint(50, 400), seed=rng.randrange(10 ** 6))
+        ivs = [(t, b, l, r) for l, r, t, b in map(ai_agent._aabb, objs.values())]
+        lines = sorted({0.0, gh, *(iv[0] for iv in ivs), *(iv[1] for iv in ivs)})
+        longest = {line: _longest(ivs, line, gw) for line in lines}
+        best = max(longest.values())
+        kept = ai_agent._los_candidate_lines(ivs, lines, 0.0, gw)
+        assert {line for line, span in longest.items() if span == best} <= set(kept)
+        assert len(kept) < len(lines)
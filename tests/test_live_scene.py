@@ -0,0 +1,63 @@
+"""/publish/delta revision checks and what GET /scene hands back."""
+import pytest
+
+import server
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "WATCH_PATH", str(tmp_path / "live_scene.json"))
+    monkeypatch.setattr(server, "JOURNAL_MODE", True)
+    c = server.app.test_client()
+    r = c.post("/publish", json={"grid_w": 20, "grid_h": 10,
+                                 "objects": {"A": {"x": 1, "y": 2, "w": 1, "h": 1}}})
+    assert r.status_code == 200
+    server.flush_pending()
+    yield c
+    server.flush_pending()
+
+
+def _rev(c):
+    return c.get("/scene").get_json()["rev"]
+
+
+@pytest.mark.parametrize("bad", ["abc", "1.5", [1], {"rev": 1}, True, 2.0])
+def test_malformed_base_rev_is_a_bad_request(client, bad):
+    rev = _rev(client)
+    r = client.post("/publish/delta", json={"base_rev": bad, "changed": {"A": {"x": 5, "y": 2, "w": 1, "h": 1}}})
+    assert r.status_code == 400
+    assert _rev(client) == rev
+
+
+@pytest.mark.parametrize("body", ["[1, 2]", '"delta"', "3", "null"])
+def test_non_object_body_is_a_bad_request(client, body):
+    rev = _rev(client)
+    r = client.post("/publish/delta", data=body, content_type="application/json")
+    assert r.status_code == 400
+    assert "JSON object" in r.get_json()["error"]
+    assert _rev(client) == rev
+
+
+@pytest.mark.parametrize("stale", [None, -1, "0"])
+def test_missing_or_stale_base_rev_is_a_conflict(client, stale):
+    body = {"changed": {"A": {"x": 5, "y": 2, "w": 1, "h": 1}}}
+    if stale is not None:
+        body["base_rev"] = stale
+    r = client.post("/publish/delta", json=body)
+    assert r.status_code == 409
+    assert r.get_json()["rev"] == _rev(client)
+
+
+def test_current_base_rev_applies_as_int_or_string(client):
+    for as_type in (int, str):
+        r = client.post("/publish/delta", json={"base_rev": as_type(_rev(client)),
+                                                "changed": {"A": {"x": 5, "y": 2, "w": 1, "h": 1}}})
+        assert r.status_code == 200
+
+
+def test_get_scene_omits_watcher_only_keys(client):
+    # the watcher file has been written, so the live scene carries _t and _seq
+    assert {"_t", "_seq"} <= set(server.LIVE["scene"])
+    scene = client.get("/scene").get_json()["scene"]
+    assert not {"_t", "_seq"} & set(scene)
+    assert scene["objects"]["A"]["x"] == 1.0
@@ -0,0 +1,15 @@
+"""The local planner answers the corpus prompts it should, and only those."""
+import pytest
+
+import ai_agent
+from planner_corpus import CORPUS, check_case
+
+
+@pytest.fixture(scope="module")
+def sess():
+    return ai_agent.SceneSession("test-local-planner")
+
+
+@pytest.mark.parametrize("prompt, expected", CORPUS, ids=[p or "<empty>" for p, _ in CORPUS])
+def test_corpus_prompt(sess, prompt, expected):
+    assert check_case(sess, prompt, expected) is None
@@ -0,0 +1,59 @@
+"""Bulk (numpy) and per-object scene normalization give the same JSON."""
+import json
+
+import pytest
+
+import server
+from normalize_cases import random_model
+
+pytestmark = pytest.mark.skipif(server.np is None, reason="the bulk path needs numpy")
+
+
+def _dump(x):
+    return json.dumps(x, sort_keys=False)
+
+
+def _with_threshold(fn, model, threshold):
+    saved = server.BULK_MIN_OBJECTS
+    server.BULK_MIN_OBJECTS = threshold
+    try:
+        return fn(model)
+    finally:
+        server.BULK_MIN_OBJECTS = saved
+
+
+def _per_object(fn, model):
+    return _with_threshold(fn, model, 1 << 62)
+
+
+def _bulk(fn, model):
+    return _with_threshold(fn, model, 0)
+
+
+@pytest.mark.parametrize("fn", [server.normalize_for_watcher, server.standardize_for_agent],
+                         ids=lambda fn: fn.__name__)
+@pytest.mark.parametrize("as_list", [False, True], ids=["dict", "list"])
+@pytest.mark.parametrize("seed", range(3))
+def test_bulk_matches_per_object(fn, as_list, seed):
+    model = random_model(2000, seed, as_list)
+    expected = _dump(_per_object(fn, json.loads(_dump(model))))
+    assert _dump(_bulk(fn, json.loads(_dump(model)))) == expected
+
+
+@pytest.mark.parametrize("kinds", [["center"], ["rect", "circle", "ellipse"]], ids=["editor", "svg"])
+def test_bulk_matches_per_object_on_clean_single_shape_scenes(kinds):
+    # no awkward values: every object takes the vectorized path
+    model = random_model(2000, seed=9, awkward=False, kinds=kinds)
+    for fn in (server.normalize_for_watcher, server.standardize_for_agent):
+        assert _dump(_bulk(fn, model)) == _dump(_per_object(fn, model))
+
+
+def test_small_scenes_stay_per_object(monkeypatch):
+    def boom(*a, **k):
+        raise AssertionError("bulk path used below BULK_MIN_OBJECTS")
+
+    monkeypatch.setattr(server, "BULK_MIN_OBJECTS", 100)
+    for name in dir(server):
+        if name.startswith("_bulk_"):
+            monkeypatch.setattr(server, name, boom)
+    server.normalize_for_watcher(random_model(10, seed=1, awkward=False))
@@ -0,0 +1,83 @@
+"""random_nonoverlap placement: valid layouts, and cost that follows the label count."""
+import math
+import random
+import tracemalloc
+
+import pytest
+
+import ai_agent
+
+
+@pytest.fixture
+def session():
+    with ai_agent.SceneSession().bound() as sess:
+        yield sess
+
+
+# 0: straight to the list of free grid points; None: rejection sampling
+# first, the free list once the canvas is dense
+@pytest.fixture(params=[0, None], ids=["free-list", "default"])
+def draws(request, monkeypatch):
+    if request.param is not None:
+        monkeypatch.setattr(ai_agent, "_PLACEMENT_DRAWS", request.param)
+
+
+def _create(labels, size, margin, seed, grid_w, grid_h):
+    ai_agent.engine_create_scene(labels, "cube", None, "random_nonoverlap", size, margin, seed, grid_w, grid_h)
+    return {k: (o["x"], o["y"]) for k, o in ai_agent.SCENE["objects"].items()}
+
+
+def _overlapping_pairs(objs, size, margin):
+    pts = list(objs.values())
+    return [(a, b) for n, a in enumerate(pts) for b in pts[n + 1:]
+            if not ai_agent._nonoverlap(a, size, margin, [{"x": b[0], "y": b[1], "w": size}])]
+
+
+def test_layouts_are_valid_and_a_full_canvas_leaves_the_scene_alone(session, draws):
+    snap = ai_agent.snap_to_grid
+    rng = random.Random(24)
+    full = placed = 0
+    for case in range(60):
+        grid_w, grid_h = rng.choice([20.0, 40.0]), rng.choice([15.0, 30.0])
+        size, margin = rng.choice([1.0, 1.5, 3.0]), rng.choice([0.0, 0.8, 1.7])
+        labels = [f"O{i}" for i in range(rng.randint(1, 200))]
+        seed = rng.randrange(10 ** 6)
+        ai_agent.engine_create_scene(["KEEP"], "cube", None, "grid", 1.0, 0.8, 0, 10.0, 10.0)
+        try:
+            objs = _create(labels, size, margin, seed, grid_w, grid_h)
+        except ValueError as e:
+            assert str(e).startswith("E_CANVAS_FULL:")
+            assert list(ai_agent.SCENE["objects"]) == ["KEEP"], case
+            full += 1
+            continue
+        assert objs == _create(labels, size, margin, seed, grid_w, grid_h), case
+        assert len(objs) == len(labels), case
+        assert not _overlapping_pairs(objs, size, margin), case
+        lo_x, hi_x = sorted((snap(size), snap(grid_w - size)))
+        lo_y, hi_y = sorted((snap(size), snap(grid_h - size)))
+        assert all(lo_x <= x <= hi_x and lo_y <= y <= hi_y and snap(x) == x and snap(y) == y
+                   for x, y in objs.values()), case
+        placed += 1
+    assert full and placed
+
+
+@pytest.mark.parametrize("side", [1000.0, 3000.0])
+def test_sparse_canvas_cost_does_not_grow_with_its_area(session, side):
+    # a 3000 m canvas has 36M grid points; listing them took seconds and GBs
+    tracemalloc.start()
+    try:
+        objs = _create([f"O{i}" for i in range(10)], 1.0, 0.8, 1, side, side)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert len(objs) == 10 and not _overlapping_pairs(objs, 1.0, 0.8)
+    assert peak < 1 << 20
+
+
+def test_dense_canvas_still_places_everything(session):
+    # near the random-packing limit, where rejection sampling alone stalls
+    size, margin = 1.0, 0.8
+    n = 400
+    side = ai_agent.snap_to_grid(math.sqrt(n * math.pi * ((size + margin) / 2.0) ** 2 / 0.5)) + 2 * size
+    objs = _create([f"O{i}" for i in range(n)], size, margin, 3, side, side)
+    assert len(objs) == n and not _overlapping_pairs(objs, size, margin)
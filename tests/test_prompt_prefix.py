@@ -0,0 +1,50 @@
+"""The planner's first message is the same bytes for every request."""
+import pytest
+
+import ai_agent
+from planner_backends import FakeStreamingClient
+
+PROMPTS = ["add a cube A at the center", "move A left 2", "align A B C lefts",
+           "put Z between A and B", "Add a tree called T near the north edge", "undo"]
+
+
+def _scene(n):
+    return {"grid_w": 40.0, "grid_h": 30.0, "objects": {
+        f"O{i}": {"label": f"O{i}", "primitive": "cube", "x": 2.0 + i, "y": 3.0, "w": 1.0, "h": 1.0,
+                  "height": 1.0} for i in range(n)}}
+
+
+def _messages(i, prompt):
+    with ai_agent.SceneSession(f"prefix-{i}").bound():
+        ai_agent._restore_scene(_scene(i * 3))
+        seed = ai_agent.prompt_seed(prompt)
+        return seed, ai_agent._plan_messages(prompt, seed)
+
+
+@pytest.mark.parametrize("encoding", ["compact", "json"])
+def test_system_prefix_is_identical_across_prompts_scenes_and_sessions(monkeypatch, encoding):
+    monkeypatch.setattr(ai_agent, "SCENE_ENCODING", encoding)
+    prefixes = set()
+    for i, prompt in enumerate(PROMPTS):
+        seed, messages = _messages(i, prompt)
+        assert str(seed) not in messages[0]["content"]
+        # seed, scene and prompt all come after the static prefix
+        assert f"SEED for this request: {seed}" in messages[1]["content"]
+        assert messages[-1] == {"role": "user", "content": prompt}
+        prefixes.add(messages[0]["content"].encode("utf-8"))
+    assert len(prefixes) == 1
+
+
+def test_repeat_calls_report_cached_prefix_tokens(monkeypatch):
+    plan = {"commands": [{"tool": "report_error", "arguments": {"code": "E_NOOP", "message": "noop"}}]}
+    monkeypatch.setattr(ai_agent, "client", FakeStreamingClient(plan))
+    monkeypatch.setattr(ai_agent, "PLAN_CACHE", ai_agent.PlanCache(mode="off"))
+    monkeypatch.setattr(ai_agent, "PLANNER_USAGE", dict.fromkeys(ai_agent.PLANNER_USAGE, 0))
+    sess = ai_agent.SceneSession("prefix-run")
+    for i, prompt in enumerate(PROMPTS):
+        with sess.bound():
+            ai_agent._restore_scene(_scene(i))
+            ai_agent.ask_agent_multi(prompt)
+    usage = ai_agent.PLANNER_USAGE
+    assert usage["calls"] == len(PROMPTS)
+    assert 0 < usage["cached_tokens"] < usage["prompt_tokens"]
@@ -0,0 +1,71 @@
+"""The scene spatial index stays in step with SCENE however the scene is edited."""
+import random
+
+import pytest
+
+import ai_agent
+import index_cases
+
+
+@pytest.fixture
+def session():
+    with ai_agent.SceneSession().bound() as sess:
+        yield sess
+
+
+def _rects():
+    return {k: (o["x"], o["y"], o["w"], o["h"]) for k, o in ai_agent.SCENE["objects"].items()}
+
+
+def _assert_current():
+    idx = ai_agent.SCENE_INDEX
+    if idx is not None and idx.source is ai_agent.SCENE["objects"]:
+        assert idx.rects == _rects()
+    # and whatever the index holds, queries answer for the scene as it is now
+    objs = ai_agent.SCENE["objects"]
+    assert ai_agent.objects_in_rect(-100, -100, 100, 100) == index_cases.brute_rect(objs, -100, -100, 100, 100)
+
+
+def test_direct_engine_calls_keep_the_index(session):
+    ai_agent.engine_create_scene(["A", "B", "C", "D"], "cube", None, "grid", 2.0, 1.0, 0, 40, 30)
+    ai_agent.spatial_index()
+    ai_agent.engine_add_object("E", "cube", 30.0, 20.0, 2.0, 2.0)
+    _assert_current()
+    ai_agent.engine_move("A", 5.0, 3.0)
+    _assert_current()
+    ai_agent.engine_scale("B", "both", 2.0)
+    _assert_current()
+    ai_agent.engine_rename_object("C", "Z")
+    _assert_current()
+    ai_agent.UNDO_STACK.append(ai_agent._deepcopy_scene())
+    ai_agent.engine_remove_object("D")
+    _assert_current()
+    assert ai_agent.objects_in_rect(29, 19, 31, 21) == {"E"}
+    ai_agent.engine_undo()
+    _assert_current()
+    assert "D" in ai_agent.objects_in_rect(-100, -100, 100, 100)
+    ai_agent.engine_resize_canvas(80, 60, scale_sizes=True)
+    _assert_current()
+
+
+def test_mixed_routed_and_direct_edits_keep_the_index(session):
+    ai_agent.SCENE = index_cases.synthetic(300, 3)
+    rng = random.Random(3)
+    for step in range(300):
+        ai_agent.spatial_index()
+        try:
+            if step % 2:
+                index_cases.random_engine_call(rng, ai_agent.SCENE["objects"], step)
+            else:
+                ai_agent.route_and_execute(index_cases.random_batch(rng, ai_agent.SCENE["objects"], step), "",
+                                           merge_existing=True)
+        except Exception:
+            pass  # bad random arguments; the index must still be right
+        _assert_current()
+
+
+def test_auto_cell_size_comes_from_the_canvas_passed_in(session):
+    objs = {f"O{i}": {"x": float(i), "y": 1.0, "w": 1.0, "h": 1.0} for i in range(100)}
+    ai_agent.SCENE["grid_w"] = ai_agent.SCENE["grid_h"] = 5000.0
+    assert ai_agent.SpatialGrid.from_objects(objs, grid_w=100.0, grid_h=4.0).cell == 4.0
+    assert ai_agent.SpatialGrid.from_objects(objs, cell=2.5).cell == 2.5